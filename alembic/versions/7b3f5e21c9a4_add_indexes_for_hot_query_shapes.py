@@ -0,0 +1,61 @@
+"""Add indexes for hot query shapes
+
+Revision ID: 7b3f5e21c9a4
+Revises: 0e628158f238
+Create Date: 2026-10-18 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7b3f5e21c9a4"
+down_revision = "0e628158f238"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_workouts_user_id_start_time",
+        "workouts",
+        ["user_id", "start_time", "id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_exercises_user_id_start_time",
+        "exercises",
+        ["user_id", "start_time", "id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_exercises_workout_id",
+        "exercises",
+        ["workout_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_workout_types_owner_user_id",
+        "workout_types",
+        ["owner_user_id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_exercise_types_owner_user_id",
+        "exercise_types",
+        ["owner_user_id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_exercise_types_owner_user_id", table_name="exercise_types")
+    op.drop_index("ix_workout_types_owner_user_id", table_name="workout_types")
+    op.drop_index("ix_exercises_workout_id", table_name="exercises")
+    op.drop_index("ix_exercises_user_id_start_time", table_name="exercises")
+    op.drop_index("ix_workouts_user_id_start_time", table_name="workouts")
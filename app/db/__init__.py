@@ -1,14 +1,18 @@
-from .database import Base, get_session, get_session_factory, get_session_factory_sync
-from .models import ExerciseType, Exercise, User, Workout, WorkoutType
+from .database import (
+    Base,
+    get_async_session,
+    get_session_factory_sync,
+)
+from .models import ExerciseType, Exercise, Principal, User, Workout, WorkoutType
 
 
 __all__ = [
     "Base",
     "ExerciseType",
-    "get_session",
-    "get_session_factory",
+    "get_async_session",
     "get_session_factory_sync",
     "Exercise",
+    "Principal",
     "User",
     "Workout",
     "WorkoutType",
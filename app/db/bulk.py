@@ -0,0 +1,52 @@
+import os
+from functools import cache
+from typing import Any, Sequence, cast
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import Table
+from sqlalchemy.sql import insert
+
+from .database import Base
+
+
+DEFAULT_BULK_INSERT_BATCH_SIZE = 1000
+# Postgres allows at most this many bind parameters in one statement.
+MAX_BIND_PARAMS = 65535
+
+
+@cache
+def get_bulk_insert_batch_size() -> int:
+    """Read the bulk insert batch size lazily, from BULK_INSERT_BATCH_SIZE."""
+    return int(os.environ.get("BULK_INSERT_BATCH_SIZE", DEFAULT_BULK_INSERT_BATCH_SIZE))
+
+
+async def bulk_insert_returning(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Sequence[dict[str, Any]],
+    batch_size: int | None = None,
+) -> list[Row]:
+    """
+    Insert rows with one INSERT ... RETURNING per batch, bypassing the ORM.
+
+    Every row must include its `id`. Rows are returned in the order they were given,
+    with server-side defaults (created_at, etc.) filled in. Nothing is committed.
+    """
+    if len(rows) == 0:
+        return []
+    table = cast(Table, model.__table__)
+    if batch_size is None:
+        batch_size = get_bulk_insert_batch_size()
+    # Very wide rows could push a batch over the bind parameter limit.
+    batch_size = max(1, min(batch_size, MAX_BIND_PARAMS // len(rows[0])))
+
+    inserted: list[Row] = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        stmt = insert(table).values(batch).returning(*table.c)
+        result = await session.execute(stmt)
+        # Postgres doesn't promise that RETURNING follows the order of VALUES.
+        by_id = {row.id: row for row in result}
+        inserted.extend(by_id[row["id"]] for row in batch)
+    return inserted
@@ -4,12 +4,15 @@ from typing import AsyncIterator
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine.base import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 
-
-DB_URL = os.environ["DATABASE_URL"]
-db_url = DB_URL.replace("postgres://", "postgresql://")
-db_url = DB_URL.replace("postgresql://", "postgresql+psycopg://")
+from .pool import PoolSettings, TimedAsyncAdaptedQueuePool, TimedQueuePool
 
 
 class Base(DeclarativeBase):
@@ -17,33 +20,124 @@ class Base(DeclarativeBase):
 
 
 @cache
-def get_engine(echo: bool = True) -> Engine:
-    return create_engine(db_url, echo=echo)
+def get_db_url() -> str:
+    """
+    Read the database URL from the environment, adjusted to use the psycopg driver.
+
+    This is read lazily (rather than at import) so that importing the app doesn't
+    require a database to be configured.
+    """
+    db_url = os.environ["DATABASE_URL"]
+    # In Heroku, the driver is called simply "postgres", which sqlalchemy doesn't like.
+    db_url = db_url.replace("postgres://", "postgresql://")
+    return db_url.replace("postgresql://", "postgresql+psycopg://")
+
+
+# Every engine we've created, so they can be disposed of at shutdown.
+_engines: list[Engine] = []
+_async_engines: list[AsyncEngine] = []
+
+
+@cache
+def get_pool_settings() -> PoolSettings:
+    return PoolSettings.from_env()
+
+
+def _resolve_echo(echo: bool | None) -> bool:
+    return get_pool_settings().echo if echo is None else echo
 
 
-async def get_session() -> AsyncIterator[Session]:
-    engine = get_engine()
-    SessionLocal = sessionmaker(
-        autocommit=False,
-        autoflush=True,
-        bind=engine,
+def get_engine(echo: bool | None = None) -> Engine:
+    """
+    Return the process-wide engine for these options.
+
+    `echo` defaults to the DB_ECHO setting. It's resolved before looking the engine up,
+    so every way of asking for the same options gets the same engine (and pool).
+    """
+    return _get_engine(_resolve_echo(echo))
+
+
+@cache
+def _get_engine(echo: bool) -> Engine:
+    engine = create_engine(
+        get_db_url(),
+        echo=echo,
+        poolclass=TimedQueuePool,
+        **get_pool_settings().engine_kwargs(),
     )
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    _engines.append(engine)
+    return engine
+
+
+def get_async_engine(echo: bool | None = None) -> AsyncEngine:
+    """
+    Return the process-wide async engine for these options, resolved as in get_engine.
+    """
+    return _get_async_engine(_resolve_echo(echo))
+
+
+@cache
+def _get_async_engine(echo: bool) -> AsyncEngine:
+    # psycopg (v3) supports asyncio natively, so the same URL works for both engines.
+    async_engine = create_async_engine(
+        get_db_url(),
+        echo=echo,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **get_pool_settings().engine_kwargs(),
+    )
+    _async_engines.append(async_engine)
+    return async_engine
+
+
+def get_sessionmaker(echo: bool | None = None) -> sessionmaker[Session]:
+    """
+    Return the process-wide session factory for these engine options.
+    """
+    return _get_sessionmaker(_resolve_echo(echo))
+
+
+@cache
+def _get_sessionmaker(echo: bool) -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(echo))
+
+
+def get_async_sessionmaker(
+    echo: bool | None = None,
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Return the process-wide async session factory for these engine options.
+
+    Objects aren't expired on commit, so endpoints can return records they've just
+    written without another round trip.
+    """
+    return _get_async_sessionmaker(_resolve_echo(echo))
+
+
+@cache
+def _get_async_sessionmaker(echo: bool) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=get_async_engine(echo), expire_on_commit=False)
+
+
+async def dispose_engines() -> None:
+    """
+    Close all pooled connections of any engines that have been created.
+    """
+    for async_engine in _async_engines:
+        await async_engine.dispose()
+    for engine in _engines:
+        engine.dispose()
+
 
+def get_session_factory_sync(echo: bool | None = None) -> sessionmaker[Session]:
+    return get_sessionmaker(echo=echo)
 
-async def get_session_factory(
-    echo: bool = True,
-) -> AsyncIterator[sessionmaker[Session]]:
-    engine = get_engine(echo=echo)
-    session_factory = sessionmaker(bind=engine)
-    yield session_factory
 
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    Provide one session per request.
 
-def get_session_factory_sync(echo: bool = True) -> sessionmaker[Session]:
-    engine = get_engine(echo=echo)
-    session_factory = sessionmaker(bind=engine)
-    return session_factory
+    FastAPI caches dependencies within a request, so the auth lookup and the endpoint
+    share this session (and its single connection checkout).
+    """
+    async with get_async_sessionmaker()() as session:
+        yield session
@@ -0,0 +1,139 @@
+import uuid
+from typing import Any, AsyncIterable, NamedTuple, cast
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import Table
+from sqlalchemy.sql import and_, column, func, insert, not_, select, table, text
+from sqlalchemy.types import UUID
+
+from .models import Exercise, ExerciseType, Principal, User, Workout
+
+
+# Columns copied from an import into the exercises table. `line` is kept alongside
+# them in the staging table, so that rejected rows can be reported by line number.
+IMPORT_COLUMNS = (
+    "id",
+    "start_time",
+    "weight",
+    "weight_unit",
+    "reps",
+    "seconds",
+    "notes",
+    "exercise_type_id",
+    "workout_id",
+    "user_id",
+)
+
+staging_table = table(
+    "exercise_import",
+    column("line"),
+    *(
+        column(name, UUID) if name.endswith("id") else column(name)
+        for name in IMPORT_COLUMNS
+    ),
+)
+
+
+class RejectedImportRow(NamedTuple):
+    line: int
+    workout_id: uuid.UUID
+    workout_found: bool
+    exercise_type_id: uuid.UUID
+    exercise_type_found: bool
+
+
+class ImportMergeResult(NamedTuple):
+    imported_ids: list[uuid.UUID]
+    rejected: int
+    # Only the first few rejected rows, by line number.
+    rejected_rows: list[RejectedImportRow]
+
+
+async def create_staging_table(session: AsyncSession) -> None:
+    """
+    Create a temporary table to COPY imported exercises into.
+
+    Column defaults are copied along with the columns, since only `line` and the
+    import columns are filled in. It's dropped when the transaction ends, whether
+    that's a commit or a rollback.
+    """
+    await session.execute(
+        text(
+            "CREATE TEMPORARY TABLE exercise_import "
+            "(line integer NOT NULL, LIKE exercises INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+
+
+async def copy_to_staging_table(
+    session: AsyncSession, rows: AsyncIterable[tuple[int, dict[str, Any]]]
+) -> int:
+    """
+    Stream (line number, row) pairs into the staging table with COPY.
+
+    Returns the number of rows copied.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    # This is a psycopg AsyncConnection; COPY isn't available through SQLAlchemy.
+    driver_connection: Any = raw_connection.driver_connection
+    columns = ", ".join(("line",) + IMPORT_COLUMNS)
+    copied = 0
+    async with driver_connection.cursor() as cursor:
+        async with cursor.copy(f"COPY exercise_import ({columns}) FROM STDIN") as copy:
+            async for line, row in rows:
+                await copy.write_row((line, *(row[c] for c in IMPORT_COLUMNS)))
+                copied += 1
+    return copied
+
+
+async def merge_staging_table(
+    session: AsyncSession, user: User | Principal, max_rejected_rows: int
+) -> ImportMergeResult:
+    """
+    Insert staged exercises whose workout and exercise type are visible to the user.
+
+    Other rows are left out; up to `max_rejected_rows` of them are returned.
+    """
+    s = staging_table.c
+    workout_found = s.workout_id.in_(
+        select(Workout.id).where(Workout.readable_by(user))
+    )
+    exercise_type_found = s.exercise_type_id.in_(
+        select(ExerciseType.id).where(ExerciseType.readable_by(user))
+    )
+    is_valid = and_(workout_found, exercise_type_found)
+
+    rejected_count = await session.scalar(
+        select(func.count()).select_from(staging_table).where(not_(is_valid))
+    )
+    rejected_query = (
+        select(
+            s.line,
+            s.workout_id,
+            workout_found.label("workout_found"),
+            s.exercise_type_id,
+            exercise_type_found.label("exercise_type_found"),
+        )
+        .where(not_(is_valid))
+        .order_by(s.line)
+        .limit(max_rejected_rows)
+    )
+    rejected_rows = [
+        RejectedImportRow(*row) for row in await session.execute(rejected_query)
+    ]
+
+    exercises = cast(Table, Exercise.__table__)
+    merge = (
+        insert(exercises)
+        .from_select(
+            list(IMPORT_COLUMNS),
+            select(*(s[c] for c in IMPORT_COLUMNS)).where(is_valid).order_by(s.line),
+        )
+        .returning(exercises.c.id)
+    )
+    return ImportMergeResult(
+        imported_ids=list((await session.scalars(merge)).all()),
+        rejected=rejected_count or 0,
+        rejected_rows=rejected_rows,
+    )
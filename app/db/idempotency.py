@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import delete, select
+
+from .database import get_async_sessionmaker
+from .models import IdempotencyKey
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDEMPOTENCY_KEY_TTL_HOURS = 24
+# How often the app purges expired keys while it's running.
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+
+@cache
+def get_idempotency_key_ttl() -> timedelta:
+    """Read how long idempotency keys last lazily, from IDEMPOTENCY_KEY_TTL_HOURS."""
+    hours = float(
+        os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", DEFAULT_IDEMPOTENCY_KEY_TTL_HOURS)
+    )
+    return timedelta(hours=hours)
+
+
+def _expiry_cutoff() -> datetime:
+    """Keys created before this have expired."""
+    return datetime.now(tz=timezone.utc) - get_idempotency_key_ttl()
+
+
+async def get_idempotency_key(
+    session: AsyncSession, user_id: uuid.UUID, key: str
+) -> IdempotencyKey | None:
+    """Look up a key that hasn't expired."""
+    query = select(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at > _expiry_cutoff(),
+    )
+    return (await session.scalars(query)).one_or_none()
+
+
+async def save_idempotency_key(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    key: str,
+    request_hash: str,
+    status_code: int,
+    response: Any,
+) -> bool:
+    """
+    Store the response to a request, in the same transaction as what it created.
+
+    An expired key with the same name is replaced. Returns False, without storing
+    anything, if the key was taken by another request first; if that request is
+    still in flight, this waits for it to finish.
+    """
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status_code=status_code,
+        response=response,
+    )
+    upsert = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": stmt.excluded.status_code,
+            "response": stmt.excluded.response,
+            "created_at": stmt.excluded.created_at,
+        },
+        where=IdempotencyKey.created_at <= _expiry_cutoff(),
+    ).returning(IdempotencyKey.key)
+    result = await session.execute(upsert)
+    return result.first() is not None
+
+
+async def purge_expired_idempotency_keys(session: AsyncSession) -> int:
+    """Delete expired keys and commit, returning how many there were."""
+    stmt = delete(IdempotencyKey).where(IdempotencyKey.created_at <= _expiry_cutoff())
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount  # type: ignore [attr-defined]
+
+
+async def purge_expired_idempotency_keys_periodically(
+    interval_seconds: float = PURGE_INTERVAL_SECONDS,
+) -> None:
+    """Purge expired keys every so often, until cancelled."""
+    while True:
+        try:
+            async with get_async_sessionmaker()() as session:
+                purged = await purge_expired_idempotency_keys(session)
+            logger.info(f"Purged {purged} expired idempotency keys")
+        except Exception:
+            # Expired keys are harmless for a while; try again next time.
+            logger.exception("Failed to purge expired idempotency keys")
+        await asyncio.sleep(interval_seconds)
@@ -1,7 +1,18 @@
 from .exercise_type import ExerciseType
 from .exercise import Exercise
-from .user import User
+from .idempotency_key import IdempotencyKey
+from .outbox_event import OutboxEvent
+from .user import User, Principal
 from .workout import Workout
 from .workout_type import WorkoutType
 
-__all__ = ["ExerciseType", "Exercise", "User", "Workout", "WorkoutType"]
+__all__ = [
+    "ExerciseType",
+    "Exercise",
+    "IdempotencyKey",
+    "OutboxEvent",
+    "Principal",
+    "User",
+    "Workout",
+    "WorkoutType",
+]
@@ -1,12 +1,13 @@
 import uuid
+from datetime import datetime
 from typing import Iterable, cast, Protocol
 
-from sqlalchemy.sql import Select, column, values, literal, select
+from sqlalchemy.sql import Select, column, values, literal, select, and_, or_
 from sqlalchemy.orm import Mapped
 from sqlalchemy.types import UUID
 from sqlalchemy.sql.elements import ColumnElement
 
-from .user import User
+from .user import User, Principal
 
 
 class ResourceModel(Protocol):
@@ -16,14 +17,14 @@ class ResourceModel(Protocol):
     id: Mapped[uuid.UUID]
 
     @classmethod
-    def readable_by(cls, user: User) -> ColumnElement[bool]:
+    def readable_by(cls, user: User | Principal) -> ColumnElement[bool]:
         """Build a query for IDs that are visible to this user."""
         ...
 
 
 def missing_references_to_model_query(
     ids: Iterable[uuid.UUID],
-    user: User,
+    user: User | Principal,
     model: type[ResourceModel],
 ) -> Select[tuple[uuid.UUID, str]]:
     """Build a query for IDs that aren't visible to this user, by resource."""
@@ -54,7 +55,31 @@ def missing_references_to_model_query(
                 # This line relies on the model class having some features that all the
                 # "standard" models do: a `id` column, and a `readable_by` method.
                 select(model.id).where(model.readable_by(user=user))
+                # Never correlate with an enclosing statement on the same table, like
+                # an UPDATE of a workout type that checks its parent type this way.
+                .correlate(None)
             )
         )
     )
     return query
+
+
+def keyset_filter(
+    start_time: Mapped[datetime | None],
+    id: Mapped[uuid.UUID],
+    after: tuple[datetime | None, uuid.UUID],
+) -> ColumnElement[bool]:
+    """
+    Build a filter for records that come after a (start_time, id) cursor.
+
+    Assumes results are ordered by start time ascending with nulls last, then by ID.
+    """
+    after_start_time, after_id = after
+    if after_start_time is None:
+        # We're already into the records without a start time.
+        return and_(start_time == None, id > after_id)
+    return or_(
+        start_time > after_start_time,
+        and_(start_time == after_start_time, id > after_id),
+        start_time == None,
+    )
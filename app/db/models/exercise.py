@@ -1,19 +1,35 @@
-from typing import Self, Iterable, cast
+from typing import Protocol, Self, Iterable, cast
 import uuid
 from datetime import datetime
 
-from sqlalchemy.schema import CheckConstraint, ForeignKey
+from sqlalchemy.schema import CheckConstraint, ForeignKey, Index
 from sqlalchemy.types import Integer, Double, Text, DateTime, UUID
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy.sql import Select, select, and_
+from sqlalchemy.sql import Select, select, and_, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.db.database import Base
 from app.db.mixins import ModificationTimesMixin
-from .user import User
+from .user import User, Principal
 from .workout import Workout
 from .exercise_type import ExerciseType
-from ._common import missing_references_to_model_query
+from ._common import missing_references_to_model_query, keyset_filter
+
+
+class ExerciseReferences(Protocol):
+    """
+    Anything that references a workout and an exercise type, like an ExerciseIn.
+
+    Exercises themselves are accepted separately, as for WorkoutReferences.
+    """
+
+    @property
+    def workout_id(self) -> uuid.UUID | None:
+        ...
+
+    @property
+    def exercise_type_id(self) -> uuid.UUID | None:
+        ...
 
 
 class Exercise(Base, ModificationTimesMixin):
@@ -25,6 +41,16 @@ class Exercise(Base, ModificationTimesMixin):
         CheckConstraint(
             "user_id = exercise_type.user_id OR exercise_type.user_id IS NULL"
         ),
+        # Matches how query() filters and orders live exercises, for keyset pagination.
+        Index(
+            "ix_exercises_user_id_start_time",
+            "user_id",
+            "start_time",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # For fetching the exercises of a workout (e.g. in v_exercises joins).
+        Index("ix_exercises_workout_id", "workout_id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -83,26 +109,26 @@ class Exercise(Base, ModificationTimesMixin):
     @classmethod
     def readable_by(
         cls,
-        user: User,
+        user: User | Principal,
     ) -> ColumnElement[bool]:
         """Build a filter for exercises this user can read."""
-        return cls.user == user
+        return cls.user_id == user.id
 
+    @classmethod
     def updateable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this exercise can be updated by this user."""
-        # n.b. Comparing (self.user == user) doesn't work; I haven't figured out why.
-        return self.user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for exercises this user can update."""
+        return cls.user_id == user.id
 
+    @classmethod
     def deleteable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this exercise can be deleted by this user."""
-        # n.b. Comparing (self.user == user) doesn't work; I haven't figured out why.
-        return self.user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for exercises this user can delete."""
+        return cls.user_id == user.id
 
     @classmethod
     def not_soft_deleted(cls) -> ColumnElement[bool]:
@@ -112,7 +138,7 @@ class Exercise(Base, ModificationTimesMixin):
     @classmethod
     def query(
         cls,
-        current_user: User,
+        current_user: User | Principal,
         *,
         id: uuid.UUID | None = None,
         exercise_type_id: uuid.UUID | None = None,
@@ -121,9 +147,14 @@ class Exercise(Base, ModificationTimesMixin):
         min_start_time: datetime | None = None,
         max_start_time: datetime | None = None,
         include_soft_deleted: bool = False,
+        after: tuple[datetime | None, uuid.UUID] | None = None,
+        limit: int | None = None,
     ) -> Select[tuple[Self]]:
         """
         Build a query to filter all the resources accessible to this user.
+
+        Results are ordered by (start_time, id), so `after` can be the start time and
+        ID of the last record of a previous page to fetch the next one.
         """
         query = (
             select(cls)
@@ -141,22 +172,33 @@ class Exercise(Base, ModificationTimesMixin):
         )
         if not include_soft_deleted:
             query = query.where(cls.not_soft_deleted())
+        if after is not None:
+            query = query.where(keyset_filter(cls.start_time, cls.id, after))
+        query = query.order_by(cls.start_time.asc().nulls_last(), cls.id)
+        if limit is not None:
+            query = query.limit(limit)
         return query
 
     @classmethod
     def missing_references_query(
-        cls, records: Iterable[Self], user: User
+        cls, records: Iterable[Self | ExerciseReferences], user: User | Principal
     ) -> Select[tuple[uuid.UUID, str]]:
         """
         Return a Select of referenced workouts/exercise types that aren't in the db.
 
         Result rows are tuples of (parent_type, parent_id).
         """
+        records = list(records)
+        # References can be None when only some of them are being changed.
         missing_wkt_query = missing_references_to_model_query(
-            ids=(r.workout_id for r in records), user=user, model=Workout
+            ids=(r.workout_id for r in records if r.workout_id is not None),
+            user=user,
+            model=Workout,
         )
         missing_ex_tps_query = missing_references_to_model_query(
-            ids=(r.exercise_type_id for r in records), user=user, model=ExerciseType
+            ids=(r.exercise_type_id for r in records if r.exercise_type_id is not None),
+            user=user,
+            model=ExerciseType,
         )
 
         query = missing_ex_tps_query.union(missing_wkt_query)
@@ -1,19 +1,26 @@
 import uuid
 from typing import Self
 
-from sqlalchemy.schema import ForeignKey
+from sqlalchemy.schema import ForeignKey, Index
 from sqlalchemy.types import Integer, Text, UUID
 from sqlalchemy.sql.elements import BooleanClauseList, ColumnElement
-from sqlalchemy.sql import Select, select, and_
+from sqlalchemy.sql import Select, select, and_, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.db.database import Base
 from app.db.mixins import ModificationTimesMixin
-from .user import User
+from .user import User, Principal
 
 
 class ExerciseType(Base, ModificationTimesMixin):
     __tablename__ = "exercise_types"
+    __table_args__ = (
+        Index(
+            "ix_exercise_types_owner_user_id",
+            "owner_user_id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -49,28 +56,28 @@ class ExerciseType(Base, ModificationTimesMixin):
     @classmethod
     def readable_by(
         cls,
-        user: User,
+        user: User | Principal,
     ) -> BooleanClauseList:
         """Build a filter for exercise types this user can read."""
         # Users can access exercise types that they own or that are public, denoted as a
         # null value in owner_user_id.
-        return (cls.owner == user) | (cls.owner == None)
+        return (cls.owner_user_id == user.id) | (cls.owner_user_id == None)
 
+    @classmethod
     def updateable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this exercise type can be updated by this user."""
-        # n.b. Comparing (self.owner == user) doesn't work; I haven't figured out why.
-        return self.owner_user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for exercise types this user can update."""
+        return cls.owner_user_id == user.id
 
+    @classmethod
     def deleteable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this exercise type can be deleted by this user."""
-        # n.b. Comparing (self.owner == user) doesn't work; I haven't figured out why.
-        return self.owner_user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for exercise types this user can delete."""
+        return cls.owner_user_id == user.id
 
     @classmethod
     def not_soft_deleted(cls) -> ColumnElement[bool]:
@@ -80,7 +87,7 @@ class ExerciseType(Base, ModificationTimesMixin):
     @classmethod
     def query(
         cls,
-        current_user: User,
+        current_user: User | Principal,
         *,
         id: uuid.UUID | None = None,
         name: str | None = None,
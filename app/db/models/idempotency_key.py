@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.schema import ForeignKey, Index
+from sqlalchemy.types import DateTime, Integer, Text, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+from app.db.mixins import current_timestamp_utc
+
+
+class IdempotencyKey(Base):
+    """
+    The response to a create request that was sent with an Idempotency-Key header.
+
+    Retries with the same key get this response back instead of creating anything.
+    Keys only last a while (see app.db.idempotency), so there's no soft-deletion.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # For purging expired keys.
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    # The primary key is the lookup index: each check is one probe on (user_id, key).
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    # A hash of the original request, so a key can't be reused for a different one.
+    request_hash: Mapped[str] = mapped_column(Text)
+    status_code: Mapped[int] = mapped_column(Integer)
+    response: Mapped[Any] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=current_timestamp_utc
+    )
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy.types import BigInteger, DateTime, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+from app.db.mixins import current_timestamp_utc
+
+
+class OutboxEvent(Base):
+    """
+    A message waiting to be published, written in the same transaction as the change
+    it describes.
+
+    The relay (see app.db.outbox) publishes these in order and then deletes them, so
+    the table only holds what hasn't been published yet.
+    """
+
+    __tablename__ = "outbox"
+
+    # Sequential, so events are relayed in the order they were written.
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    exchange: Mapped[str] = mapped_column(Text)
+    routing_key: Mapped[str] = mapped_column(Text)
+    body: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=current_timestamp_utc
+    )
@@ -26,6 +26,18 @@ class User(Base, ModificationTimesMixin):
     )
 
 
+class Principal(NamedTuple):
+    """
+    The identity of an authenticated user, as carried in the claims of their token.
+
+    Has the same `id` and `email` as the corresponding User, so it can stand in for one
+    in permission checks without loading the row from the database.
+    """
+
+    id: uuid.UUID
+    email: str
+
+
 class UserWithAuth(NamedTuple):
     """'
     A user along with a JWT header. Useful mainly as an abstraction for testing.
@@ -1,22 +1,45 @@
-from typing import Self, Iterable
+from typing import Protocol, Self, Iterable
 import uuid
 from datetime import datetime
 
-from sqlalchemy.schema import ForeignKey
+from sqlalchemy.schema import ForeignKey, Index
 from sqlalchemy.types import DateTime, Text, UUID
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy.sql import select, Select, and_
+from sqlalchemy.sql import select, Select, and_, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.db.database import Base
 from app.db.mixins import ModificationTimesMixin
 from .workout_type import WorkoutType
-from .user import User
-from ._common import missing_references_to_model_query
+from .user import User, Principal
+from ._common import missing_references_to_model_query, keyset_filter
+
+
+class WorkoutReferences(Protocol):
+    """
+    Anything that (optionally) references a workout type, like a WorkoutIn payload.
+
+    Workouts themselves are accepted separately: the mypy plugin types their columns as
+    Mapped[...], which doesn't satisfy a protocol.
+    """
+
+    @property
+    def workout_type_id(self) -> uuid.UUID | None:
+        ...
 
 
 class Workout(Base, ModificationTimesMixin):
     __tablename__ = "workouts"
+    __table_args__ = (
+        # Matches how query() filters and orders live workouts, for keyset pagination.
+        Index(
+            "ix_workouts_user_id_start_time",
+            "user_id",
+            "start_time",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -72,26 +95,26 @@ class Workout(Base, ModificationTimesMixin):
     @classmethod
     def readable_by(
         cls,
-        user: User,
+        user: User | Principal,
     ) -> ColumnElement[bool]:
         """Build a filter for workouts this user can read."""
-        return cls.user == user
+        return cls.user_id == user.id
 
+    @classmethod
     def updateable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this workout can be updated by this user."""
-        # n.b. Comparing (self.user == user) doesn't work; I haven't figured out why.
-        return self.user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for workouts this user can update."""
+        return cls.user_id == user.id
 
+    @classmethod
     def deleteable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this workout can be deleted by this user."""
-        # n.b. Comparing (self.user == user) doesn't work; I haven't figured out why.
-        return self.user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for workouts this user can delete."""
+        return cls.user_id == user.id
 
     @classmethod
     def not_soft_deleted(cls) -> ColumnElement[bool]:
@@ -101,7 +124,7 @@ class Workout(Base, ModificationTimesMixin):
     @classmethod
     def query(
         cls,
-        current_user: User,
+        current_user: User | Principal,
         *,
         id: uuid.UUID | None = None,
         status: str | None = None,
@@ -112,9 +135,14 @@ class Workout(Base, ModificationTimesMixin):
         min_end_time: datetime | None = None,
         max_end_time: datetime | None = None,
         include_soft_deleted: bool = False,
+        after: tuple[datetime | None, uuid.UUID] | None = None,
+        limit: int | None = None,
     ) -> Select[tuple[Self]]:
         """
         Build a query to filter all the resources accessible to this user.
+
+        Results are ordered by (start_time, id), so `after` can be the start time and
+        ID of the last record of a previous page to fetch the next one.
         """
         query = (
             select(cls)
@@ -134,11 +162,16 @@ class Workout(Base, ModificationTimesMixin):
         )
         if not include_soft_deleted:
             query = query.where(cls.not_soft_deleted())
+        if after is not None:
+            query = query.where(keyset_filter(cls.start_time, cls.id, after))
+        query = query.order_by(cls.start_time.asc().nulls_last(), cls.id)
+        if limit is not None:
+            query = query.limit(limit)
         return query
 
     @classmethod
     def missing_references_query(
-        cls, records: Iterable[Self], user: User
+        cls, records: Iterable[Self | WorkoutReferences], user: User | Principal
     ) -> Select[tuple[uuid.UUID, str]]:
         """
         Return a Select of referenced workouts types that aren't in the db.
@@ -2,19 +2,26 @@ import uuid
 
 from typing import Self, Iterable
 from sqlalchemy.sql.elements import ColumnElement, BooleanClauseList
-from sqlalchemy.sql import select, and_, Select
+from sqlalchemy.sql import select, and_, Select, text
 from sqlalchemy.types import Text, UUID
-from sqlalchemy.schema import ForeignKey
+from sqlalchemy.schema import ForeignKey, Index
 from sqlalchemy.orm import relationship, backref, Mapped, mapped_column
 
 from app.db.database import Base
 from app.db.mixins import ModificationTimesMixin
-from .user import User
+from .user import User, Principal
 from ._common import missing_references_to_model_query
 
 
 class WorkoutType(Base, ModificationTimesMixin):
     __tablename__ = "workout_types"
+    __table_args__ = (
+        Index(
+            "ix_workout_types_owner_user_id",
+            "owner_user_id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -55,28 +62,28 @@ class WorkoutType(Base, ModificationTimesMixin):
     @classmethod
     def readable_by(
         cls,
-        user: User,
+        user: User | Principal,
     ) -> BooleanClauseList:
         """Build a filter for workout types this user can read."""
         # Users can access workout types that they own or that are public, denoted as a
         # null value in owner_user_id.
-        return (cls.owner == user) | (cls.owner == None)
+        return (cls.owner_user_id == user.id) | (cls.owner_user_id == None)
 
+    @classmethod
     def updateable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this workout type can be updated by this user."""
-        # n.b. Comparing (self.owner == user) doesn't work; I haven't figured out why.
-        return self.owner_user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for workout types this user can update."""
+        return cls.owner_user_id == user.id
 
+    @classmethod
     def deleteable_by(
-        self,
-        user: User,
-    ) -> bool:
-        """Determine if this workout type can be deleted by this user."""
-        # n.b. Comparing (self.owner == user) doesn't work; I haven't figured out why.
-        return self.owner_user_id == user.id
+        cls,
+        user: User | Principal,
+    ) -> ColumnElement[bool]:
+        """Build a filter for workout types this user can delete."""
+        return cls.owner_user_id == user.id
 
     @classmethod
     def not_soft_deleted(cls) -> ColumnElement[bool]:
@@ -86,7 +93,7 @@ class WorkoutType(Base, ModificationTimesMixin):
     @classmethod
     def query(
         cls,
-        current_user: User,
+        current_user: User | Principal,
         *,
         id: uuid.UUID | None = None,
         name: str | None = None,
@@ -109,7 +116,7 @@ class WorkoutType(Base, ModificationTimesMixin):
     def missing_references_query(
         cls,
         records: Iterable[Self],
-        user: User,
+        user: User | Principal,
     ) -> Select[tuple[uuid.UUID, str]]:
         """
         Return a Select of referenced parent workout types that aren't in the db.
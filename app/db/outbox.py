@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select, delete, select
+
+from app.pubsub import Message, get_publisher
+from .database import get_async_sessionmaker
+from .models import OutboxEvent
+
+
+logger = logging.getLogger(__name__)
+
+RELAY_BATCH_SIZE = 100
+# How long the relay waits between checks when nothing has been committed here. Events
+# committed by this process wake it up straight away.
+RELAY_POLL_INTERVAL_SECONDS = 1.0
+
+# Session.info keys: messages to build when the session commits, and whether the
+# transaction has written any.
+_PENDING_KEY = "pending_outbox_messages"
+_WRITTEN_KEY = "outbox_written"
+# Set whenever a session commits outbox messages, to wake up the relay.
+_committed: asyncio.Event | None = None
+
+
+def add_outbox_messages(
+    session: Session | AsyncSession, messages: Iterable[Message]
+) -> None:
+    """Write messages to the outbox as part of the session's transaction."""
+    session.add_all(
+        OutboxEvent(
+            exchange=message.exchange,
+            routing_key=message.routing_key,
+            body=message.body,
+        )
+        for message in messages
+    )
+    session.info[_WRITTEN_KEY] = True
+
+
+def add_outbox_messages_on_commit(
+    session: Session | AsyncSession, build: Callable[[], Iterable[Message]]
+) -> None:
+    """
+    Write messages to the outbox when the session next commits, if it does.
+
+    `build` is called just before the commit, so it can describe what the transaction
+    ended up doing.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append(build)
+
+
+@event.listens_for(Session, "before_commit")
+def _add_pending_outbox_messages(session: Session) -> None:
+    for build in session.info.pop(_PENDING_KEY, []):
+        add_outbox_messages(session, build())
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_relay(session: Session) -> None:
+    if session.info.pop(_WRITTEN_KEY, False) and _committed is not None:
+        _committed.set()
+
+
+def relay_query(batch_size: int) -> Select:
+    """
+    Lock the oldest unpublished events.
+
+    Events locked by another relay are skipped rather than waited for, so several app
+    instances can relay at once without publishing anything twice.
+    """
+    return (
+        select(OutboxEvent)
+        .order_by(OutboxEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def relay_outbox_batch(
+    session: AsyncSession, batch_size: int = RELAY_BATCH_SIZE
+) -> int:
+    """
+    Publish a batch of events from the outbox and delete them, returning how many.
+
+    Events are only deleted once the transport has accepted them, so if publishing
+    fails they're published again later; consumers may see an event more than once.
+    """
+    rows = (await session.scalars(relay_query(batch_size))).all()
+    if not rows:
+        await session.rollback()
+        return 0
+    messages = [Message(row.exchange, row.routing_key, row.body) for row in rows]
+    try:
+        await get_publisher().send(messages)
+    except Exception:
+        await session.rollback()
+        raise
+    await session.execute(
+        delete(OutboxEvent).where(OutboxEvent.id.in_(row.id for row in rows))
+    )
+    await session.commit()
+    return len(rows)
+
+
+async def relay_outbox_periodically(
+    batch_size: int = RELAY_BATCH_SIZE,
+    poll_interval_seconds: float = RELAY_POLL_INTERVAL_SECONDS,
+) -> None:
+    """Relay events from the outbox as they're committed, until cancelled."""
+    global _committed
+    _committed = asyncio.Event()
+    while True:
+        _committed.clear()
+        relayed = 0
+        try:
+            async with get_async_sessionmaker()() as session:
+                relayed = await relay_outbox_batch(session, batch_size)
+        except Exception:
+            # The events stay in the outbox; try again next time.
+            logger.exception("Failed to relay outbox events")
+        if relayed == batch_size:
+            # There may be more waiting.
+            continue
+        try:
+            await asyncio.wait_for(_committed.wait(), poll_interval_seconds)
+        except TimeoutError:
+            pass
@@ -0,0 +1,116 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Connection pool configuration, read from the environment.
+
+    Recycling is off (-1) by default; set it below the database's idle timeout if
+    connections are being dropped from under us.
+    """
+
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    recycle: int = -1
+    pre_ping: bool = True
+    echo: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            size=int(os.environ.get("DB_POOL_SIZE", cls.size)),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", cls.max_overflow)),
+            timeout=float(os.environ.get("DB_POOL_TIMEOUT", cls.timeout)),
+            recycle=int(os.environ.get("DB_POOL_RECYCLE", cls.recycle)),
+            pre_ping=_env_bool("DB_POOL_PRE_PING", cls.pre_ping),
+            echo=_env_bool("DB_ECHO", cls.echo),
+        )
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for create_engine/create_async_engine."""
+        return {
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+            "pool_pre_ping": self.pre_ping,
+        }
+
+
+@dataclass
+class PoolWaitStats:
+    """Running totals of how long checkouts waited for a connection."""
+
+    checkouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+class _TimedCheckoutMixin:
+    """Time every checkout, including any time spent waiting for a free slot."""
+
+    wait_stats: PoolWaitStats
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self) -> Any:
+        start = perf_counter()
+        try:
+            return super()._do_get()  # type: ignore [misc]
+        finally:
+            self.wait_stats.record(perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: TimedQueuePool | TimedAsyncAdaptedQueuePool) -> dict[str, Any]:
+    """
+    Summarize the current state of a pool and how long checkouts have waited on it.
+    """
+    wait_stats = pool.wait_stats
+    checkouts = wait_stats.checkouts
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # SQLAlchemy reports negative overflow while the pool is still filling up.
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+        "checkouts": checkouts,
+        "total_wait_seconds": wait_stats.total_wait_seconds,
+        "mean_wait_seconds": (
+            wait_stats.total_wait_seconds / checkouts if checkouts else 0.0
+        ),
+        "max_wait_seconds": wait_stats.max_wait_seconds,
+    }
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from typing import NamedTuple
+from uuid import UUID
+
+from .models import User
+
+
+# How long a revoked user is remembered: as long as an access token lasts (one day).
+REVOKED_TTL_SECONDS = 24 * 60 * 60
+
+
+class _Entry(NamedTuple):
+    user: User
+    expires_at: float  # On the time.monotonic() clock.
+
+
+class UserCache:
+    """
+    A bounded, in-process LRU cache of users by email, with per-entry expiry.
+
+    Entries never outlive the token that caused them to be cached, and must be
+    invalidated when a user is deleted or their credentials change.
+
+    It also remembers which users have been deleted (see `revoke`), since tokens that
+    carry a user ID are accepted without looking the user up at all. Both only cover
+    this process: a user deleted through another instance stays usable here until
+    their tokens expire.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 300.0,
+        revoked_ttl_seconds: float = REVOKED_TTL_SECONDS,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.revoked_ttl_seconds = revoked_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Revoked user IDs, and when (on the time.monotonic() clock) to forget them.
+        self._revoked: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> User | None:
+        """Return the cached user for this email, if there is a live entry."""
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry.user
+
+    def put(self, user: User, expiration_timestamp: float | None = None) -> None:
+        """
+        Cache a user until the TTL elapses or the (unix) expiration time, if sooner.
+        """
+        ttl = self.ttl_seconds
+        if expiration_timestamp is not None:
+            ttl = min(ttl, expiration_timestamp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.email] = _Entry(user, time.monotonic() + ttl)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self, *, email: str | None = None, user_id: UUID | None = None
+    ) -> None:
+        """Drop any entries for this user, by email and/or ID."""
+        with self._lock:
+            if email is not None:
+                self._entries.pop(email, None)
+            if user_id is not None:
+                stale = [k for k, e in self._entries.items() if e.user.id == user_id]
+                for key in stale:
+                    del self._entries[key]
+
+    def revoke(self, user_id: UUID) -> None:
+        """
+        Drop a deleted user's entries and refuse their tokens from now on.
+
+        The ID is remembered for as long as a token can last, and then forgotten.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._revoked = {k: t for k, t in self._revoked.items() if t > now}
+            self._revoked[user_id] = now + self.revoked_ttl_seconds
+        self.invalidate(user_id=user_id)
+
+    def is_revoked(self, user_id: UUID) -> bool:
+        """Whether this user was deleted while their tokens may still be live."""
+        with self._lock:
+            expires_at = self._revoked.get(user_id)
+            return expires_at is not None and expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+@cache
+def get_user_cache() -> UserCache:
+    """Return the process-wide user cache, sized from the environment."""
+    return UserCache(
+        max_size=int(os.environ.get("USER_CACHE_SIZE", 1024)),
+        ttl_seconds=float(os.environ.get("USER_CACHE_TTL_SECONDS", 300)),
+    )
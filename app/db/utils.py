@@ -3,7 +3,8 @@ from uuid import UUID
 from sqlalchemy.sql import delete
 from sqlalchemy.orm import sessionmaker, Session
 
-from .models import Exercise, ExerciseType, Workout, WorkoutType, User
+from .models import Exercise, ExerciseType, IdempotencyKey, Workout, WorkoutType, User
+from .user_cache import get_user_cache
 
 
 def recursive_hard_delete(
@@ -24,6 +25,7 @@ def recursive_hard_delete(
             delete(ExerciseType).where(ExerciseType.owner_user_id == user_id),
             delete(Workout).where(Workout.user_id == user_id),
             delete(WorkoutType).where(WorkoutType.owner_user_id == user_id),
+            delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id),
             delete(User).where(User.id == user_id),
         ]
         rowcount = 0
@@ -32,4 +34,6 @@ def recursive_hard_delete(
             session.commit()
             nrows: int = result.rowcount  # type: ignore  # (this seems to work)
             rowcount += nrows
-        return rowcount
+    # Make sure the deleted user's tokens stop working, cached or not.
+    get_user_cache().revoke(user_id)
+    return rowcount
@@ -1,5 +1,7 @@
 from .v_workouts import VWorkout, get_v_workout_by_workout_id, get_v_workouts_sorted
 from .v_exercises import VExercise, get_v_exercises_by_workout_id
+from .workout_details import get_v_workout_details
+from .history import get_history_query
 
 __all__ = [
     "VWorkout",
@@ -7,4 +9,6 @@ __all__ = [
     "get_v_workouts_sorted",
     "VExercise",
     "get_v_exercises_by_workout_id",
+    "get_v_workout_details",
+    "get_history_query",
 ]
@@ -0,0 +1,53 @@
+from typing import Generic, Iterable, Sequence, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.engine.row import Row
+
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+class RowMapper(Generic[Model]):
+    """
+    Build pydantic models from result rows, matching fields to columns by name.
+
+    Columns can carry a prefix (e.g. "ex_id" for the `id` field) when several models
+    are selected side by side. In trusted mode (the default, for rows straight out of
+    our own database) models are constructed without re-validating every field.
+    """
+
+    def __init__(self, model: type[Model], prefix: str = "", trusted: bool = True):
+        self.model = model
+        self.prefix = prefix
+        self.trusted = trusted
+        self.fields = tuple(model.__fields__)
+        self.columns = tuple(prefix + field for field in self.fields)
+        self._fields_set = frozenset(self.fields)
+
+    def positions(self, row: Row) -> list[int]:
+        """Find where each field's column is in rows shaped like this one."""
+        index = {key: i for i, key in enumerate(row._fields)}
+        try:
+            return [index[column] for column in self.columns]
+        except KeyError as e:
+            raise ValueError(
+                f"{self.model.__name__} needs column {e.args[0]!r}, which the row lacks"
+            ) from None
+
+    def from_row(self, row: Row, positions: Sequence[int] | None = None) -> Model:
+        if positions is None:
+            positions = self.positions(row)
+        values = dict(zip(self.fields, [row[i] for i in positions]))
+        if self.trusted:
+            return self.model.construct(_fields_set=set(self._fields_set), **values)
+        return self.model(**values)
+
+    def from_rows(self, rows: Iterable[Row]) -> list[Model]:
+        """Map many rows of the same shape, looking up column positions only once."""
+        models: list[Model] = []
+        positions: Sequence[int] | None = None
+        for row in rows:
+            if positions is None:
+                positions = self.positions(row)
+            models.append(self.from_row(row, positions))
+        return models
@@ -0,0 +1,46 @@
+from sqlalchemy.sql import Select, and_, select
+
+from app.db.models import Exercise, ExerciseType, User, Workout, WorkoutType
+from app.db.models.user import Principal
+
+
+def get_history_query(current_user: User | Principal) -> Select:
+    """
+    Build a query for a user's full history: one row per exercise, with its workout.
+
+    Workouts without exercises still get a row, with null exercise columns. Rows are
+    ordered by workout and then by exercise, both by start time.
+    """
+    return (
+        select(
+            Workout.id.label("workout_id"),
+            Workout.start_time.label("workout_start_time"),
+            Workout.end_time.label("workout_end_time"),
+            Workout.status.label("workout_status"),
+            Workout.notes.label("workout_notes"),
+            WorkoutType.name.label("workout_type_name"),
+            Exercise.id.label("exercise_id"),
+            Exercise.start_time.label("exercise_start_time"),
+            ExerciseType.name.label("exercise_type_name"),
+            Exercise.weight,
+            Exercise.weight_unit,
+            Exercise.reps,
+            Exercise.seconds,
+            Exercise.notes.label("exercise_notes"),
+        )
+        .select_from(Workout)
+        .outerjoin(WorkoutType, WorkoutType.id == Workout.workout_type_id)
+        .outerjoin(
+            Exercise,
+            and_(Exercise.workout_id == Workout.id, Exercise.not_soft_deleted()),
+        )
+        .outerjoin(ExerciseType, ExerciseType.id == Exercise.exercise_type_id)
+        .where(Workout.readable_by(current_user))
+        .where(Workout.not_soft_deleted())
+        .order_by(
+            Workout.start_time.asc().nulls_last(),
+            Workout.id,
+            Exercise.start_time.asc().nulls_last(),
+            Exercise.id,
+        )
+    )
@@ -2,14 +2,15 @@ from uuid import UUID
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import select, text, desc
-from sqlalchemy.schema import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select, text, desc, table, column
 from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.types import DateTime, Text, UUID as SQLUUID
 from pydantic import BaseModel
-from app.db.database import Base, get_engine
 
 from app.db.models import User
+from app.db.models.user import Principal
+from ._mapping import RowMapper
 
 
 class VWorkout(BaseModel):
@@ -28,12 +29,31 @@ class VWorkout(BaseModel):
     workout_type_owner_user_id: UUID | None
 
 
-engine = get_engine()
-v_workouts = Table("v_workouts", Base.metadata, autoload_with=engine)
+# A static description of the view (defined in db/views), so that importing this module
+# doesn't need to reflect it from the database. It's kept out of Base.metadata so
+# Alembic doesn't try to create it as a table.
+v_workouts = table(
+    "v_workouts",
+    column("id", SQLUUID(as_uuid=True)),
+    column("start_time", DateTime(timezone=True)),
+    column("end_time", DateTime(timezone=True)),
+    column("status", Text),
+    column("user_id", SQLUUID(as_uuid=True)),
+    column("created_at", DateTime(timezone=True)),
+    column("updated_at", DateTime(timezone=True)),
+    column("deleted_at", DateTime(timezone=True)),
+    column("workout_type_id", SQLUUID(as_uuid=True)),
+    column("workout_type_name", Text),
+    column("workout_type_notes", Text),
+    column("parent_workout_type_id", SQLUUID(as_uuid=True)),
+    column("workout_type_owner_user_id", SQLUUID(as_uuid=True)),
+)
 
+v_workout_mapper = RowMapper(VWorkout)
 
-def get_v_workout_by_workout_id(
-    current_user: User, workout_id: UUID, session: Session
+
+async def get_v_workout_by_workout_id(
+    current_user: User | Principal, workout_id: UUID, session: AsyncSession
 ) -> VWorkout | None:
     query = text(
         """
@@ -56,30 +76,15 @@ def get_v_workout_by_workout_id(
         AND user_id = :user_id
     """
     ).bindparams(workout_id=workout_id, user_id=current_user.id)
-    result = session.execute(query).one_or_none()
+    result = (await session.execute(query)).one_or_none()
     if result is None:
         return None
-
-    return VWorkout(
-        id=result.id,
-        start_time=result.start_time,
-        end_time=result.end_time,
-        status=result.status,
-        user_id=result.user_id,
-        created_at=result.created_at,
-        updated_at=result.updated_at,
-        deleted_at=result.deleted_at,
-        workout_type_id=result.workout_type_id,
-        workout_type_name=result.workout_type_name,
-        workout_type_notes=result.workout_type_notes,
-        parent_workout_type_id=result.parent_workout_type_id,
-        workout_type_owner_user_id=result.workout_type_owner_user_id,
-    )
+    return v_workout_mapper.from_row(result)
 
 
-def get_v_workouts_sorted(
-    current_user: User,
-    session: Session,
+async def get_v_workouts_sorted(
+    current_user: User | Principal,
+    session: AsyncSession,
     order_by: str = "start_time",
     asc: bool = True,
     limit: int = 10,
@@ -92,23 +97,5 @@ def get_v_workouts_sorted(
         .limit(limit)
     )
 
-    result = session.execute(query)
-
-    def record_as_workout(record):
-        return VWorkout(
-            id=record.id,
-            start_time=record.start_time,
-            end_time=record.end_time,
-            status=record.status,
-            user_id=record.user_id,
-            created_at=record.created_at,
-            updated_at=record.updated_at,
-            deleted_at=record.deleted_at,
-            workout_type_id=record.workout_type_id,
-            workout_type_name=record.workout_type_name,
-            workout_type_notes=record.workout_type_notes,
-            parent_workout_type_id=record.parent_workout_type_id,
-            workout_type_owner_user_id=record.workout_type_owner_user_id,
-        )
-
-    return [record_as_workout(record) for record in result]
+    result = await session.execute(query)
+    return v_workout_mapper.from_rows(result)
@@ -0,0 +1,100 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+from app.db.models import User
+from app.db.models.user import Principal
+from ._mapping import RowMapper
+from .v_workouts import VWorkout, v_workout_mapper
+from .v_exercises import VExercise
+
+
+# The exercise columns are prefixed to tell them apart from the workout's.
+exercise_mapper = RowMapper(VExercise, prefix="ex_")
+
+
+async def get_v_workout_details(
+    current_user: User | Principal,
+    session: AsyncSession,
+    workout_id: UUID | None = None,
+    asc: bool = True,
+    limit: int = 10,
+) -> list[tuple[VWorkout, list[VExercise]]]:
+    """
+    Fetch workouts along with all their exercises in a single query.
+
+    Workouts are ordered by start time and limited *before* being joined to their
+    exercises, so `limit` counts workouts rather than rows.
+    """
+    direction = "ASC" if asc else "DESC"
+    workout_filter = "AND id = :workout_id" if workout_id is not None else ""
+    query = text(
+        f"""
+        WITH w AS (
+            SELECT
+                id,
+                start_time,
+                end_time,
+                status,
+                user_id,
+                created_at,
+                updated_at,
+                deleted_at,
+                workout_type_id,
+                workout_type_name,
+                workout_type_notes,
+                parent_workout_type_id,
+                workout_type_owner_user_id
+            FROM v_workouts
+            WHERE user_id = :user_id
+            {workout_filter}
+            ORDER BY start_time {direction}, id
+            LIMIT :limit
+        )
+        SELECT
+            w.*,
+            e.id AS ex_id,
+            e.start_time AS ex_start_time,
+            e.weight AS ex_weight,
+            e.weight_unit AS ex_weight_unit,
+            e.reps AS ex_reps,
+            e.seconds AS ex_seconds,
+            e.notes AS ex_notes,
+            e.workout_id AS ex_workout_id,
+            e.user_id AS ex_user_id,
+            e.created_at AS ex_created_at,
+            e.updated_at AS ex_updated_at,
+            e.deleted_at AS ex_deleted_at,
+            e.exercise_type_id AS ex_exercise_type_id,
+            e.exercise_type_name AS ex_exercise_type_name,
+            e.number_of_weights AS ex_number_of_weights,
+            e.exercise_type_notes AS ex_exercise_type_notes,
+            e.exercise_type_owner_user_id AS ex_exercise_type_owner_user_id
+        FROM w
+        LEFT JOIN v_exercises e
+            ON e.workout_id = w.id
+            AND e.user_id = :user_id
+        ORDER BY w.start_time {direction}, w.id, e.start_time, e.id
+    """
+    ).bindparams(user_id=current_user.id, limit=limit)
+    if workout_id is not None:
+        query = query.bindparams(workout_id=workout_id)
+    result = await session.execute(query)
+
+    # Rows arrive grouped by workout, so we can assemble the details in one pass.
+    details: list[tuple[VWorkout, list[VExercise]]] = []
+    current_workout_id: UUID | None = None
+    workout_positions: list[int] | None = None
+    exercise_positions: list[int] | None = None
+    for row in result:
+        if workout_positions is None:
+            workout_positions = v_workout_mapper.positions(row)
+            exercise_positions = exercise_mapper.positions(row)
+        if row.id != current_workout_id:
+            current_workout_id = row.id
+            details.append((v_workout_mapper.from_row(row, workout_positions), []))
+        # Workouts without exercises still produce a single row, with null exercises.
+        if row.ex_id is not None:
+            details[-1][1].append(exercise_mapper.from_row(row, exercise_positions))
+    return details
@@ -0,0 +1,164 @@
+import uuid
+from enum import Enum
+from typing import Any, ClassVar, NamedTuple, Protocol, Sequence, cast
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import Table
+from sqlalchemy.sql import Executable, FromClause, Select, select, update
+from sqlalchemy.sql.elements import ColumnElement
+
+from .models import Principal, User
+from .models._common import ResourceModel
+
+
+class Write(Enum):
+    """A kind of write to a single record."""
+
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class WriteableModel(ResourceModel, Protocol):
+    """A resource model with filters for who may write to it."""
+
+    __table__: ClassVar[FromClause]
+
+    @classmethod
+    def updateable_by(cls, user: User | Principal) -> ColumnElement[bool]:
+        ...
+
+    @classmethod
+    def deleteable_by(cls, user: User | Principal) -> ColumnElement[bool]:
+        ...
+
+    @classmethod
+    def not_soft_deleted(cls) -> ColumnElement[bool]:
+        ...
+
+
+class WriteFailure(Enum):
+    """Why a write to a single record didn't happen."""
+
+    NOT_FOUND = 1
+    NOT_PERMITTED = 2
+    MISSING_REFERENCE = 3
+
+
+class WriteFailureReason(NamedTuple):
+    failure: WriteFailure
+    # For MISSING_REFERENCE, the (ref_id, ref_type) row that couldn't be found.
+    missing_reference: Row | None = None
+
+
+def _permitted(
+    model: type[WriteableModel], user: User | Principal, write: Write
+) -> ColumnElement[bool]:
+    if write is Write.DELETE:
+        return model.deleteable_by(user)
+    return model.updateable_by(user)
+
+
+def _write_returning(
+    model: type[WriteableModel],
+    which: ColumnElement[bool],
+    user: User | Principal,
+    values: dict[str, Any],
+    write: Write,
+    references: Select | None,
+) -> Executable:
+    table = cast(Table, model.__table__)
+    conditions = [which, model.not_soft_deleted(), _permitted(model, user, write)]
+    if references is not None:
+        conditions.append(~references.exists())
+    if not values:
+        return select(*table.c).where(*conditions)
+    return update(table).where(*conditions).values(values).returning(*table.c)
+
+
+def write_returning_query(
+    model: type[WriteableModel],
+    id: uuid.UUID,
+    user: User | Principal,
+    values: dict[str, Any],
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> Executable:
+    """
+    Build one statement that writes a live record and returns its new row.
+
+    The user's permissions and, if given, a `missing_references_query` for the new
+    values are folded into the WHERE clause, so the statement returns no row instead
+    of writing when any of them fail. With no values, the row is only selected.
+    """
+    return _write_returning(model, model.id == id, user, values, write, references)
+
+
+def bulk_write_returning_query(
+    model: type[WriteableModel],
+    ids: Sequence[uuid.UUID],
+    user: User | Principal,
+    values: dict[str, Any],
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> Executable:
+    """
+    Like write_returning_query, but make the same change to many records at once.
+
+    Only the records that were written are returned.
+    """
+    return _write_returning(model, model.id.in_(ids), user, values, write, references)
+
+
+async def diagnose_failed_write(
+    session: AsyncSession,
+    model: type[WriteableModel],
+    id: uuid.UUID,
+    user: User | Principal,
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> WriteFailureReason:
+    """
+    Work out why a statement from write_returning_query didn't return a row.
+
+    This only runs when a write has already failed, so the common case stays at one
+    round trip.
+    """
+    query = select(_permitted(model, user, write).label("permitted")).where(
+        model.id == id, model.readable_by(user), model.not_soft_deleted()
+    )
+    record = (await session.execute(query)).one_or_none()
+    if record is None:
+        return WriteFailureReason(WriteFailure.NOT_FOUND)
+    if not record.permitted:
+        return WriteFailureReason(WriteFailure.NOT_PERMITTED)
+    if references is not None:
+        missing = (await session.execute(references.limit(1))).first()
+        if missing is not None:
+            return WriteFailureReason(WriteFailure.MISSING_REFERENCE, missing)
+    # The record must have been deleted since the write was attempted.
+    return WriteFailureReason(WriteFailure.NOT_FOUND)
+
+
+async def diagnose_failed_bulk_write(
+    session: AsyncSession,
+    model: type[WriteableModel],
+    ids: Sequence[uuid.UUID],
+    user: User | Principal,
+    write: Write = Write.UPDATE,
+) -> dict[uuid.UUID, WriteFailure]:
+    """
+    Work out why some records weren't returned by a bulk_write_returning_query.
+    """
+    query = select(model.id, _permitted(model, user, write).label("permitted")).where(
+        model.id.in_(ids), model.readable_by(user), model.not_soft_deleted()
+    )
+    permitted = {row.id: row.permitted for row in await session.execute(query)}
+    failures = {}
+    for id in ids:
+        if permitted.get(id) is False:
+            failures[id] = WriteFailure.NOT_PERMITTED
+        else:
+            # Either it isn't visible, or it was deleted since the write was attempted.
+            failures[id] = WriteFailure.NOT_FOUND
+    return failures
@@ -1,9 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from . import v1
+from .db.database import dispose_engines, get_async_engine, get_engine
+from .db.idempotency import purge_expired_idempotency_keys_periodically
+from .db.outbox import relay_outbox_periodically
+from .pubsub import get_publisher, stop_publisher
+from .v1.change_feed import get_change_hub
+from .v1.password_pool import shutdown_password_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Engines are created at startup rather than at import, so importing the app (in
+    # tests, alembic, etc.) never touches the database.
+    get_async_engine()
+    get_engine()
+    publisher = get_publisher()
+    publisher.start()
+    # Pass what's published on to the change feeds of the users who made the changes.
+    change_hub = get_change_hub()
+    publisher.add_listener(change_hub.dispatch)
+    tasks = [
+        asyncio.create_task(purge_expired_idempotency_keys_periodically()),
+        asyncio.create_task(relay_outbox_periodically()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Send any queued events before shutting everything else down.
+    await stop_publisher()
+    publisher.remove_listener(change_hub.dispatch)
+    await dispose_engines()
+    shutdown_password_pool()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -1,15 +0,0 @@
-def publish(message: str, exchange: str, routing_key: str) -> None:
-    """
-    Publish a message to an exchange.
-
-    Parameters
-    ----------
-    message
-        The message to publish.
-    exchange
-        The exchange to publish the message to.
-    routing_key
-        The routing key to publish the message with.
-    """
-    # Todo
-    ...
@@ -0,0 +1,65 @@
+from functools import cache
+
+from .envelope import Envelope, pack_envelopes, unpack_envelope
+from .publisher import OverflowPolicy, Publisher, PublisherSettings
+from .transports import (
+    FileTransport,
+    InMemoryTransport,
+    Message,
+    NullTransport,
+    Transport,
+)
+
+
+__all__ = [
+    "Envelope",
+    "FileTransport",
+    "get_publisher",
+    "InMemoryTransport",
+    "Message",
+    "NullTransport",
+    "OverflowPolicy",
+    "pack_envelopes",
+    "publish",
+    "Publisher",
+    "PublisherSettings",
+    "stop_publisher",
+    "Transport",
+    "unpack_envelope",
+]
+
+
+@cache
+def get_publisher() -> Publisher:
+    """
+    Return the process-wide publisher, configured from the environment.
+
+    The app starts it at startup; see PublisherSettings for the options.
+    """
+    return Publisher.from_settings(PublisherSettings.from_env())
+
+
+async def stop_publisher() -> None:
+    """Flush and stop the publisher, if one was created."""
+    if get_publisher.cache_info().currsize:
+        await get_publisher().stop()
+        get_publisher.cache_clear()
+
+
+async def publish(message: str, exchange: str, routing_key: str) -> None:
+    """
+    Publish a message to an exchange.
+
+    The message is queued and sent in the background, so this doesn't wait on the
+    broker; it only waits if the queue is full and the overflow policy is to block.
+
+    Parameters
+    ----------
+    message
+        The message to publish.
+    exchange
+        The exchange to publish the message to.
+    routing_key
+        The routing key to publish the message with.
+    """
+    await get_publisher().publish(Message(exchange, routing_key, message))
@@ -0,0 +1,73 @@
+import json
+from typing import Any, NamedTuple, Sequence
+
+
+# Limits on one envelope, so a huge bulk write can't produce a message the broker (or
+# a consumer) chokes on. Whichever is hit first starts a new part.
+MAX_IDS_PER_ENVELOPE = 1000
+MAX_ENVELOPE_BYTES = 64 * 1024
+# Room left for the "part" and "parts" fields, which aren't known until the end.
+_PART_FIELDS_BYTES = 40
+
+
+class Envelope(NamedTuple):
+    """
+    One event about many records: their ids, plus fields that apply to all of them.
+
+    An event about more records than fit in one message is split into parts, each a
+    complete envelope for its share of the ids; `part` counts from 1.
+    """
+
+    ids: list[str]
+    fields: dict[str, Any]
+    part: int = 1
+    parts: int = 1
+
+
+def pack_envelopes(
+    ids: Sequence[str],
+    fields: dict[str, Any],
+    max_ids: int = MAX_IDS_PER_ENVELOPE,
+    max_bytes: int = MAX_ENVELOPE_BYTES,
+) -> list[str]:
+    """
+    Serialize an event about these ids into as few message bodies as fit the limits.
+
+    Each body is a JSON object of the fields plus "ids", "part" and "parts".
+    """
+    base_bytes = len(json.dumps({**fields, "ids": []})) + _PART_FIELDS_BYTES
+    chunks: list[list[str]] = [[]]
+    size = base_bytes
+    for id in ids:
+        # The id, quoted, and the ", " separating it from the last one.
+        id_bytes = len(json.dumps(id)) + 2
+        chunk = chunks[-1]
+        if chunk and (len(chunk) >= max_ids or size + id_bytes > max_bytes):
+            chunk = []
+            chunks.append(chunk)
+            size = base_bytes
+        chunk.append(id)
+        size += id_bytes
+    return [
+        json.dumps({**fields, "ids": chunk, "part": i, "parts": len(chunks)})
+        for i, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def unpack_envelope(body: str | bytes) -> Envelope:
+    """
+    Parse a message body into an Envelope.
+
+    Bodies about a single record (with an "id" rather than "ids") and about no record
+    in particular are accepted too, as one-part envelopes.
+    """
+    fields = json.loads(body)
+    if "ids" in fields:
+        ids = fields.pop("ids")
+    elif "id" in fields:
+        ids = [fields.pop("id")]
+    else:
+        ids = []
+    part = fields.pop("part", 1)
+    parts = fields.pop("parts", 1)
+    return Envelope(ids=ids, fields=fields, part=part, parts=parts)
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import os
+from contextlib import suppress
+from dataclasses import dataclass
+from enum import Enum
+from time import perf_counter
+from typing import Any, Callable, Sequence
+
+from .transports import (
+    FileTransport,
+    InMemoryTransport,
+    Message,
+    NullTransport,
+    Transport,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do with a message when the queue is full."""
+
+    # Drop the new message straight away.
+    DROP = "drop"
+    # Wait for room, up to the block timeout, then drop it.
+    BLOCK = "block"
+
+
+@dataclass(frozen=True)
+class PublisherSettings:
+    """
+    Publisher configuration, read from the environment.
+
+    The transport is "none" (discard messages), "memory" or "file".
+    """
+
+    transport: str = "none"
+    file_path: str = "lifecycle-events.ndjson"
+    queue_size: int = 10_000
+    batch_size: int = 100
+    flush_interval: float = 0.05
+    overflow: OverflowPolicy = OverflowPolicy.DROP
+    block_timeout: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "PublisherSettings":
+        return cls(
+            transport=os.environ.get("PUBSUB_TRANSPORT", cls.transport),
+            file_path=os.environ.get("PUBSUB_FILE_PATH", cls.file_path),
+            queue_size=int(os.environ.get("PUBSUB_QUEUE_SIZE", cls.queue_size)),
+            batch_size=int(os.environ.get("PUBSUB_BATCH_SIZE", cls.batch_size)),
+            flush_interval=float(
+                os.environ.get("PUBSUB_FLUSH_INTERVAL", cls.flush_interval)
+            ),
+            overflow=OverflowPolicy(
+                os.environ.get("PUBSUB_OVERFLOW", cls.overflow.value)
+            ),
+            block_timeout=float(
+                os.environ.get("PUBSUB_BLOCK_TIMEOUT", cls.block_timeout)
+            ),
+        )
+
+    def make_transport(self) -> Transport:
+        match self.transport:
+            case "none":
+                return NullTransport()
+            case "memory":
+                return InMemoryTransport()
+            case "file":
+                return FileTransport(self.file_path)
+        raise ValueError(f"unknown pubsub transport '{self.transport}'")
+
+
+@dataclass
+class PublisherStats:
+    """
+    Running totals of what the publisher has done.
+
+    Only touched from the event loop, so there's no lock.
+    """
+
+    enqueued: int = 0
+    dropped: int = 0
+    published: int = 0
+    failed: int = 0
+    batches: int = 0
+    total_send_seconds: float = 0.0
+    max_send_seconds: float = 0.0
+
+    def record_send(self, size: int, seconds: float, ok: bool) -> None:
+        self.batches += 1
+        if ok:
+            self.published += size
+        else:
+            self.failed += size
+        self.total_send_seconds += seconds
+        self.max_send_seconds = max(self.max_send_seconds, seconds)
+
+
+class Publisher:
+    """
+    Publish messages from a bounded queue, in batches, on a background task.
+
+    Publishing only waits to enqueue a message, never for the transport. The worker
+    sends a batch once it has `batch_size` messages or `flush_interval` seconds after
+    the first one arrived, whichever is sooner. A batch the transport fails to send
+    is logged and counted, not retried.
+
+    Until `start()` is called, messages queue up (and are dropped once the queue is
+    full, whatever the overflow policy, since nothing would ever make room).
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        queue_size: int = PublisherSettings.queue_size,
+        batch_size: int = PublisherSettings.batch_size,
+        flush_interval: float = PublisherSettings.flush_interval,
+        overflow: OverflowPolicy = PublisherSettings.overflow,
+        block_timeout: float = PublisherSettings.block_timeout,
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.stats = PublisherStats()
+        self._queue: asyncio.Queue[Message] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task[None] | None = None
+        self._started_at: float | None = None
+        self._listeners: list[Callable[[Sequence[Message]], None]] = []
+
+    @classmethod
+    def from_settings(cls, settings: PublisherSettings) -> "Publisher":
+        return cls(
+            settings.make_transport(),
+            queue_size=settings.queue_size,
+            batch_size=settings.batch_size,
+            flush_interval=settings.flush_interval,
+            overflow=settings.overflow,
+            block_timeout=settings.block_timeout,
+        )
+
+    def add_listener(self, listener: Callable[[Sequence[Message]], None]) -> None:
+        """
+        Call `listener` with every batch the transport accepts, e.g. to pass events
+        on to subscribers in this process. It's called on the event loop, so it
+        mustn't block.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Sequence[Message]], None]) -> None:
+        """Stop calling a listener added with `add_listener`."""
+        self._listeners.remove(listener)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start the background task that sends queued messages."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._started_at = perf_counter()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Send whatever is queued, waiting up to `timeout` seconds, then stop."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except TimeoutError:
+            logger.warning(
+                f"Dropping {self._queue.qsize()} unpublished messages at shutdown"
+            )
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        await self.transport.close()
+
+    async def publish(self, message: Message) -> None:
+        """Queue a message to be published, dropping it if the queue stays full."""
+        if self.overflow is OverflowPolicy.BLOCK and self.running:
+            try:
+                await asyncio.wait_for(self._queue.put(message), self.block_timeout)
+            except TimeoutError:
+                self.stats.dropped += 1
+                return
+        else:
+            try:
+                self._queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.stats.dropped += 1
+                return
+        self.stats.enqueued += 1
+
+    async def send(self, messages: list[Message]) -> None:
+        """
+        Send messages straight to the transport, bypassing the queue.
+
+        For callers that need to know the messages were delivered, like the outbox
+        relay. Raise if the transport fails.
+        """
+        started_at = perf_counter()
+        try:
+            await self.transport.send(messages)
+        except Exception:
+            self.stats.record_send(len(messages), perf_counter() - started_at, False)
+            raise
+        self.stats.record_send(len(messages), perf_counter() - started_at, True)
+        for listener in self._listeners:
+            try:
+                listener(messages)
+            except Exception:
+                logger.exception(f"Publisher listener {listener!r} failed")
+
+    async def _next_batch(self) -> list[Message]:
+        """Wait for a message, then gather more until the batch is full or it's time."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _send(self, batch: list[Message]) -> None:
+        try:
+            await self.send(batch)
+        except Exception:
+            logger.exception(f"Failed to publish a batch of {len(batch)} messages")
+        for _ in batch:
+            self._queue.task_done()
+
+    async def _run(self) -> None:
+        while True:
+            await self._send(await self._next_batch())
+
+    def status(self) -> dict[str, Any]:
+        stats = self.stats
+        elapsed = perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "running": self.running,
+            "transport": type(self.transport).__name__,
+            "overflow": self.overflow.value,
+            "max_queued": self._queue.maxsize,
+            "queued": self._queue.qsize(),
+            "enqueued": stats.enqueued,
+            "dropped": stats.dropped,
+            "published": stats.published,
+            "failed": stats.failed,
+            "batches": stats.batches,
+            "mean_batch_size": (
+                (stats.published + stats.failed) / stats.batches
+                if stats.batches
+                else 0.0
+            ),
+            "mean_send_seconds": (
+                stats.total_send_seconds / stats.batches if stats.batches else 0.0
+            ),
+            "max_send_seconds": stats.max_send_seconds,
+            "published_per_second": stats.published / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import NamedTuple, Protocol, Sequence
+
+
+class Message(NamedTuple):
+    """A message waiting to be published."""
+
+    exchange: str
+    routing_key: str
+    body: str
+
+
+class Transport(Protocol):
+    """Where published messages end up, e.g. a broker connection."""
+
+    async def send(self, messages: Sequence[Message]) -> None:
+        """Deliver a batch of messages, raising if they couldn't be delivered."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class NullTransport:
+    """Discard every message. Used until a broker is configured."""
+
+    async def send(self, messages: Sequence[Message]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryTransport:
+    """Keep every batch in memory, for tests."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[Message]] = []
+
+    @property
+    def messages(self) -> list[Message]:
+        return [message for batch in self.batches for message in batch]
+
+    async def send(self, messages: Sequence[Message]) -> None:
+        self.batches.append(list(messages))
+
+    async def close(self) -> None:
+        pass
+
+
+class FileTransport:
+    """
+    Append messages to a file as newline-delimited JSON, a local stand-in for a broker.
+
+    Each batch is written with a single write, on a worker thread.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def _write(self, data: str) -> None:
+        with self.path.open("a") as f:
+            f.write(data)
+
+    async def send(self, messages: Sequence[Message]) -> None:
+        data = "".join(json.dumps(message._asdict()) + "\n" for message in messages)
+        await asyncio.to_thread(self._write, data)
+
+    async def close(self) -> None:
+        pass
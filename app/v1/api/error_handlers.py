@@ -3,7 +3,8 @@ from typing import Literal
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from psycopg.errors import ForeignKeyViolation, NotNullViolation
+from sqlalchemy.ext.asyncio import AsyncSession
+from psycopg.errors import ForeignKeyViolation, NotNullViolation, UniqueViolation
 from fastapi import HTTPException
 
 
@@ -15,9 +16,11 @@ class handle_db_errors:
     Run database-related code with error handling and automatic rollback.
 
     Known errors are converted to an HTTPException and reraised. The db session is rolled back as soon as an error occurs.
+
+    Use `with` for a sync Session and `async with` for an AsyncSession.
     """
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session | AsyncSession):
         self.session = session
 
     def __enter__(self):
@@ -31,19 +34,34 @@ class handle_db_errors:
         """
         if exc_type is not None:
             # Roll back the session and try to convert errors to HTTPExceptions.
+            assert isinstance(self.session, Session)
             self.session.rollback()
             http_exc = self._error_to_http_exception(exc_value)
             if http_exc is not None:
                 raise http_exc
-            else:
-                return False
+        return False
+
+    async def __aenter__(self):
+        pass
+
+    async def __aexit__(
+        self, exc_type: type[Exception], exc_value: Exception, traceback
+    ) -> Literal[False]:
+        """
+        Handle errors and close the context, for an AsyncSession.
+        """
+        if exc_type is not None:
+            assert isinstance(self.session, AsyncSession)
+            await self.session.rollback()
+            http_exc = self._error_to_http_exception(exc_value)
+            if http_exc is not None:
+                raise http_exc
+        return False
 
     def _error_to_http_exception(self, exc_value: Exception) -> HTTPException | None:
         """
         Convert known categories of errors into HTTPExceptions.
         """
-        self.session.rollback()
-
         if isinstance(exc_value, IntegrityError):
             original_error = exc_value.orig
             msg = None
@@ -54,6 +72,10 @@ class handle_db_errors:
                 case NotNullViolation():
                     logger.info(f"Catching and handling {original_error!r}")
                     msg = str(original_error)
+                case UniqueViolation():
+                    # E.g. a batch that creates a record with an ID that's taken.
+                    logger.info(f"Catching and handling {original_error!r}")
+                    msg = str(original_error)
                 case _:
                     logger.warning(f"Unable to catch {original_error!r}")
                     return None
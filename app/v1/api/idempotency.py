@@ -0,0 +1,96 @@
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Principal
+from app.db.idempotency import get_idempotency_key, save_idempotency_key
+from app.v1.auth import get_current_user
+from app.v1.lifecycle import skip_lifecycle_event
+
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class Idempotency:
+    """
+    The Idempotency-Key of a create request, if it was sent with one.
+
+    Endpoints check `replay()` before creating anything, and `save()` their response
+    in the same transaction as what they create, so a retried request gets the
+    original response back rather than creating duplicates. Without a key, both are
+    no-ops.
+    """
+
+    def __init__(
+        self, request: Request, key: str | None, user: Principal, request_hash: str
+    ):
+        self.request = request
+        self.key = key
+        self.user = user
+        self.request_hash = request_hash
+
+    async def replay(self, session: AsyncSession) -> JSONResponse | None:
+        """The original response to this request, if it's a retry."""
+        if self.key is None:
+            return None
+        record = await get_idempotency_key(session, self.user.id, self.key)
+        if record is None:
+            return None
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="this Idempotency-Key was already used for a different request",
+            )
+        # The original request already published its event.
+        skip_lifecycle_event(self.request)
+        return JSONResponse(
+            content=record.response,
+            status_code=record.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    async def save(
+        self, session: AsyncSession, status_code: int, content: Callable[[], Any]
+    ) -> None:
+        """
+        Store the response to this request, without committing.
+
+        `content` builds the response body; it's only called if there's a key. Raise
+        a 409 if another request with the same key got there first.
+        """
+        if self.key is None:
+            return
+        saved = await save_idempotency_key(
+            session,
+            user_id=self.user.id,
+            key=self.key,
+            request_hash=self.request_hash,
+            status_code=status_code,
+            response=jsonable_encoder(content()),
+        )
+        if not saved:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="a request with this Idempotency-Key was already processed",
+            )
+
+
+async def get_idempotency(
+    request: Request,
+    idempotency_key: str
+    | None = Header(default=None, max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+    current_user: Principal = Depends(get_current_user),
+) -> Idempotency:
+    """A FastAPI dependency for the Idempotency-Key header of a create request."""
+    request_hash = ""
+    if idempotency_key is not None:
+        body = await request.body()
+        digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+        digest.update(body)
+        request_hash = digest.hexdigest()
+    return Idempotency(request, idempotency_key, current_user, request_hash)
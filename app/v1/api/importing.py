@@ -0,0 +1,131 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, TypeVar
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+from app.v1.api.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+
+
+IMPORT_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE)
+
+# Only this many row errors are reported back, though all of them are counted.
+MAX_REPORTED_ERRORS = 100
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def import_media_type(request: Request) -> str:
+    """
+    Return the media type of an import upload. Raise a 415 if it isn't supported.
+    """
+    content_type = request.headers.get("content-type", "")
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in IMPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"imports must be one of: {', '.join(IMPORT_MEDIA_TYPES)}",
+        )
+    return media_type
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """
+    Split a stream of bytes into numbered lines of text, without buffering it all.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    line_number = 0
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson(
+    lines: AsyncIterator[tuple[int, str]]
+) -> AsyncIterator[tuple[int, dict[str, Any] | ValueError]]:
+    async for line_number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError("each line must be a JSON object")
+            continue
+        yield line_number, record
+
+
+async def iter_csv(
+    lines: AsyncIterator[tuple[int, str]]
+) -> AsyncIterator[tuple[int, dict[str, Any] | ValueError]]:
+    """
+    Parse CSV with a header row. Empty cells are treated as missing (null).
+    """
+    header: list[str] | None = None
+    record_start, record_text = 0, ""
+    async for line_number, line in lines:
+        if not record_text:
+            record_start = line_number
+            record_text = line
+        else:
+            record_text += "\n" + line
+        # A quoted cell can contain newlines; keep reading until the quotes balance.
+        if record_text.count('"') % 2 == 1:
+            continue
+        text, record_text = record_text, ""
+        if not text.strip():
+            continue
+        cells = next(csv.reader([text]))
+        if header is None:
+            header = [cell.strip() for cell in cells]
+            continue
+        if len(cells) != len(header):
+            yield record_start, ValueError(
+                f"expected {len(header)} cells, found {len(cells)}"
+            )
+            continue
+        yield record_start, {
+            key: value for key, value in zip(header, cells) if value != ""
+        }
+    if record_text:
+        yield record_start, ValueError("unterminated quoted cell")
+
+
+async def iter_validated(
+    request: Request, media_type: str, model: type[Model]
+) -> AsyncIterator[tuple[int, Model | ValueError]]:
+    """
+    Stream the records of an NDJSON or CSV upload, validated against a model.
+
+    Yields (line number, record) pairs, where invalid records are replaced by the
+    reason they're invalid.
+    """
+    lines = iter_lines(request.stream())
+    records = iter_ndjson(lines) if media_type == NDJSON_MEDIA_TYPE else iter_csv(lines)
+    async for line_number, record in records:
+        if isinstance(record, ValueError):
+            yield line_number, record
+            continue
+        try:
+            yield line_number, model.parse_obj(record)
+        except ValidationError as e:
+            yield line_number, ValueError(describe_validation_error(e))
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    """Summarize a validation error on one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
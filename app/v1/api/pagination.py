@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+from uuid import UUID
+from datetime import datetime
+from typing import Protocol, Sequence
+
+from fastapi import HTTPException, Response
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class KeysetRecord(Protocol):
+    """A record that can be paginated over by (start_time, id)."""
+
+    id: UUID
+    start_time: datetime | None
+
+
+def encode_cursor(record: KeysetRecord) -> str:
+    """
+    Encode the position of a record as an opaque cursor string.
+    """
+    start_time = record.start_time.isoformat() if record.start_time else None
+    raw = json.dumps([start_time, str(record.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    """
+    Decode a cursor string into a (start_time, id) pair. Raise a 400 if invalid.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        start_time, id = json.loads(raw)
+        return (
+            datetime.fromisoformat(start_time) if start_time is not None else None,
+            UUID(id),
+        )
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"invalid cursor '{cursor}'")
+
+
+def set_next_cursor(
+    response: Response, records: Sequence[KeysetRecord], limit: int | None
+) -> None:
+    """
+    Attach a cursor for the next page to the response, if there might be one.
+    """
+    if limit is not None and len(records) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(records[-1])
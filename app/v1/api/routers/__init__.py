@@ -4,6 +4,10 @@ from . import workouts
 from . import workout_types
 from . import users
 from . import token
+from . import internal
+from . import export
+from . import batch
+from . import changes
 from .derived.workout_details import router as workout_details_router
 
 # Order matters here: this is the order in which the endpoints will be displayed in docs
@@ -15,4 +19,8 @@ routers = {
     "Workouts": workouts.router,
     "Workout Types": workout_types.router,
     "Workout Details (Derived)": workout_details_router,
+    "Batch": batch.router,
+    "Changes": changes.router,
+    "Export": export.router,
+    "Internal": internal.router,
 }
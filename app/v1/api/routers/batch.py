@@ -0,0 +1,277 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, NamedTuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import union
+
+from app import db
+from app.db.bulk import bulk_insert_returning
+from app.db.writes import Write, write_returning_query
+from app.v1.auth import get_current_user
+from app.v1.api.error_handlers import handle_db_errors
+from app.v1.api.idempotency import Idempotency, get_idempotency
+from app.v1.api.writes import failed_write_exception
+from app.v1.lifecycle import Action, add_lifecycle_event
+from app.v1.models.batch import (
+    BatchIn,
+    BatchOp,
+    BatchOperation,
+    BatchOperationResult,
+    BatchResource,
+    BatchResult,
+)
+from app.v1.models.exercise import ExerciseIn, ExerciseInDB
+from app.v1.models.exercise_type import ExerciseTypeIn, ExerciseTypeInDB
+from app.v1.models.workout import WorkoutIn, WorkoutInDB
+from app.v1.models.workout_type import WorkoutTypeIn, WorkoutTypeInDB
+
+
+if TYPE_CHECKING:
+    from pydantic.error_wrappers import ErrorDict
+
+
+router = APIRouter(prefix="/batch")
+
+
+class ResourceSpec(NamedTuple):
+    model: Any
+    model_in: Any
+    model_in_db: type[BaseModel]
+    # Columns that reference other resources, and which resource they reference.
+    references: dict[str, BatchResource]
+
+
+RESOURCES: dict[BatchResource, ResourceSpec] = {
+    "workout": ResourceSpec(
+        db.Workout, WorkoutIn, WorkoutInDB, {"workout_type_id": "workout_type"}
+    ),
+    "exercise": ResourceSpec(
+        db.Exercise,
+        ExerciseIn,
+        ExerciseInDB,
+        {"workout_id": "workout", "exercise_type_id": "exercise_type"},
+    ),
+    "workout_type": ResourceSpec(
+        db.WorkoutType,
+        WorkoutTypeIn,
+        WorkoutTypeInDB,
+        {"parent_workout_type_id": "workout_type"},
+    ),
+    "exercise_type": ResourceSpec(
+        db.ExerciseType, ExerciseTypeIn, ExerciseTypeInDB, {}
+    ),
+}
+
+OP_ACTIONS = {"create": Action.CREATE, "update": Action.UPDATE, "delete": Action.DELETE}
+
+
+class PreparedOperation(NamedTuple):
+    operation: BatchOperation
+    spec: ResourceSpec
+    # A full row for creates; the columns to change for updates and deletes.
+    values: dict[str, Any]
+
+
+def validate_partial(model: type[BaseModel], data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Validate just the fields given, as a PATCH does. Unknown fields are rejected.
+    """
+    values: dict[str, Any] = {}
+    errors: list[ErrorDict] = []
+    for name, value in data.items():
+        field = model.__fields__.get(name)
+        if field is None:
+            errors.append(
+                {
+                    "loc": (name,),
+                    "msg": "extra fields not permitted",
+                    "type": "value_error.extra",
+                }
+            )
+            continue
+        values[name], error = field.validate(value, {}, loc=name, cls=model)
+        if error is not None:
+            errors.extend(ValidationError([error], model).errors())
+    if errors:
+        raise ValueError(errors)
+    return values
+
+
+def prepare_operations(
+    operations: list[BatchOperation], current_user: db.Principal
+) -> list[PreparedOperation]:
+    """
+    Validate each operation's data. Raise a 422 listing every invalid field.
+    """
+    prepared: list[PreparedOperation] = []
+    errors: list[dict[str, Any]] = []
+    now = datetime.now(tz=timezone.utc)
+    for i, operation in enumerate(operations):
+        spec = RESOURCES[operation.resource]
+        values: dict[str, Any] = {}
+        try:
+            match operation.op:
+                case "create":
+                    values = spec.model_in.parse_obj(operation.data).to_row(
+                        current_user.id
+                    )
+                    if operation.id is not None:
+                        values["id"] = operation.id
+                case "update":
+                    values = validate_partial(spec.model_in, operation.data)
+                case "delete":
+                    values = {"deleted_at": now}
+        except (ValidationError, ValueError) as e:
+            op_errors = e.errors() if isinstance(e, ValidationError) else e.args[0]
+            for error in op_errors:
+                loc = ("body", "operations", i, "data", *error["loc"])
+                errors.append({**error, "loc": loc})
+            continue
+        prepared.append(PreparedOperation(operation, spec, values))
+    if errors:
+        raise RequestValidationError(errors)
+    return prepared
+
+
+async def check_references(
+    session: AsyncSession,
+    prepared: list[PreparedOperation],
+    current_user: db.Principal,
+) -> None:
+    """
+    Check every reference in the batch with one query. Raise a 404 if any are missing.
+
+    References to records created earlier in the batch don't need checking.
+    """
+    created: dict[BatchResource, set[UUID]] = defaultdict(set)
+    to_check: dict[BatchResource, list[Any]] = defaultdict(list)
+    for operation, spec, values in prepared:
+        references = {
+            column: values[column]
+            for column, resource in spec.references.items()
+            if values.get(column) is not None
+            and values[column] not in created[resource]
+        }
+        if references:
+            to_check[operation.resource].append(spec.model(**references))
+        if operation.op == "create":
+            created[operation.resource].add(values["id"])
+    if not to_check:
+        return
+
+    queries = [
+        RESOURCES[resource]
+        .model.missing_references_query(records, user=current_user)
+        .subquery()
+        .select()
+        for resource, records in to_check.items()
+    ]
+    missing_references = list(await session.execute(union(*queries)))
+    if len(missing_references) > 0:
+        resources_as_str = ", ".join(
+            f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
+        )
+        raise HTTPException(
+            status_code=404,
+            detail=f"resource(s) not found: ({resources_as_str})",
+        )
+
+
+async def apply_operations(
+    session: AsyncSession,
+    prepared: list[PreparedOperation],
+    current_user: db.Principal,
+) -> list[Row]:
+    """
+    Apply operations in order, returning each one's record. Nothing is committed.
+
+    Consecutive creates of the same resource are inserted together.
+    """
+    records: list[Row] = []
+    pending_creates: list[dict[str, Any]] = []
+    for i, (operation, spec, values) in enumerate(prepared):
+        if operation.op == "create":
+            pending_creates.append(values)
+            next_op = prepared[i + 1].operation if i + 1 < len(prepared) else None
+            if (
+                next_op is None
+                or next_op.op != "create"
+                or next_op.resource != operation.resource
+            ):
+                records.extend(
+                    await bulk_insert_returning(session, spec.model, pending_creates)
+                )
+                pending_creates = []
+            continue
+
+        assert operation.id is not None
+        write = Write.DELETE if operation.op == "delete" else Write.UPDATE
+        query = write_returning_query(
+            spec.model, operation.id, current_user, values, write=write
+        )
+        record = (await session.execute(query)).one_or_none()
+        if record is None:
+            exc = await failed_write_exception(
+                session, spec.model, operation.id, current_user, write=write
+            )
+            exc.detail = f"operation {i}: {exc.detail}"
+            raise exc
+        records.append(record)
+    return records
+
+
+@router.post("/", status_code=status.HTTP_200_OK, response_model=BatchResult)
+async def apply_batch(
+    batch: BatchIn,
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> BatchResult | Response:
+    """
+    Apply an ordered list of creates, updates and deletes in one transaction.
+
+    Either every operation succeeds or none do. Creates can set their own `id`, so
+    that later operations in the batch can reference the new record. Updates change
+    only the fields given, like a PATCH; deletes are soft deletes.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the same key
+    gets the original response back instead of applying the batch again.
+    """
+    if (replay := await idempotency.replay(session)) is not None:
+        return replay
+    prepared = prepare_operations(batch.operations, current_user)
+    await check_references(session, prepared, current_user)
+    async with handle_db_errors(session):
+        records = await apply_operations(session, prepared, current_user)
+        result = BatchResult(
+            results=[
+                BatchOperationResult(
+                    op=operation.op,
+                    resource=operation.resource,
+                    record=spec.model_in_db.from_orm(record).dict(),
+                )
+                for (operation, spec, _), record in zip(prepared, records)
+            ]
+        )
+        # One event per kind of change, rather than one per operation.
+        affected: dict[tuple[BatchResource, BatchOp], list[UUID]] = defaultdict(list)
+        for (operation, _, _), record in zip(prepared, records):
+            affected[(operation.resource, operation.op)].append(record.id)
+        for (resource, op), ids in affected.items():
+            add_lifecycle_event(
+                session,
+                resource=RESOURCES[resource].model,
+                action=OP_ACTIONS[op],
+                resource_ids=ids,
+                user=current_user.email,
+                user_id=current_user.id,
+            )
+        await idempotency.save(session, status.HTTP_200_OK, lambda: result)
+        await session.commit()
+    return result
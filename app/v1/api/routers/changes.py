@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app import db
+from app.v1.auth import get_current_user
+from app.v1.change_feed import get_change_hub, sse_chunks
+
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+router = APIRouter(prefix="/changes")
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    responses={200: {"content": {SSE_MEDIA_TYPE: {}}}},
+)
+async def stream_changes(
+    current_user: db.Principal = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Follow changes to your records as they happen, as Server-Sent Events.
+
+    Each event is named for what happened (`create`, `update` or `delete`) and its
+    data says to what, e.g. `{"resource": "workouts", "ids": ["..."]}`, so you can
+    refetch just those records instead of polling. A `resync` event means some
+    changes were missed and everything should be refetched.
+    """
+    return StreamingResponse(
+        sse_chunks(get_change_hub(), current_user.id),
+        media_type=SSE_MEDIA_TYPE,
+        # Don't let proxies cache or buffer the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
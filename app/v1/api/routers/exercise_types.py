@@ -1,15 +1,20 @@
 from uuid import UUID
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, status, HTTPException, Body
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi import APIRouter, Depends, status, Body, Request, Response
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.exercise_type import ExerciseTypeInDB, ExerciseTypeIn
 from app.v1.auth import get_current_user
+from app.v1.api.idempotency import Idempotency, get_idempotency
 from app import db
+from app.db.writes import Write
 from app.v1.api.error_handlers import handle_db_errors
-from app.v1.api.unset import _Unset, _unset
-from app.v1.lifecycle import LifecyclePublisher
+from app.v1.api.unset import _unset, set_values
+from app.v1.api.streaming import stream_orm_response, wants_ndjson
+from app.v1.api.writes import write_one
+from app.v1.lifecycle import LifecyclePublisher, record_lifecycle_ids
 
 
 router = APIRouter(
@@ -19,15 +24,19 @@ router = APIRouter(
 
 
 @router.get("/", response_model=list[ExerciseTypeInDB])
-def read_exercise_types(
+async def read_exercise_types(
+    request: Request,
     id: UUID | None = None,
     name: str | None = None,
     owner_user_id: UUID | None = None,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.ExerciseType]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> list[db.ExerciseType] | Response:
     """
     Fetch exercise types.
+
+    Send `Accept: application/x-ndjson` to stream results as newline-delimited JSON
+    instead, one record per line.
     """
     query = db.ExerciseType.query(
         current_user=current_user,
@@ -35,122 +44,82 @@ def read_exercise_types(
         name=name,
         owner_user_id=owner_user_id,
     )
-    with session_factory() as session:
-        result = session.scalars(query)
-        return list(result)
+    if wants_ndjson(request):
+        return stream_orm_response(query, ExerciseTypeInDB)
+    result = await session.scalars(query)
+    return list(result)
 
 
 @router.post(
     "/", status_code=status.HTTP_201_CREATED, response_model=list[ExerciseTypeInDB]
 )
-def create_exercise_types(
+async def create_exercise_types(
+    request: Request,
     exercise_type: ExerciseTypeIn | list[ExerciseTypeIn],
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.ExerciseType]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> list[db.ExerciseType] | Response:
     """
     Create a new exercise type or exercise types.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the same key
+    gets the original response back instead of creating the types again.
     """
+    if (replay := await idempotency.replay(session)) is not None:
+        return replay
     if not isinstance(exercise_type, list):
         ex_tps = [exercise_type]
     else:
         ex_tps = exercise_type
 
     records = [ex_tp.to_orm_model(owner_user_id=current_user.id) for ex_tp in ex_tps]
-    with session_factory(expire_on_commit=False) as session:
-        with handle_db_errors(session):
-            session.add_all(records)
-            session.commit()
+    async with handle_db_errors(session):
+        session.add_all(records)
+        await session.flush()
+        record_lifecycle_ids(request, (record.id for record in records))
+        await idempotency.save(
+            session,
+            status.HTTP_201_CREATED,
+            lambda: [ExerciseTypeInDB.from_orm(record) for record in records],
+        )
+        await session.commit()
     return records
 
 
 @router.put("/", status_code=status.HTTP_200_OK, response_model=ExerciseTypeInDB)
-def overwrite_exercise_type(
+async def overwrite_exercise_type(
     id: UUID,
     exercise_type: ExerciseTypeIn,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.ExerciseType:
-    # Filter on ID and read permissions.
-    query = db.ExerciseType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise type with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise type with id '{id}'",
-            )
-        # Update the record in-place.
-        exercise_type.update_orm_model(record)
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    return await write_one(
+        session, db.ExerciseType, id, current_user, exercise_type.to_values()
+    )
 
 
 @router.patch("/", status_code=status.HTTP_200_OK, response_model=ExerciseTypeInDB)
-def update_exercise_type(
+async def update_exercise_type(
     id: UUID,
     name: str = Body(_unset),
     number_of_weights: int = Body(_unset),
     notes: str | None = Body(_unset),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.ExerciseType:
-    # Filter on ID and read permissions.
-    query = db.ExerciseType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise type with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise type with id '{id}'",
-            )
-
-        if not isinstance(name, _Unset):
-            record.name = name
-        if not isinstance(number_of_weights, _Unset):
-            record.number_of_weights = number_of_weights
-        if not isinstance(notes, _Unset):
-            record.notes = notes
-
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    values = set_values(name=name, number_of_weights=number_of_weights, notes=notes)
+    return await write_one(session, db.ExerciseType, id, current_user, values)
 
 
 @router.delete("/", status_code=status.HTTP_200_OK, response_model=ExerciseTypeInDB)
-def delete_exercise_type(
+async def delete_exercise_type(
     id: UUID,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.ExerciseType:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
     """Soft-delete an exercise type."""
-    # Filter on ID and read permissions.
-    query = db.ExerciseType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise type with id '{id}' not found"
-            )
-        if not record.deleteable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise type with id '{id}'",
-            )
-        record.deleted_at = datetime.now(tz=timezone.utc)
-        with handle_db_errors(session):
-            session.commit()
-
-    return record
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    return await write_one(
+        session, db.ExerciseType, id, current_user, values, write=Write.DELETE
+    )
@@ -1,15 +1,41 @@
 from uuid import UUID
+from typing import Any, AsyncIterator
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, status, HTTPException, Body
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    status,
+    HTTPException,
+    Body,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.exercise import ExerciseIn, ExerciseInDB, UnitValue
+from app.v1.models.imports import ImportResult, ImportRowError
+from app.v1.models.bulk import BulkIds, BulkWriteResult
 from app.v1.auth import get_current_user
+from app.v1.api.idempotency import Idempotency, get_idempotency
 from app import db
+from app.db.bulk import bulk_insert_returning
+from app.db import exercise_import
+from app.db.writes import Write
 from app.v1.api.error_handlers import handle_db_errors
-from app.v1.api.unset import _Unset, _unset
-from app.v1.lifecycle import LifecyclePublisher
+from app.v1.api.unset import _unset, set_values
+from app.v1.api.pagination import decode_cursor, set_next_cursor
+from app.v1.api.serialization import RowSerializer
+from app.v1.api.streaming import stream_orm_response, wants_ndjson
+from app.v1.api.writes import write_many, write_one
+from app.v1.api.importing import (
+    MAX_REPORTED_ERRORS,
+    import_media_type,
+    iter_validated,
+)
+from app.v1.lifecycle import LifecyclePublisher, record_lifecycle_ids
 
 
 router = APIRouter(
@@ -17,19 +43,30 @@ router = APIRouter(
     dependencies=[Depends(LifecyclePublisher(db.Exercise))],
 )
 
+exercise_serializer = RowSerializer(ExerciseInDB, db.Exercise)
+
 
 @router.get("/", response_model=list[ExerciseInDB])
-def read_exercises(
+async def read_exercises(
+    request: Request,
     id: UUID | None = None,
     exercise_type_id: UUID | None = None,
     workout_id: UUID | None = None,
     min_start_time: datetime | None = None,
     max_start_time: datetime | None = None,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.Exercise]:
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Response:
     """
     Fetch exercises.
+
+    Pass `limit` to page through results; when there may be more, the response
+    includes an `X-Next-Cursor` header to pass back as `after` for the next page.
+
+    Send `Accept: application/x-ndjson` to stream results as newline-delimited JSON
+    instead, one record per line.
     """
     query = db.Exercise.query(
         current_user=current_user,
@@ -38,87 +75,144 @@ def read_exercises(
         workout_id=workout_id,
         min_start_time=min_start_time,
         max_start_time=max_start_time,
+        after=decode_cursor(after) if after is not None else None,
+        limit=limit,
     )
-    with session_factory() as session:
-        result = session.scalars(query)
-        return list(result)
+    if wants_ndjson(request):
+        return stream_orm_response(query, ExerciseInDB)
+    # Skip the ORM and response model validation; just fetch and encode the columns.
+    rows = (await session.execute(exercise_serializer.select(query))).all()
+    response = exercise_serializer.response(rows)
+    set_next_cursor(response, rows, limit)
+    return response
 
 
 @router.post(
     "/", status_code=status.HTTP_201_CREATED, response_model=list[ExerciseInDB]
 )
-def create_exercises(
+async def create_exercises(
+    request: Request,
     exercise: ExerciseIn | list[ExerciseIn],
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.Exercise]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> list[Row] | Response:
     """
     Create a new exercise or exercises.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the same key
+    gets the original response back instead of creating the exercises again.
     """
+    if (replay := await idempotency.replay(session)) is not None:
+        return replay
     if not isinstance(exercise, list):
         exercises = [exercise]
     else:
         exercises = exercise
 
-    records = [ex.to_orm_model(user_id=current_user.id) for ex in exercises]
-    with session_factory(expire_on_commit=False) as session:
-        # First check that the referenced workouts and exercise types exist and are
-        # visible to the user.
-        query = db.Exercise.missing_references_query(records, user=current_user)
-        result = session.execute(query)
-        missing_references = list(result)
-        if len(missing_references) > 0:
-            resources_as_str = ", ".join(
-                f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
-            )
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource(s) not found: ({resources_as_str})",
-            )
-        # Then add the new records.
-        with handle_db_errors(session):
-            session.add_all(records)
-            session.commit()
+    # First check that the referenced workouts and exercise types exist and are
+    # visible to the user.
+    query = db.Exercise.missing_references_query(exercises, user=current_user)
+    result = await session.execute(query)
+    missing_references = list(result)
+    if len(missing_references) > 0:
+        resources_as_str = ", ".join(
+            f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
+        )
+        raise HTTPException(
+            status_code=404,
+            detail=f"resource(s) not found: ({resources_as_str})",
+        )
+    # Then insert the new records, a batch at a time.
+    rows = [ex.to_row(user_id=current_user.id) for ex in exercises]
+    async with handle_db_errors(session):
+        records = await bulk_insert_returning(session, db.Exercise, rows)
+        record_lifecycle_ids(request, (record.id for record in records))
+        await idempotency.save(
+            session,
+            status.HTTP_201_CREATED,
+            lambda: [ExerciseInDB.from_orm(record) for record in records],
+        )
+        await session.commit()
     return records
 
 
+@router.post("/import", status_code=status.HTTP_200_OK, response_model=ImportResult)
+async def import_exercises(
+    request: Request,
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> ImportResult:
+    """
+    Import exercises from an NDJSON or CSV upload (one exercise per line/row).
+
+    The upload is streamed into the database rather than read into memory. Rows that
+    are invalid or reference workouts/exercise types you can't see are skipped and
+    reported by line number; everything else is imported.
+    """
+    media_type = import_media_type(request)
+    errors: list[ImportRowError] = []
+    invalid_count = 0
+
+    async def valid_rows() -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        nonlocal invalid_count
+        async for line, record in iter_validated(request, media_type, ExerciseIn):
+            if isinstance(record, ValueError):
+                invalid_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(ImportRowError(line=line, detail=str(record)))
+                continue
+            yield line, record.to_row(user_id=current_user.id)
+
+    async with handle_db_errors(session):
+        await exercise_import.create_staging_table(session)
+        await exercise_import.copy_to_staging_table(session, valid_rows())
+        merged = await exercise_import.merge_staging_table(
+            session, current_user, max_rejected_rows=MAX_REPORTED_ERRORS
+        )
+        record_lifecycle_ids(request, merged.imported_ids)
+        await session.commit()
+
+    for row in merged.rejected_rows:
+        missing = []
+        if not row.workout_found:
+            missing.append(f"Workout:{row.workout_id}")
+        if not row.exercise_type_found:
+            missing.append(f"ExerciseType:{row.exercise_type_id}")
+        errors.append(
+            ImportRowError(
+                line=row.line, detail=f"resource(s) not found: ({', '.join(missing)})"
+            )
+        )
+    errors.sort(key=lambda error: error.line)
+    return ImportResult(
+        imported=len(merged.imported_ids),
+        rejected=invalid_count + merged.rejected,
+        errors=errors[:MAX_REPORTED_ERRORS],
+    )
+
+
 @router.put("/", status_code=status.HTTP_200_OK, response_model=ExerciseInDB)
-def overwrite_exercise(
+async def overwrite_exercise(
     id: UUID,
     exercise: ExerciseIn,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Exercise:
-    query = db.Exercise.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise with id '{id}'",
-            )
-        # Update the record in-place.
-        exercise.update_orm_model(record)
-        # Check that the new reference values are valid.
-        ref_query = db.Exercise.missing_references_query([record], user=current_user)
-        result = session.execute(ref_query).one_or_none()
-        if result is not None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource not found: ({result.ref_type}:{result.ref_id})",
-            )
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    # Permissions and the new references are checked as part of the update itself.
+    references = db.Exercise.missing_references_query([exercise], user=current_user)
+    return await write_one(
+        session,
+        db.Exercise,
+        id,
+        current_user,
+        exercise.to_values(),
+        references=references,
+    )
 
 
 @router.patch("/", status_code=status.HTTP_200_OK, response_model=ExerciseInDB)
-def update_exercise(
+async def update_exercise(
     id: UUID,
     # Body params:
     start_time: datetime | None = Body(_unset),
@@ -130,79 +224,97 @@ def update_exercise(
     workout_id: UUID = Body(_unset),
     exercise_type_id: UUID = Body(_unset),
     # Dependencies:
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Exercise:
-    # Filter on ID and read permissions.
-    query = db.Exercise.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise with id '{id}'",
-            )
-
-        if not isinstance(start_time, _Unset):
-            record.start_time = start_time
-        if not isinstance(weight, _Unset):
-            record.weight = weight
-        if not isinstance(weight_unit, _Unset):
-            record.weight_unit = weight_unit
-        if not isinstance(reps, _Unset):
-            record.reps = reps
-        if not isinstance(seconds, _Unset):
-            record.seconds = seconds
-        if not isinstance(notes, _Unset):
-            record.notes = notes
-        if not isinstance(workout_id, _Unset):
-            record.workout_id = workout_id
-        if not isinstance(exercise_type_id, _Unset):
-            record.exercise_type_id = exercise_type_id
-
-        # Now that we've transformed the query as needed, make sure the references are
-        # valid.
-        ref_query = db.Exercise.missing_references_query([record], user=current_user)
-        result = session.execute(ref_query).one_or_none()
-        if result is not None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource not found: ({result.ref_type}:{result.ref_id})",
-            )
-
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    values = set_values(
+        start_time=start_time,
+        weight=weight,
+        weight_unit=weight_unit,
+        reps=reps,
+        seconds=seconds,
+        notes=notes,
+        workout_id=workout_id,
+        exercise_type_id=exercise_type_id,
+    )
+    # Only references that are being changed need checking.
+    references = db.Exercise.missing_references_query(
+        [db.Exercise(**values)], user=current_user
+    )
+    return await write_one(
+        session, db.Exercise, id, current_user, values, references=references
+    )
 
 
 @router.delete("/", status_code=status.HTTP_200_OK, response_model=ExerciseInDB)
-def delete_exercise(
+async def delete_exercise(
     id: UUID,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Exercise:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
     """Soft-delete an exercise."""
-    # Filter on ID and read permissions.
-    query = db.Exercise.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"exercise with id '{id}' not found"
-            )
-        if not record.deleteable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update exercise with id '{id}'",
-            )
-        record.deleted_at = datetime.now(tz=timezone.utc)
-        with handle_db_errors(session):
-            session.commit()
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    return await write_one(
+        session, db.Exercise, id, current_user, values, write=Write.DELETE
+    )
+
+
+@router.patch("/bulk", status_code=status.HTTP_200_OK, response_model=BulkWriteResult)
+async def update_exercises(
+    request: Request,
+    ids: BulkIds = Body(),
+    start_time: datetime | None = Body(_unset),
+    weight: float = Body(_unset),
+    weight_unit: UnitValue | None = Body(_unset),
+    reps: int | None = Body(_unset),
+    seconds: int | None = Body(_unset),
+    notes: str | None = Body(_unset),
+    workout_id: UUID = Body(_unset),
+    exercise_type_id: UUID = Body(_unset),
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> BulkWriteResult:
+    """
+    Make the same change to many exercises at once.
+
+    Each ID gets its own status; exercises that can't be found or changed don't stop
+    the others from being updated.
+    """
+    values = set_values(
+        start_time=start_time,
+        weight=weight,
+        weight_unit=weight_unit,
+        reps=reps,
+        seconds=seconds,
+        notes=notes,
+        workout_id=workout_id,
+        exercise_type_id=exercise_type_id,
+    )
+    references = db.Exercise.missing_references_query(
+        [db.Exercise(**values)], user=current_user
+    )
+    results = await write_many(
+        session, db.Exercise, ids, current_user, values, references=references
+    )
+    record_lifecycle_ids(request, (r.id for r in results if r.status == "updated"))
+    async with handle_db_errors(session):
+        await session.commit()
+    return BulkWriteResult(results=results)
+
 
-    return record
+@router.delete("/bulk", status_code=status.HTTP_200_OK, response_model=BulkWriteResult)
+async def delete_exercises(
+    request: Request,
+    ids: BulkIds = Body(embed=True),
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> BulkWriteResult:
+    """Soft-delete many exercises at once, with a status for each ID."""
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    results = await write_many(
+        session, db.Exercise, ids, current_user, values, write=Write.DELETE
+    )
+    record_lifecycle_ids(request, (r.id for r in results if r.status == "deleted"))
+    async with handle_db_errors(session):
+        await session.commit()
+    return BulkWriteResult(results=results)
@@ -0,0 +1,41 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app import db
+from app.db.views import get_history_query
+from app.v1.auth import get_current_user
+from app.v1.api.streaming import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    stream_query_response,
+)
+
+
+router = APIRouter(prefix="/export")
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}},
+    },
+)
+async def export_history(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: db.Principal = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Download your full history of workouts and exercises, as NDJSON or CSV.
+
+    There is one row per exercise, along with its workout and exercise type. Workouts
+    without any exercises get a single row with empty exercise fields.
+    """
+    media_type = CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE
+    return stream_query_response(
+        get_history_query(current_user),
+        media_type=media_type,
+        filename=f"workout-history.{format}",
+    )
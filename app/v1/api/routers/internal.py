@@ -0,0 +1,87 @@
+import os
+import secrets
+from functools import cache
+from typing import Any, cast
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.db.database import get_async_engine, get_engine
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_status
+from app.db.user_cache import get_user_cache
+from app.pubsub import get_publisher
+from app.v1.models.password_pool import PasswordPoolStatus
+from app.v1.models.pool import PoolStatus
+from app.v1.models.pubsub import PublisherStatus
+from app.v1.models.user_cache import UserCacheStats
+from app.v1.password_pool import get_password_pool
+
+
+@cache
+def get_internal_api_key() -> str | None:
+    """Read the ops key lazily; without one, the internal endpoints are disabled."""
+    return os.environ.get("INTERNAL_API_KEY") or None
+
+
+def require_internal_api_key(
+    internal_api_key: str | None = Header(default=None, alias="X-Internal-Api-Key"),
+) -> None:
+    """
+    Only let through requests carrying the ops key.
+
+    These endpoints describe the whole process, not one user's data, so a user's token
+    isn't enough to see them.
+    """
+    expected = get_internal_api_key()
+    if expected is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if internal_api_key is None or not secrets.compare_digest(
+        internal_api_key, expected
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or incorrect internal API key",
+        )
+
+
+router = APIRouter(
+    prefix="/internal",
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_api_key)],
+)
+
+
+@router.get("/db_pool", response_model=dict[str, PoolStatus])
+async def read_db_pool_status() -> dict[str, dict[str, Any]]:
+    """
+    Report connection pool usage for the async (API) and sync engines.
+    """
+    async_pool = cast(TimedAsyncAdaptedQueuePool, get_async_engine().pool)
+    sync_pool = cast(TimedQueuePool, get_engine().pool)
+    return {
+        "async": pool_status(async_pool),
+        "sync": pool_status(sync_pool),
+    }
+
+
+@router.get("/user_cache", response_model=UserCacheStats)
+async def read_user_cache_stats() -> dict[str, int]:
+    """
+    Report the size and hit rate of the in-process user cache.
+    """
+    return get_user_cache().stats()
+
+
+@router.get("/password_pool", response_model=PasswordPoolStatus)
+async def read_password_pool_status() -> dict[str, Any]:
+    """
+    Report how busy the password hashing pool is and how long work queues for it.
+    """
+    return get_password_pool().status()
+
+
+@router.get("/pubsub", response_model=PublisherStatus)
+async def read_publisher_status() -> dict[str, Any]:
+    """
+    Report how many lifecycle events have been queued, published and dropped.
+    """
+    return get_publisher().status()
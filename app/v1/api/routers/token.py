@@ -1,6 +1,6 @@
 from fastapi import Depends, APIRouter, status, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.token import Token
 from app.v1.auth import authenticate_user, create_jwt_token
@@ -13,10 +13,10 @@ router = APIRouter(prefix="/token")
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
+    session: AsyncSession = Depends(db.get_async_session),
 ) -> Token:
-    user = authenticate_user(
-        form_data.username, form_data.password, session_factory=session_factory
+    user = await authenticate_user(
+        form_data.username, form_data.password, session=session
     )
     if user is None:
         raise HTTPException(
@@ -24,4 +24,4 @@ async def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return create_jwt_token(user.email)
+    return create_jwt_token(user.email, user.id)
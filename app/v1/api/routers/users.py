@@ -1,30 +1,36 @@
 import os
+from functools import cache
 
 from fastapi import APIRouter, Depends, status, HTTPException, Body
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.user import UserIn, UserOut
-from app.v1.auth import get_current_user
+from app.v1.auth import get_current_user_record
 from app import db
-from app.v1.auth import hash_pw
-from app.v1.lifecycle import publish_lifeycle_event, Action
+from app.v1.auth import hash_pw_async
+from app.v1.lifecycle import add_lifecycle_event, Action
+
+
+@cache
+def get_static_application_key() -> str:
+    """Read the user creation secret lazily, so importing the app doesn't require it."""
+    return os.environ["STATIC_APPLICATION_KEY"]
 
-STATIC_APPLICATION_KEY = os.environ["STATIC_APPLICATION_KEY"]
 
 router = APIRouter(prefix="/users")
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=UserOut)
-def create_user(
+async def create_user(
     user: UserIn,
     secret: str = Body(),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
+    session: AsyncSession = Depends(db.get_async_session),
 ) -> db.User:
     """
     Create a new user. Requires a secret string, for now.
     """
-    if secret != STATIC_APPLICATION_KEY:
+    if secret != get_static_application_key():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect user creation secret",
@@ -32,33 +38,36 @@ def create_user(
 
     email = user.email
     password = user.password
-    hashed_pw = hash_pw(email, password)
+    hashed_pw = await hash_pw_async(email, password)
 
     record = db.User(email=email, pw_hash=hashed_pw)
-    with session_factory(expire_on_commit=False) as session:
-        session.add(record)
-        try:
-            session.commit()
-        except IntegrityError:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="an account with that email address is already in use",
-            )
+    session.add(record)
+    try:
+        await session.flush()
+        # We have to add events manually here because this endpoint doesn't require
+        # authentication.
+        add_lifecycle_event(
+            session,
+            resource=db.User,
+            action=Action.CREATE,
+            resource_id=record.id,
+            user=email,
+            user_id=record.id,
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="an account with that email address is already in use",
+        )
 
-    # We have to publish events manually here because this endpoint doesn't require
-    # authentication.
-    publish_lifeycle_event(
-        resource=db.User,
-        action=Action.CREATE,
-        resource_id=record.id,
-        user=email,
-    )
     return record
 
 
 @router.get("/me", response_model=UserOut)
 def get_me(
-    current_user: db.User = Depends(get_current_user),
+    current_user: db.User = Depends(get_current_user_record),
 ) -> db.User:
     """
     Fetch information about your own user.
@@ -1,15 +1,20 @@
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session, sessionmaker
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request, Response
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.workout_type import WorkoutTypeIn, WorkoutTypeInDB
 from app.v1.auth import get_current_user
+from app.v1.api.idempotency import Idempotency, get_idempotency
 from app import db
+from app.db.writes import Write
 from app.v1.api.error_handlers import handle_db_errors
-from app.v1.api.unset import _Unset, _unset
-from app.v1.lifecycle import LifecyclePublisher
+from app.v1.api.unset import _unset, set_values
+from app.v1.api.streaming import stream_orm_response, wants_ndjson
+from app.v1.api.writes import write_one
+from app.v1.lifecycle import LifecyclePublisher, record_lifecycle_ids
 
 
 router = APIRouter(
@@ -19,168 +24,125 @@ router = APIRouter(
 
 
 @router.get("/", response_model=list[WorkoutTypeInDB])
-def read_workout_types(
+async def read_workout_types(
+    request: Request,
     id: UUID | None = None,
     name: str | None = None,
     owner_user_id: UUID | None = None,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.WorkoutType]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> list[db.WorkoutType] | Response:
     """
     Fetch workout types.
+
+    Send `Accept: application/x-ndjson` to stream results as newline-delimited JSON
+    instead, one record per line.
     """
     query = db.WorkoutType.query(
         current_user=current_user, id=id, name=name, owner_user_id=owner_user_id
     )
-    with session_factory() as session:
-        result = session.scalars(query)
-        return list(result)
+    if wants_ndjson(request):
+        return stream_orm_response(query, WorkoutTypeInDB)
+    result = await session.scalars(query)
+    return list(result)
 
 
 @router.post(
     "/", status_code=status.HTTP_201_CREATED, response_model=list[WorkoutTypeInDB]
 )
-def create_workout_type(
+async def create_workout_type(
+    request: Request,
     workout_type: WorkoutTypeIn | list[WorkoutTypeIn],
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.WorkoutType]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> list[db.WorkoutType] | Response:
     """
     Create a new workout type or workout types.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the same key
+    gets the original response back instead of creating the types again.
     """
+    if (replay := await idempotency.replay(session)) is not None:
+        return replay
     if not isinstance(workout_type, list):
         wkt_tps = [workout_type]
     else:
         wkt_tps = workout_type
 
     records = [wk_tp.to_orm_model(owner_user_id=current_user.id) for wk_tp in wkt_tps]
-    with session_factory(expire_on_commit=False) as session:
-        # First check that the referenced parent workout types exist and are visible to
-        # the user.
-        query = db.WorkoutType.missing_references_query(records, user=current_user)
-        result = session.execute(query)
-        missing_references = list(result)
-        if len(missing_references) > 0:
-            resources_as_str = ", ".join(
-                f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
-            )
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource(s) not found: ({resources_as_str})",
-            )
-        with handle_db_errors(session):
-            session.add_all(records)
-            session.commit()
+    # First check that the referenced parent workout types exist and are visible to
+    # the user.
+    query = db.WorkoutType.missing_references_query(records, user=current_user)
+    result = await session.execute(query)
+    missing_references = list(result)
+    if len(missing_references) > 0:
+        resources_as_str = ", ".join(
+            f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
+        )
+        raise HTTPException(
+            status_code=404,
+            detail=f"resource(s) not found: ({resources_as_str})",
+        )
+    async with handle_db_errors(session):
+        session.add_all(records)
+        await session.flush()
+        record_lifecycle_ids(request, (record.id for record in records))
+        await idempotency.save(
+            session,
+            status.HTTP_201_CREATED,
+            lambda: [WorkoutTypeInDB.from_orm(record) for record in records],
+        )
+        await session.commit()
     return records
 
 
 @router.put("/", status_code=status.HTTP_200_OK, response_model=WorkoutTypeInDB)
-def overwrite_workout_type(
+async def overwrite_workout_type(
     id: UUID,
     workout_type: WorkoutTypeIn,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.WorkoutType:
-    # Filter on ID and read permissions.
-    query = db.WorkoutType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout type with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout type with id '{id}'",
-            )
-        # Update the record in-place.
-        workout_type.update_orm_model(record)
-        # Check that the new reference values are valid.
-        ref_query = db.WorkoutType.missing_references_query([record], user=current_user)
-        with session.no_autoflush:
-            result = session.execute(ref_query).one_or_none()
-            if result is not None:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"resource not found: {result.ref_type}:{result.ref_id}",
-                )
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    values = workout_type.to_values()
+    # Permissions and the new references are checked as part of the update itself.
+    references = db.WorkoutType.missing_references_query(
+        [db.WorkoutType(**values)], user=current_user
+    )
+    return await write_one(
+        session, db.WorkoutType, id, current_user, values, references=references
+    )
 
 
 @router.patch("/", status_code=status.HTTP_200_OK, response_model=WorkoutTypeInDB)
-def update_workout_type(
+async def update_workout_type(
     id: UUID,
     name: str = Body(_unset),
     notes: str | None = Body(_unset),
     parent_workout_type_id: UUID | None = Body(_unset),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.WorkoutType:
-    # Filter on ID and read permissions.
-    query = db.WorkoutType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout type with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout type with id '{id}'",
-            )
-
-        if not isinstance(name, _Unset):
-            record.name = name
-        if not isinstance(notes, _Unset):
-            record.notes = notes
-        if not isinstance(parent_workout_type_id, _Unset):
-            record.parent_workout_type_id = parent_workout_type_id
-
-        # Now that we've transformed the query as needed, make sure the references are
-        # valid.
-        ref_query = db.WorkoutType.missing_references_query([record], user=current_user)
-        with session.no_autoflush:
-            result = session.execute(ref_query).one_or_none()
-            if result is not None:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"resource not found: ({result.ref_type}:{result.ref_id})",
-                )
-
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    values = set_values(
+        name=name, notes=notes, parent_workout_type_id=parent_workout_type_id
+    )
+    # Only references that are being changed need checking.
+    references = db.WorkoutType.missing_references_query(
+        [db.WorkoutType(**values)], user=current_user
+    )
+    return await write_one(
+        session, db.WorkoutType, id, current_user, values, references=references
+    )
 
 
 @router.delete("/", status_code=status.HTTP_200_OK, response_model=WorkoutTypeInDB)
-def delete_workout_type(
+async def delete_workout_type(
     id: UUID,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.WorkoutType:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
     """Soft-delete a workout type."""
-    # Filter on ID and read permissions.
-    query = db.WorkoutType.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout type with id '{id}' not found"
-            )
-        if not record.deleteable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout type with id '{id}'",
-            )
-        record.deleted_at = datetime.now(tz=timezone.utc)
-        with handle_db_errors(session):
-            session.commit()
-
-    return record
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    return await write_one(
+        session, db.WorkoutType, id, current_user, values, write=Write.DELETE
+    )
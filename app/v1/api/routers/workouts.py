@@ -1,15 +1,33 @@
 from uuid import UUID
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, status, HTTPException, Body
-from sqlalchemy.orm import Session, sessionmaker
+from fastapi import (
+    APIRouter,
+    Depends,
+    status,
+    HTTPException,
+    Body,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.v1.models.workout import WorkoutIn, WorkoutInDB, StatusValue
+from app.v1.models.bulk import BulkIds, BulkWriteResult
 from app.v1.auth import get_current_user
+from app.v1.api.idempotency import Idempotency, get_idempotency
 from app import db
+from app.db.bulk import bulk_insert_returning
+from app.db.writes import Write
 from app.v1.api.error_handlers import handle_db_errors
-from app.v1.api.unset import _Unset, _unset
-from app.v1.lifecycle import LifecyclePublisher
+from app.v1.api.unset import _unset, set_values
+from app.v1.api.pagination import decode_cursor, set_next_cursor
+from app.v1.api.serialization import RowSerializer
+from app.v1.api.streaming import stream_orm_response, wants_ndjson
+from app.v1.api.writes import write_many, write_one
+from app.v1.lifecycle import LifecyclePublisher, record_lifecycle_ids
 
 
 router = APIRouter(
@@ -17,9 +35,12 @@ router = APIRouter(
     dependencies=[Depends(LifecyclePublisher(db.Workout))],
 )
 
+workout_serializer = RowSerializer(WorkoutInDB, db.Workout)
+
 
 @router.get("/", response_model=list[WorkoutInDB])
-def read_workouts(
+async def read_workouts(
+    request: Request,
     id: UUID | None = None,
     status: str | None = None,
     workout_type_id: UUID | None = None,
@@ -27,11 +48,19 @@ def read_workouts(
     max_start_time: datetime | None = None,
     min_end_time: datetime | None = None,
     max_end_time: datetime | None = None,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.Workout]:
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Response:
     """
     Fetch workouts.
+
+    Pass `limit` to page through results; when there may be more, the response
+    includes an `X-Next-Cursor` header to pass back as `after` for the next page.
+
+    Send `Accept: application/x-ndjson` to stream results as newline-delimited JSON
+    instead, one record per line.
     """
     query = db.Workout.query(
         current_user=current_user,
@@ -42,159 +71,175 @@ def read_workouts(
         max_start_time=max_start_time,
         min_end_time=min_end_time,
         max_end_time=max_end_time,
+        after=decode_cursor(after) if after is not None else None,
+        limit=limit,
     )
-    with session_factory() as session:
-        result = session.scalars(query)
-        return list(result)
+    if wants_ndjson(request):
+        return stream_orm_response(query, WorkoutInDB)
+    # Skip the ORM and response model validation; just fetch and encode the columns.
+    rows = (await session.execute(workout_serializer.select(query))).all()
+    response = workout_serializer.response(rows)
+    set_next_cursor(response, rows, limit)
+    return response
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=list[WorkoutInDB])
-def create_workouts(
+async def create_workouts(
+    request: Request,
     workout: WorkoutIn | list[WorkoutIn],
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> list[db.Workout]:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> list[Row] | Response:
     """
     Record a new workout or workouts.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the same key
+    gets the original response back instead of recording the workouts again.
     """
+    if (replay := await idempotency.replay(session)) is not None:
+        return replay
     if not isinstance(workout, list):
         wkts = [workout]
     else:
         wkts = workout
 
-    records = [wkt.to_orm_model(user_id=current_user.id) for wkt in wkts]
-    with session_factory(expire_on_commit=False) as session:
-        # First check that the referenced workout types exist and are visible to the
-        # user.
-        query = db.Workout.missing_references_query(records, user=current_user)
-        result = session.execute(query)
-        missing_references = list(result)
-        if len(missing_references) > 0:
-            resources_as_str = ", ".join(
-                f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
-            )
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource(s) not found: ({resources_as_str})",
-            )
-        # Then add the new records.
-        with handle_db_errors(session):
-            session.add_all(records)
-            session.commit()
+    # First check that the referenced workout types exist and are visible to the
+    # user.
+    query = db.Workout.missing_references_query(wkts, user=current_user)
+    result = await session.execute(query)
+    missing_references = list(result)
+    if len(missing_references) > 0:
+        resources_as_str = ", ".join(
+            f"{ref.ref_type}:{ref.ref_id}" for ref in missing_references
+        )
+        raise HTTPException(
+            status_code=404,
+            detail=f"resource(s) not found: ({resources_as_str})",
+        )
+    # Then insert the new records, a batch at a time.
+    rows = [wkt.to_row(user_id=current_user.id) for wkt in wkts]
+    async with handle_db_errors(session):
+        records = await bulk_insert_returning(session, db.Workout, rows)
+        record_lifecycle_ids(request, (record.id for record in records))
+        await idempotency.save(
+            session,
+            status.HTTP_201_CREATED,
+            lambda: [WorkoutInDB.from_orm(record) for record in records],
+        )
+        await session.commit()
     return records
 
 
 @router.put("/", status_code=status.HTTP_200_OK, response_model=WorkoutInDB)
-def overwrite_workout(
+async def overwrite_workout(
     id: UUID,
     workout: WorkoutIn,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Workout:
-    # Filter on ID and read permissions.
-    query = db.Workout.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout with id '{id}'",
-            )
-        # Update the record in-place.
-        workout.update_orm_model(record)
-        # Check that the new reference values are valid.
-        ref_query = db.Workout.missing_references_query([record], user=current_user)
-        result = session.execute(ref_query).one_or_none()
-        if result is not None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource not found: {result.ref_type}:{result.ref_id}",
-            )
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    # Permissions and the new references are checked as part of the update itself.
+    references = db.Workout.missing_references_query([workout], user=current_user)
+    return await write_one(
+        session,
+        db.Workout,
+        id,
+        current_user,
+        workout.to_values(),
+        references=references,
+    )
 
 
 @router.patch("/", status_code=status.HTTP_200_OK, response_model=WorkoutInDB)
-def update_workout(
+async def update_workout(
     id: UUID,
     start_time: datetime | None = Body(_unset),
     end_time: datetime | None = Body(_unset),
     status: StatusValue = Body(_unset),
     notes: str | None = Body(_unset),
     workout_type_id: UUID | None = Body(_unset),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Workout:
-    # Filter on ID and read permissions.
-    query = db.Workout.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout with id '{id}' not found"
-            )
-        if not record.updateable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout with id '{id}'",
-            )
-
-        if not isinstance(start_time, _Unset):
-            record.start_time = start_time
-        if not isinstance(end_time, _Unset):
-            record.end_time = end_time
-        if not isinstance(status, _Unset):
-            record.status = status
-        if not isinstance(notes, _Unset):
-            record.notes = notes
-        if not isinstance(workout_type_id, _Unset):
-            record.workout_type_id = workout_type_id
-
-        # Now that we've transformed the query as needed, make sure the references are
-        # valid.
-        ref_query = db.Workout.missing_references_query([record], user=current_user)
-        result = session.execute(ref_query).one_or_none()
-        if result is not None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"resource not found: ({result.ref_type}:{result.ref_id})",
-            )
-
-        with handle_db_errors(session):
-            session.add(record)
-            session.commit()
-
-    return record
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
+    values = set_values(
+        start_time=start_time,
+        end_time=end_time,
+        status=status,
+        notes=notes,
+        workout_type_id=workout_type_id,
+    )
+    # Only references that are being changed need checking.
+    references = db.Workout.missing_references_query(
+        [db.Workout(**values)], user=current_user
+    )
+    return await write_one(
+        session, db.Workout, id, current_user, values, references=references
+    )
 
 
 @router.delete("/", status_code=status.HTTP_200_OK, response_model=WorkoutInDB)
-def delete_workout(
+async def delete_workout(
     id: UUID,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-    current_user: db.User = Depends(get_current_user),
-) -> db.Workout:
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> Row:
     """Soft-delete a workout."""
-    # Filter on ID and read permissions.
-    query = db.Workout.query(current_user=current_user, id=id)
-    with session_factory(expire_on_commit=False) as session:
-        record = session.scalars(query).one_or_none()
-        if record is None:
-            raise HTTPException(
-                status_code=404, detail=f"workout with id '{id}' not found"
-            )
-        if not record.deleteable_by(current_user):
-            raise HTTPException(
-                status_code=401,
-                detail=f"you do not have permissions to update workout with id '{id}'",
-            )
-        record.deleted_at = datetime.now(tz=timezone.utc)
-        with handle_db_errors(session):
-            session.commit()
-
-    return record
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    return await write_one(
+        session, db.Workout, id, current_user, values, write=Write.DELETE
+    )
+
+
+@router.patch("/bulk", status_code=status.HTTP_200_OK, response_model=BulkWriteResult)
+async def update_workouts(
+    request: Request,
+    ids: BulkIds = Body(),
+    start_time: datetime | None = Body(_unset),
+    end_time: datetime | None = Body(_unset),
+    status: StatusValue = Body(_unset),
+    notes: str | None = Body(_unset),
+    workout_type_id: UUID | None = Body(_unset),
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> BulkWriteResult:
+    """
+    Make the same change to many workouts at once.
+
+    Each ID gets its own status; workouts that can't be found or changed don't stop
+    the others from being updated.
+    """
+    values = set_values(
+        start_time=start_time,
+        end_time=end_time,
+        status=status,
+        notes=notes,
+        workout_type_id=workout_type_id,
+    )
+    references = db.Workout.missing_references_query(
+        [db.Workout(**values)], user=current_user
+    )
+    results = await write_many(
+        session, db.Workout, ids, current_user, values, references=references
+    )
+    record_lifecycle_ids(request, (r.id for r in results if r.status == "updated"))
+    async with handle_db_errors(session):
+        await session.commit()
+    return BulkWriteResult(results=results)
+
+
+@router.delete("/bulk", status_code=status.HTTP_200_OK, response_model=BulkWriteResult)
+async def delete_workouts(
+    request: Request,
+    ids: BulkIds = Body(embed=True),
+    session: AsyncSession = Depends(db.get_async_session),
+    current_user: db.Principal = Depends(get_current_user),
+) -> BulkWriteResult:
+    """Soft-delete many workouts at once, with a status for each ID."""
+    values = {"deleted_at": datetime.now(tz=timezone.utc)}
+    results = await write_many(
+        session, db.Workout, ids, current_user, values, write=Write.DELETE
+    )
+    record_lifecycle_ids(request, (r.id for r in results if r.status == "deleted"))
+    async with handle_db_errors(session):
+        await session.commit()
+    return BulkWriteResult(results=results)
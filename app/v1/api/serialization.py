@@ -0,0 +1,87 @@
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, cast
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+from sqlalchemy.engine import Row
+from sqlalchemy.schema import Table
+from sqlalchemy.sql import Select
+
+from app.db.database import Base
+
+
+# Encoding settings that match what JSONResponse uses.
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+_model_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    separators=(",", ":"),
+    default=pydantic_encoder,
+)
+
+
+def _converter(python_type: type) -> Callable[[Any], Any] | None:
+    """How to make a column's values JSON-serializable, if they aren't already."""
+    if issubclass(python_type, (datetime, date)):
+        return lambda value: None if value is None else value.isoformat()
+    if issubclass(python_type, UUID):
+        return lambda value: None if value is None else str(value)
+    return None
+
+
+class RowSerializer:
+    """
+    Serialize Core rows straight to JSON, with the same fields as a response model.
+
+    This skips loading ORM objects, validating them against the response model, and
+    running them through jsonable_encoder -- which is fine for rows that came
+    straight out of our own tables, whose types already match the model.
+    """
+
+    def __init__(self, response_model: type[BaseModel], orm_model: type[Base]):
+        table = cast(Table, orm_model.__table__)
+        self.fields = list(response_model.__fields__)
+        self.columns = [table.c[field] for field in self.fields]
+        self._converters = [
+            (i, converter)
+            for i, column in enumerate(self.columns)
+            if (converter := _converter(column.type.python_type)) is not None
+        ]
+
+    def select(self, query: Select) -> Select:
+        """Narrow a query of ORM objects to just the columns we serialize."""
+        return query.with_only_columns(*self.columns)
+
+    def to_dict(self, row: Row) -> dict[str, Any]:
+        values = list(row)
+        for i, converter in self._converters:
+            values[i] = converter(values[i])
+        return dict(zip(self.fields, values))
+
+    def encode(self, rows: Iterable[Row]) -> bytes:
+        records = [self.to_dict(row) for row in rows]
+        return _encoder.encode(records).encode("utf-8")
+
+    def response(self, rows: Iterable[Row], status_code: int = 200) -> Response:
+        return Response(
+            content=self.encode(rows),
+            status_code=status_code,
+            media_type="application/json",
+        )
+
+
+def model_response(content: Any, status_code: int = 200) -> Response:
+    """
+    Encode pydantic models (or lists and dicts of them) straight to a JSON response.
+
+    Returning models from an endpoint has FastAPI validate them against the response
+    model all over again; this skips that, for models built from our own rows.
+    """
+    return Response(
+        content=_model_encoder.encode(content).encode("utf-8"),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+
+from app.db.database import get_async_sessionmaker
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+# How many rows are fetched from the server-side cursor (and written out) at a time.
+STREAM_BATCH_SIZE = 1000
+
+
+async def stream_partitions(
+    query: Select, batch_size: int = STREAM_BATCH_SIZE
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Run a query with a server-side cursor, yielding its rows a batch at a time.
+
+    The query runs in a session of its own: a streamed response is sent after the
+    request's dependencies (and so its session) have been closed.
+    """
+    async with get_async_sessionmaker()() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def dump_ndjson_line(record: dict[str, Any]) -> str:
+    return json.dumps({k: _jsonable(v) for k, v in record.items()}) + "\n"
+
+
+async def ndjson_chunks(
+    partitions: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[str]:
+    """Encode batches of rows as NDJSON, one chunk per batch."""
+    async for partition in partitions:
+        yield "".join(dump_ndjson_line(row._asdict()) for row in partition)
+
+
+async def csv_chunks(
+    partitions: AsyncIterator[Sequence[Row]], columns: Sequence[str]
+) -> AsyncIterator[str]:
+    """Encode batches of rows as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    async for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [_jsonable(value) for value in row._tuple()] for row in partition
+        )
+        yield buffer.getvalue()
+
+
+def column_names(query: Select) -> list[str]:
+    """
+    The names of the columns a query selects, as its result rows will key them.
+
+    Every column must have a name; label any expressions (`func.count().label(...)`).
+    """
+    names = []
+    for column in query.selected_columns:
+        if column.key is None:
+            raise ValueError(f"selected column {column} has no label")
+        names.append(column.key)
+    return names
+
+
+def stream_query_response(
+    query: Select, media_type: str, filename: str | None = None
+) -> StreamingResponse:
+    """
+    Stream the results of a Core query as NDJSON or CSV, in constant memory.
+    """
+    body: AsyncIterator[str]
+    if media_type == CSV_MEDIA_TYPE:
+        body = csv_chunks(stream_partitions(query), column_names(query))
+    else:
+        body = ndjson_chunks(stream_partitions(query))
+    headers = {}
+    if filename is not None:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client asked for a streamed NDJSON response."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def model_ndjson_chunks(
+    partitions: AsyncIterator[Sequence[Row]], model: type[BaseModel]
+) -> AsyncIterator[str]:
+    """Encode batches of ORM objects as NDJSON, through their response model."""
+    async for partition in partitions:
+        yield "".join(model.from_orm(row[0]).json() + "\n" for row in partition)
+
+
+def stream_orm_response(query: Select, model: type[BaseModel]) -> StreamingResponse:
+    """
+    Stream the ORM objects selected by a query as NDJSON, in constant memory.
+
+    Each object is validated against the response model and written out as soon as
+    its batch arrives, rather than after the whole list has been loaded.
+    """
+    body = model_ndjson_chunks(stream_partitions(query), model)
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE)
@@ -1,5 +1,15 @@
+from typing import Any
+
+
 class _Unset:
     pass
 
 
 _unset = _Unset()
+
+
+def set_values(**values: Any) -> dict[str, Any]:
+    """Drop the values that were left unset."""
+    return {
+        key: value for key, value in values.items() if not isinstance(value, _Unset)
+    }
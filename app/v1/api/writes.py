@@ -0,0 +1,149 @@
+import re
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.db import Principal
+from app.db.writes import (
+    Write,
+    WriteableModel,
+    WriteFailure,
+    bulk_write_returning_query,
+    diagnose_failed_bulk_write,
+    diagnose_failed_write,
+    write_returning_query,
+)
+from app.v1.api.error_handlers import handle_db_errors
+from app.v1.models.bulk import BulkWriteStatus, BulkWriteStatusValue
+
+
+def _resource_noun(model: type[WriteableModel]) -> str:
+    """E.g. "workout type" for WorkoutType."""
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", model.__name__).lower()
+
+
+async def write_one(
+    session: AsyncSession,
+    model: type[WriteableModel],
+    id: UUID,
+    current_user: Principal,
+    values: dict[str, Any],
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> Row:
+    """
+    Update (or soft-delete) one record in a single statement, and commit.
+
+    Raise a 404 if the record doesn't exist or a new reference can't be found, and a
+    401 if the user can see the record but isn't allowed to change it.
+    """
+    query = write_returning_query(
+        model, id, current_user, values, write=write, references=references
+    )
+    async with handle_db_errors(session):
+        record = (await session.execute(query)).one_or_none()
+        if record is not None:
+            await session.commit()
+            return record
+
+    raise await failed_write_exception(
+        session, model, id, current_user, write=write, references=references
+    )
+
+
+async def failed_write_exception(
+    session: AsyncSession,
+    model: type[WriteableModel],
+    id: UUID,
+    current_user: Principal,
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> HTTPException:
+    """
+    Build the error for a write_returning_query that didn't return a row.
+    """
+    noun = _resource_noun(model)
+    reason = await diagnose_failed_write(
+        session, model, id, current_user, write=write, references=references
+    )
+    match reason.failure:
+        case WriteFailure.NOT_PERMITTED:
+            return HTTPException(
+                status_code=401,
+                detail=(
+                    f"you do not have permissions to {write.value} {noun} "
+                    f"with id '{id}'"
+                ),
+            )
+        case WriteFailure.MISSING_REFERENCE:
+            ref = reason.missing_reference
+            assert ref is not None
+            return HTTPException(
+                status_code=404,
+                detail=f"resource not found: ({ref.ref_type}:{ref.ref_id})",
+            )
+        case _:
+            return HTTPException(
+                status_code=404, detail=f"{noun} with id '{id}' not found"
+            )
+
+
+async def write_many(
+    session: AsyncSession,
+    model: type[WriteableModel],
+    ids: list[UUID],
+    current_user: Principal,
+    values: dict[str, Any],
+    write: Write = Write.UPDATE,
+    references: Select | None = None,
+) -> list[BulkWriteStatus]:
+    """
+    Make the same change to (or soft-delete) many records in one statement.
+
+    Nothing is committed, so callers can add to the transaction (e.g. its lifecycle
+    event) first.
+
+    Records that can't be written are reported in the results rather than failing the
+    whole request, except that a missing reference is a 404, since it applies to
+    every record alike. An update that doesn't change anything is a 422, rather than
+    reporting every record as updated.
+    """
+    if write is Write.UPDATE and not values:
+        raise HTTPException(
+            status_code=422,
+            detail="no fields to update",
+        )
+    ids = list(dict.fromkeys(ids))
+    query = bulk_write_returning_query(
+        model, ids, current_user, values, write=write, references=references
+    )
+    async with handle_db_errors(session):
+        written = {row.id for row in await session.execute(query)}
+
+    failures: dict[UUID, WriteFailure] = {}
+    if len(written) < len(ids):
+        if not written and references is not None:
+            missing = (await session.execute(references.limit(1))).first()
+            if missing is not None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"resource not found: ({missing.ref_type}:{missing.ref_id})",
+                )
+        unwritten = [id for id in ids if id not in written]
+        failures = await diagnose_failed_bulk_write(
+            session, model, unwritten, current_user, write=write
+        )
+
+    done: BulkWriteStatusValue = "deleted" if write is Write.DELETE else "updated"
+    results = []
+    for id in ids:
+        status: BulkWriteStatusValue = done
+        if id not in written:
+            not_permitted = failures[id] is WriteFailure.NOT_PERMITTED
+            status = "forbidden" if not_permitted else "not_found"
+        results.append(BulkWriteStatus(id=id, status=status))
+    return results
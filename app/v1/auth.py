@@ -1,19 +1,22 @@
 import os
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from functools import cache
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from sqlalchemy.sql import select
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import db
+from app.db.user_cache import get_user_cache
 from app.v1.models.token import Token
+from app.v1.password_pool import get_password_pool
 
 
-API_JWT_SECRET = os.environ["API_JWT_SECRET"]
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRATION_MINUTES = 60 * 24  # One day
 
@@ -21,16 +24,21 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+@cache
+def get_jwt_secret() -> str:
+    """Read the signing secret lazily, so importing the app doesn't require it."""
+    return os.environ["API_JWT_SECRET"]
+
+
 @dataclass
 class JWT:
     access_token: str
     expiration_timestamp: float
 
 
-def get_user_by_email(session_factory: sessionmaker[Session], email: str) -> db.User:
+async def get_user_by_email(session: AsyncSession, email: str) -> db.User:
     query = select(db.User).filter_by(email=email)
-    with session_factory() as session:
-        user = session.scalars(query).one_or_none()
+    user = (await session.scalars(query)).one_or_none()
     if user is None:
         raise ValueError(f"User with email '{email}' does not exist")
     return user
@@ -44,18 +52,37 @@ def hash_pw(email: str, password: str) -> str:
     return pwd_context.hash(email.lower() + password)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
-) -> db.User:
+async def compare_pw_to_hash_async(
+    email: str, plain_password: str, hashed_password: str
+) -> bool:
     """
-    Return the user model of the owner of an access token. Raise exception if invalid.
+    Check a password on the password pool, keeping bcrypt off the event loop.
     """
-    credentials_exception = HTTPException(
+    return await get_password_pool().run(
+        compare_pw_to_hash, email, plain_password, hashed_password
+    )
+
+
+async def hash_pw_async(email: str, password: str) -> str:
+    """
+    Hash a password on the password pool, keeping bcrypt off the event loop.
+    """
+    return await get_password_pool().run(hash_pw, email, password)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def validate_access_token(token: str) -> dict[str, str]:
+    """
+    Decode an access token and check its claims. Raise exception if invalid.
+    """
+    credentials_exception = _credentials_exception()
     try:
         payload = decode_jwt(token)
         if "sub" not in payload:
@@ -71,28 +98,83 @@ async def get_current_user(
     expire_time = datetime.fromtimestamp(float(payload["exp"]))
     if datetime.utcnow() >= expire_time:
         raise credentials_exception
+    return payload
 
-    user = get_user_by_email(session_factory, email=user_email)
-    if user is None:
-        raise credentials_exception
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(db.get_async_session),
+) -> db.Principal:
+    """
+    Return the identity of the owner of an access token. Raise exception if invalid.
+
+    Tokens carry the user's ID as a claim, so this doesn't query the database; it only
+    checks the user hasn't been deleted (by this process) since. Tokens issued before
+    that claim existed fall back to looking the user up by email.
+    """
+    payload = validate_access_token(token)
+    if "uid" in payload:
+        try:
+            user_id = UUID(payload["uid"])
+        except ValueError:
+            raise _credentials_exception()
+        if get_user_cache().is_revoked(user_id):
+            raise _credentials_exception()
+        return db.Principal(id=user_id, email=payload["sub"])
+
+    user = await get_user_from_claims(payload, session=session)
+    return db.Principal(id=user.id, email=user.email)
+
+
+async def get_current_user_record(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(db.get_async_session),
+) -> db.User:
+    """
+    Return the user model of the owner of an access token. Raise exception if invalid.
+
+    Only needed by endpoints that use the full user row; prefer get_current_user.
+    """
+    payload = validate_access_token(token)
+    return await get_user_from_claims(payload, session=session)
+
+
+async def get_user_from_claims(
+    payload: dict[str, str], session: AsyncSession
+) -> db.User:
+    """
+    Return the user model for the claims of a validated access token.
+
+    Users are cached in-process for (at most) the lifetime of the token.
+    """
+    email = payload["sub"]
+    user_cache = get_user_cache()
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    try:
+        user = await get_user_by_email(session, email=email)
+    except ValueError:
+        raise _credentials_exception()
+    user_cache.put(user, expiration_timestamp=float(payload["exp"]))
     return user
 
 
-def authenticate_user(
+async def authenticate_user(
     email: str,
     password: str,
-    session_factory: sessionmaker[Session] = Depends(db.get_session_factory),
+    session: AsyncSession = Depends(db.get_async_session),
 ) -> db.User | None:
     """
     Given an email & password, return a user if the login is valid; otherwise None.
     """
     # Find the user for this email
     try:
-        user = get_user_by_email(session_factory, email)
+        user = await get_user_by_email(session, email)
     except ValueError:
         return None
     # Confirm the password is correct.
-    is_correct_pw = compare_pw_to_hash(email, password, user.pw_hash)
+    is_correct_pw = await compare_pw_to_hash_async(email, password, user.pw_hash)
     if is_correct_pw:
         return user
     else:
@@ -101,9 +183,12 @@ def authenticate_user(
 
 def create_jwt_token(
     email: str,
+    user_id: UUID,
     expiration_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRATION_MINUTES),
 ) -> Token:
-    jwt = create_jwt(data={"sub": email}, expiration_delta=expiration_delta)
+    jwt = create_jwt(
+        data={"sub": email, "uid": str(user_id)}, expiration_delta=expiration_delta
+    )
     return Token(
         access_token=jwt.access_token,
         token_type="bearer",
@@ -121,7 +206,7 @@ def create_jwt(
     expire_time = datetime.utcnow() + expiration_delta
     expire_time_numeric = int(expire_time.timestamp())
     to_encode = data | {"exp": expire_time_numeric}
-    encoded_jwt = jwt.encode(to_encode, API_JWT_SECRET, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, get_jwt_secret(), algorithm=ALGORITHM)
     return JWT(access_token=encoded_jwt, expiration_timestamp=expire_time_numeric)
 
 
@@ -129,5 +214,5 @@ def decode_jwt(token: str) -> dict[str, str]:
     """
     Decode a jwt for a user, with specified time-to-live.
     """
-    payload = jwt.decode(token, API_JWT_SECRET, algorithms=[ALGORITHM])
+    payload = jwt.decode(token, get_jwt_secret(), algorithms=[ALGORITHM])
     return payload
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cache
+from typing import AsyncIterator, Iterator, NamedTuple, Sequence
+from uuid import UUID
+
+from app.pubsub import Message, unpack_envelope
+
+
+# How many changes can wait for a slow client before it's told to resync instead.
+MAX_QUEUED_CHANGES = 100
+# How often to send something down an idle feed, so proxies don't close it.
+KEEPALIVE_SECONDS = 15.0
+
+
+class Change(NamedTuple):
+    """Records of one kind that a user created, updated or deleted."""
+
+    resource: str
+    action: str
+    ids: list[str]
+
+
+# Sent in place of changes a subscriber fell too far behind to receive: it should
+# refetch everything it shows.
+RESYNC = Change(resource="*", action="resync", ids=[])
+
+
+class ChangeFeedHub:
+    """
+    Fan lifecycle events for changes out to the feeds of the users who made them.
+
+    The app's lifespan adds `dispatch` as a listener on the publisher, so a feed only
+    sees events published by this process. Each subscriber has a bounded queue; one
+    that fills up is cleared and gets RESYNC, so a slow client can't hold up anyone
+    else or use unbounded memory.
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED_CHANGES):
+        self.max_queued = max_queued
+        self._subscribers: dict[str, set[asyncio.Queue[Change]]] = defaultdict(set)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, user_id: UUID) -> Iterator[asyncio.Queue[Change]]:
+        """Receive a user's changes on a queue, until the context exits."""
+        key = str(user_id)
+        queue: asyncio.Queue[Change] = asyncio.Queue(maxsize=self.max_queued)
+        self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[key].discard(queue)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    def dispatch(self, messages: Sequence[Message]) -> None:
+        """Pass each change in a batch of published messages to its user's feeds."""
+        for message in messages:
+            if message.exchange != "lifecycle":
+                continue
+            _, resource, action = message.routing_key.split(".")
+            if action == "read":
+                continue
+            envelope = unpack_envelope(message.body)
+            queues = self._subscribers.get(envelope.fields.get("user_id", ""))
+            if not queues:
+                continue
+            change = Change(resource=resource, action=action, ids=envelope.ids)
+            for queue in queues:
+                self._put(queue, change)
+
+    def _put(self, queue: asyncio.Queue[Change], change: Change) -> None:
+        try:
+            queue.put_nowait(change)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+
+@cache
+def get_change_hub() -> ChangeFeedHub:
+    """Return the process-wide change feed hub."""
+    return ChangeFeedHub()
+
+
+def format_sse(change: Change) -> str:
+    """Encode a change as a Server-Sent Event, named for its action."""
+    data = json.dumps({"resource": change.resource, "ids": change.ids})
+    return f"event: {change.action}\ndata: {data}\n\n"
+
+
+async def sse_chunks(
+    hub: ChangeFeedHub,
+    user_id: UUID,
+    keepalive_seconds: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """Stream a user's changes as Server-Sent Events, until the client goes away."""
+    with hub.subscribe(user_id) as queue:
+        # Lets the client know it's subscribed, so it can fetch its starting state.
+        yield ": connected\n\n"
+        while True:
+            try:
+                change = await asyncio.wait_for(queue.get(), keepalive_seconds)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(change)
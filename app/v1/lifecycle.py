@@ -1,15 +1,18 @@
 from uuid import UUID
 from enum import Enum
 import json
-from typing import Any
+from typing import Any, Iterable, Sequence
 
 
 from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Message as ASGIMessage, Receive, Scope, Send
 
-from app.db.database import Base
+from app.db.database import Base, get_async_session
+from app.db.outbox import add_outbox_messages, add_outbox_messages_on_commit
 from app.v1.auth import get_current_user
-from app.pubsub import publish
-from app.db.models import User
+from app.pubsub import Message, pack_envelopes, publish
+from app.db.models import Principal
 
 
 OrmModelType = type[Base]
@@ -38,49 +41,120 @@ class LifecyclePublisher:
     A FastAPI dependency that publishes lifecycle events for a resource.
 
     Meant to be attached as a dependency to the FastAPI router for the resource.
+
+    Events for changes are written to the outbox when the request's session commits,
+    in the same transaction, so an event is published if and only if its change was
+    committed. Reads don't commit anything, so their events are published by
+    LifecycleEventMiddleware once the response has been sent, and only if it was a
+    success. Routers with busy reads can turn read events off with `publish_reads`.
     """
 
-    def __init__(self, resource: OrmModelType):
+    def __init__(self, resource: OrmModelType, publish_reads: bool = True):
         self.resource = resource
         self.resource_name = resource.__name__
+        self.publish_reads = publish_reads
 
     async def __call__(
         self,
         request: Request,
-        current_user: User = Depends(get_current_user),
-    ):
-        """Publish the appropriate lifecycle event for the resource."""
+        current_user: Principal = Depends(get_current_user),
+        session: AsyncSession = Depends(get_async_session),
+    ) -> None:
+        """Arrange for the appropriate lifecycle event for the resource."""
         if request.method not in method_to_crud_map:
             # We don't publish events for methods that don't map to CRUD actions.
-            yield
             return
-
         action = method_to_crud_map[request.method]
-        resource_id = request.path_params.get("id")
-        # Problem: we don't actually know if the request was successful, since we don't
-        # have access to the response here.
-        # If I can find a way to get at the response, it would be best to only send this
-        # on 2xx responses.
-        # Keep an eye on this issue: https://github.com/tiangolo/fastapi/issues/3500
-        publish_lifeycle_event(
-            resource=self.resource,
-            action=action,
-            resource_id=resource_id,
-            user=current_user.email,
-        )
-
-        yield
-
-
-def publish_lifeycle_event(
+        if action is Action.READ and not self.publish_reads:
+            return
+        # Endpoints for a single record take its id as a query param.
+        resource_id = request.path_params.get("id") or request.query_params.get("id")
+
+        def events() -> list[Message]:
+            if getattr(request.state, "skip_lifecycle_event", False):
+                return []
+            resource_ids = getattr(request.state, "lifecycle_resource_ids", None)
+            if resource_ids == []:
+                # A bulk change that didn't change anything.
+                return []
+            return lifecycle_messages(
+                resource=self.resource,
+                action=action,
+                resource_id=resource_id,
+                resource_ids=resource_ids,
+                user=current_user.email,
+                user_id=current_user.id,
+            )
+
+        if action is Action.READ:
+            request.state.lifecycle_events_after_response = events
+        else:
+            add_outbox_messages_on_commit(session, events)
+
+
+class LifecycleEventMiddleware:
+    """
+    Publish a request's read events once its response has been sent, if it was a 2xx.
+
+    A plain ASGI middleware, so it sees the status of every response, including
+    streamed ones and errors raised before the endpoint runs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # The endpoint sees this as request.state.
+        state = scope.setdefault("state", {})
+        status_code = None
+
+        async def send_and_record_status(message: ASGIMessage) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_and_record_status)
+        events = state.get("lifecycle_events_after_response")
+        if events is None or status_code is None or not 200 <= status_code < 300:
+            return
+        for message in events():
+            await publish(message.body, message.exchange, message.routing_key)
+
+
+def record_lifecycle_ids(request: Request, ids: Iterable[UUID]) -> None:
+    """
+    Have the lifecycle event for this request cover these resources.
+
+    Bulk endpoints use this to publish one event for all the records they changed,
+    rather than one per record; see `lifecycle_messages`.
+    """
+    request.state.lifecycle_resource_ids = [str(id) for id in ids]
+
+
+def skip_lifecycle_event(request: Request) -> None:
+    """Don't publish a lifecycle event for this request, e.g. because it's a replay."""
+    request.state.skip_lifecycle_event = True
+
+
+def lifecycle_messages(
     resource: OrmModelType,
     action: Action,
-    resource_id: UUID | None = None,
+    resource_id: UUID | str | None = None,
+    resource_ids: Sequence[UUID | str] | None = None,
     user: str | None = None,
+    user_id: UUID | None = None,
     metadata: dict[str, Any] | None = None,
-) -> None:
+) -> list[Message]:
     """
-    Publish a CRUD event for a resource.
+    Build the messages for a CRUD event on a resource.
+
+    An event about many records is one batch envelope (see app.pubsub.envelope)
+    carrying all their ids, split into parts only if it's too big for one message.
+    Anything else is a single message.
 
     Parameters
     ----------
@@ -90,16 +164,50 @@ def publish_lifeycle_event(
         The action type to publish an event for.
     resource_id
         The id of the relevant resource, if applicable.
+    resource_ids
+        The ids of the relevant resources, for an event about many of them.
     user
         The username of the user that triggered the event, if applicable.
+    user_id
+        The id of that user, so that their change feed can pick the event up.
     metadata
         Any additional metadata to include in the event message.
     """
     routing_key = f"lifecycle.{resource.__tablename__}.{action.name}".lower()
-    data = metadata or {}
+    data = dict(metadata or {})
     if user is not None:
         data["user"] = user
+    if user_id is not None:
+        data["user_id"] = str(user_id)
     if resource_id is not None:
         data["id"] = str(resource_id)
-    payload = json.dumps(data)
-    publish(exchange="lifecycle", message=payload, routing_key=routing_key)
+    if resource_ids is None:
+        bodies = [json.dumps(data)]
+    else:
+        bodies = pack_envelopes([str(id) for id in resource_ids], data)
+    return [
+        Message(exchange="lifecycle", routing_key=routing_key, body=body)
+        for body in bodies
+    ]
+
+
+def add_lifecycle_event(
+    session: AsyncSession,
+    resource: OrmModelType,
+    action: Action,
+    resource_id: UUID | None = None,
+    resource_ids: Sequence[UUID] | None = None,
+    user: str | None = None,
+    user_id: UUID | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> None:
+    """
+    Write a CRUD event for a resource to the outbox, in the session's transaction.
+
+    For endpoints that don't have a LifecyclePublisher, or that change several kinds
+    of resource at once. It's published once the session commits.
+    """
+    messages = lifecycle_messages(
+        resource, action, resource_id, resource_ids, user, user_id, metadata
+    )
+    add_outbox_messages(session, messages)
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.routers import routers
+from .lifecycle import LifecycleEventMiddleware
 
 
 ORIGINS = [
@@ -11,6 +12,7 @@ ORIGINS = [
 ]
 
 v1_app = FastAPI()
+v1_app.add_middleware(LifecycleEventMiddleware)
 v1_app.add_middleware(
     CORSMiddleware,
     allow_origins=ORIGINS,
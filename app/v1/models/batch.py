@@ -0,0 +1,44 @@
+from typing import Any, Literal, TypeAlias
+from uuid import UUID
+
+from pydantic import BaseModel, Field, root_validator
+
+
+BatchOp: TypeAlias = Literal["create", "update", "delete"]
+BatchResource: TypeAlias = Literal[
+    "workout", "exercise", "workout_type", "exercise_type"
+]
+
+# The most operations that can be sent in one batch.
+MAX_BATCH_OPERATIONS = 1000
+
+
+class BatchOperation(BaseModel):
+    op: BatchOp
+    resource: BatchResource
+    # Required for updates and deletes. Creates can pass one to choose the new record's
+    # ID, so that later operations in the same batch can refer to it.
+    id: UUID | None
+    # The record's fields for creates, or just the fields to change for updates.
+    data: dict[str, Any] = Field(default_factory=dict)
+
+    @root_validator(skip_on_failure=True)
+    def id_is_required_to_change_a_record(cls, values: dict[str, Any]):
+        if values["op"] != "create" and values["id"] is None:
+            raise ValueError(f"an id is required to {values['op']} a record")
+        return values
+
+
+class BatchIn(BaseModel):
+    operations: list[BatchOperation] = Field(max_items=MAX_BATCH_OPERATIONS)
+
+
+class BatchOperationResult(BaseModel):
+    op: BatchOp
+    resource: BatchResource
+    # The record as it is after the operation.
+    record: dict[str, Any]
+
+
+class BatchResult(BaseModel):
+    results: list[BatchOperationResult]
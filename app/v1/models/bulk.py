@@ -0,0 +1,37 @@
+from typing import Literal, TypeAlias
+from uuid import UUID
+
+from pydantic import BaseModel, ConstrainedList
+
+
+# The most records that can be changed in one bulk request.
+MAX_BULK_IDS = 1000
+
+
+class BulkIds(ConstrainedList):
+    """
+    The IDs of the records a bulk request changes.
+
+    This is what `conlist` builds, but declared as a class so it can be used as a
+    type annotation.
+    """
+
+    item_type = UUID
+    __args__ = (UUID,)
+    min_items = 1
+    max_items = MAX_BULK_IDS
+
+
+BulkWriteStatusValue: TypeAlias = Literal[
+    "updated", "deleted", "not_found", "forbidden"
+]
+
+
+class BulkWriteStatus(BaseModel):
+    id: UUID
+    status: BulkWriteStatusValue
+
+
+class BulkWriteResult(BaseModel):
+    # One status per requested ID, in the order they were requested.
+    results: list[BulkWriteStatus]
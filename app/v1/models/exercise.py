@@ -1,6 +1,6 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
-from typing import TypeAlias, Literal
+from typing import Any, TypeAlias, Literal
 
 from pydantic import BaseModel
 
@@ -39,18 +39,37 @@ class ExerciseIn(BaseModel):
             user_id=user_id,
         )
 
-    def update_orm_model(self, model: Exercise) -> None:
+    def to_row(self, user_id: UUID) -> dict[str, Any]:
         """
-        Update a sqlalchemy object in-place with these values.
+        Convert to a dict of column values for a bulk insert, with a new ID.
         """
-        model.start_time = self.start_time
-        model.weight = self.weight
-        model.weight_unit = self.weight_unit
-        model.reps = self.reps
-        model.seconds = self.seconds
-        model.notes = self.notes
-        model.exercise_type_id = self.exercise_type_id
-        model.workout_id = self.workout_id
+        return {
+            "id": uuid4(),
+            "start_time": self.start_time,
+            "weight": self.weight,
+            "weight_unit": self.weight_unit,
+            "reps": self.reps,
+            "seconds": self.seconds,
+            "notes": self.notes,
+            "exercise_type_id": self.exercise_type_id,
+            "workout_id": self.workout_id,
+            "user_id": user_id,
+        }
+
+    def to_values(self) -> dict[str, Any]:
+        """
+        Convert to a dict of column values for an update.
+        """
+        return {
+            "start_time": self.start_time,
+            "weight": self.weight,
+            "weight_unit": self.weight_unit,
+            "reps": self.reps,
+            "seconds": self.seconds,
+            "notes": self.notes,
+            "exercise_type_id": self.exercise_type_id,
+            "workout_id": self.workout_id,
+        }
 
 
 class ExerciseInDB(ExerciseIn):
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    rejected: int
+    # Only the first few errors are listed, in line order.
+    errors: list[ImportRowError]
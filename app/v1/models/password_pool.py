@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class PasswordPoolStatus(BaseModel):
+    max_workers: int
+    queued: int
+    running: int
+    submitted: int
+    completed: int
+    mean_queue_seconds: float
+    max_queue_seconds: float
+    mean_run_seconds: float
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    timeout: float
+    # Checkout wait times, since the pool was created.
+    checkouts: int
+    total_wait_seconds: float
+    mean_wait_seconds: float
+    max_wait_seconds: float
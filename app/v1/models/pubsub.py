@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class PublisherStatus(BaseModel):
+    running: bool
+    transport: str
+    overflow: str
+    max_queued: int
+    queued: int
+    enqueued: int
+    dropped: int
+    published: int
+    failed: int
+    batches: int
+    mean_batch_size: float
+    mean_send_seconds: float
+    max_send_seconds: float
+    published_per_second: float
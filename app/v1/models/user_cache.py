@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class UserCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
@@ -1,6 +1,6 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
-from typing import Literal, TypeAlias
+from typing import Any, Literal, TypeAlias
 
 from pydantic import BaseModel
 
@@ -32,15 +32,31 @@ class WorkoutIn(BaseModel):
             user_id=user_id,
         )
 
-    def update_orm_model(self, model: Workout) -> None:
+    def to_row(self, user_id: UUID) -> dict[str, Any]:
         """
-        Update a sqlalchemy object in-place with these values.
+        Convert to a dict of column values for a bulk insert, with a new ID.
         """
-        model.start_time = self.start_time
-        model.end_time = self.end_time
-        model.status = self.status
-        model.notes = self.notes
-        model.workout_type_id = self.workout_type_id
+        return {
+            "id": uuid4(),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "notes": self.notes,
+            "workout_type_id": self.workout_type_id,
+            "user_id": user_id,
+        }
+
+    def to_values(self) -> dict[str, Any]:
+        """
+        Convert to a dict of column values for an update.
+        """
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "notes": self.notes,
+            "workout_type_id": self.workout_type_id,
+        }
 
 
 class WorkoutInDB(WorkoutIn):
@@ -1,4 +1,5 @@
-from uuid import UUID
+from typing import Any
+from uuid import UUID, uuid4
 
 from pydantic import BaseModel
 
@@ -21,13 +22,27 @@ class WorkoutTypeIn(BaseModel):
             owner_user_id=owner_user_id,
         )
 
-    def update_orm_model(self, model: WorkoutType) -> None:
+    def to_row(self, owner_user_id: UUID | None) -> dict[str, Any]:
         """
-        Update a sqlalchemy object in-place with these values.
+        Convert to a dict of column values for a bulk insert, with a new ID.
         """
-        model.name = self.name
-        model.notes = self.notes
-        model.parent_workout_type_id = self.parent_workout_type_id
+        return {
+            "id": uuid4(),
+            "name": self.name,
+            "notes": self.notes,
+            "parent_workout_type_id": self.parent_workout_type_id,
+            "owner_user_id": owner_user_id,
+        }
+
+    def to_values(self) -> dict[str, Any]:
+        """
+        Convert to a dict of column values for an update.
+        """
+        return {
+            "name": self.name,
+            "notes": self.notes,
+            "parent_workout_type_id": self.parent_workout_type_id,
+        }
 
 
 class WorkoutTypeInDB(WorkoutTypeIn):
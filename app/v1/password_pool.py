@@ -0,0 +1,114 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+from time import perf_counter
+from typing import Any, Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class PasswordPoolStats:
+    """Running totals of how long password work waited for, and spent in, a worker."""
+
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    total_queue_seconds: float = 0.0
+    max_queue_seconds: float = 0.0
+    total_run_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def record_start(self, queue_seconds: float) -> None:
+        with self._lock:
+            self.started += 1
+            self.total_queue_seconds += queue_seconds
+            self.max_queue_seconds = max(self.max_queue_seconds, queue_seconds)
+
+    def record_finish(self, run_seconds: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.total_run_seconds += run_seconds
+
+
+class PasswordPool:
+    """
+    A bounded pool of threads for bcrypt work, so it never runs on the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism here. At
+    most `max_workers` hashes run at once; further calls queue for a free worker.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.stats = PasswordPoolStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on a worker thread and wait for its result."""
+        submitted_at = perf_counter()
+
+        def timed() -> T:
+            started_at = perf_counter()
+            self.stats.record_start(started_at - submitted_at)
+            try:
+                return fn(*args)
+            finally:
+                self.stats.record_finish(perf_counter() - started_at)
+
+        self.stats.record_submit()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, timed)
+
+    def status(self) -> dict[str, Any]:
+        stats = self.stats
+        with stats._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": stats.submitted - stats.started,
+                "running": stats.started - stats.completed,
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "mean_queue_seconds": (
+                    stats.total_queue_seconds / stats.started if stats.started else 0.0
+                ),
+                "max_queue_seconds": stats.max_queue_seconds,
+                "mean_run_seconds": (
+                    stats.total_run_seconds / stats.completed
+                    if stats.completed
+                    else 0.0
+                ),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+@cache
+def get_password_pool() -> PasswordPool:
+    """
+    Return the process-wide password pool.
+
+    Its size comes from PASSWORD_HASH_WORKERS, defaulting to the number of CPUs (up to
+    4) so that a burst of logins can't use every core.
+    """
+    default_workers = min(4, os.cpu_count() or 1)
+    max_workers = int(os.environ.get("PASSWORD_HASH_WORKERS", default_workers))
+    return PasswordPool(max_workers=max_workers)
+
+
+def shutdown_password_pool() -> None:
+    """Shut down the password pool, if one was created."""
+    if get_password_pool.cache_info().currsize:
+        get_password_pool().shutdown()
+        get_password_pool.cache_clear()
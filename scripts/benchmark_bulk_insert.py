@@ -0,0 +1,119 @@
+"""
+Compare inserting exercises through the ORM unit of work against the bulk path.
+
+The ORM path is what POST /exercises used to do (session.add_all, then commit); the
+bulk path is what it does now (batched INSERT ... RETURNING). Requires a database at
+$DATABASE_URL with the current schema. A throwaway user, workout and exercise type are
+created for the run and hard-deleted afterwards.
+
+    python scripts/benchmark_bulk_insert.py --sizes 10 1000 10000 --runs 3
+"""
+import argparse
+import asyncio
+import statistics
+from string import ascii_letters
+from random import choices
+from time import perf_counter
+from typing import Awaitable, Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import delete
+
+from app import db
+from app.db.bulk import bulk_insert_returning
+from app.db.database import dispose_engines, get_async_sessionmaker
+from app.db.utils import recursive_hard_delete
+from app.v1.models.exercise import ExerciseIn
+
+
+async def orm_insert(
+    session: AsyncSession, exercises: list[ExerciseIn], user_id: UUID
+) -> int:
+    records = [ex.to_orm_model(user_id=user_id) for ex in exercises]
+    session.add_all(records)
+    await session.commit()
+    # Touch the records the way the response serialization used to.
+    return len([r.id for r in records])
+
+
+async def bulk_insert(
+    session: AsyncSession, exercises: list[ExerciseIn], user_id: UUID
+) -> int:
+    rows = [ex.to_row(user_id=user_id) for ex in exercises]
+    records = await bulk_insert_returning(session, db.Exercise, rows)
+    await session.commit()
+    return len(records)
+
+
+async def time_insert(
+    insert: Callable[[AsyncSession, list[ExerciseIn], UUID], Awaitable[int]],
+    exercises: list[ExerciseIn],
+    user_id: UUID,
+) -> float:
+    session_factory = get_async_sessionmaker()
+    async with session_factory() as session:
+        start = perf_counter()
+        count = await insert(session, exercises, user_id)
+        elapsed = perf_counter() - start
+        assert count == len(exercises)
+        await session.execute(delete(db.Exercise).where(db.Exercise.user_id == user_id))
+        await session.commit()
+    return elapsed
+
+
+async def run(sizes: list[int], runs: int) -> None:
+    session_factory = get_async_sessionmaker()
+    user = db.User(
+        id=uuid4(),
+        email=f"benchmark-{''.join(choices(ascii_letters, k=15))}@example.com",
+        pw_hash="not-a-real-hash",
+    )
+    exercise_type = db.ExerciseType(id=uuid4(), name="Benchmark", owner_user_id=user.id)
+    workout = db.Workout(id=uuid4(), status="completed", user_id=user.id)
+    async with session_factory() as session:
+        session.add(user)
+        await session.flush()
+        session.add_all([exercise_type, workout])
+        await session.commit()
+
+    try:
+        print(f"{'rows':>8} {'orm (ms)':>12} {'bulk (ms)':>12} {'speedup':>8}")
+        for size in sizes:
+            exercises = [
+                ExerciseIn(
+                    start_time=None,
+                    weight=100,
+                    weight_unit="pounds",
+                    reps=i % 12,
+                    seconds=None,
+                    notes=None,
+                    exercise_type_id=exercise_type.id,
+                    workout_id=workout.id,
+                )
+                for i in range(size)
+            ]
+            orm_times, bulk_times = [], []
+            for _ in range(runs):
+                orm_times.append(await time_insert(orm_insert, exercises, user.id))
+                bulk_times.append(await time_insert(bulk_insert, exercises, user.id))
+            orm_ms = statistics.median(orm_times) * 1000
+            bulk_ms = statistics.median(bulk_times) * 1000
+            print(
+                f"{size:>8} {orm_ms:>12.1f} {bulk_ms:>12.1f} {orm_ms / bulk_ms:>7.1f}x"
+            )
+    finally:
+        recursive_hard_delete(user.id, db.get_session_factory_sync())
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.runs))
+
+
+if __name__ == "__main__":
+    main()
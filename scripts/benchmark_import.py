@@ -0,0 +1,71 @@
+"""
+Measure how long a cold import of the app takes.
+
+Each run imports the module in a fresh interpreter, so nothing is cached between runs.
+No database needs to be running; a placeholder DATABASE_URL is used if none is set.
+
+    python scripts/benchmark_import.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_once(module: str, env: dict[str, str]) -> tuple[float, str]:
+    """Import the module in a new interpreter; return wall time and -X importtime log."""
+    start = perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return perf_counter() - start, result.stderr
+
+
+def slowest_imports(importtime_log: str, n: int) -> list[tuple[int, str]]:
+    """Parse -X importtime output into the n slowest (cumulative µs, module) pairs."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # Lines look like: "import time:  <self us> | <cumulative us> | <module>"
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    env = os.environ.copy()
+    env.setdefault("DATABASE_URL", "postgresql://nobody@localhost:1/nothing")
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, log = import_once(args.module, env)
+        timings.append(elapsed)
+
+    print(f"import {args.module} ({args.runs} runs)")
+    print(f"  min:    {min(timings) * 1000:8.1f} ms")
+    print(f"  median: {statistics.median(timings) * 1000:8.1f} ms")
+    print(f"  max:    {max(timings) * 1000:8.1f} ms")
+    print("slowest imports (cumulative, last run):")
+    for cumulative_us, name in slowest_imports(log, args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
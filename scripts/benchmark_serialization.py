@@ -0,0 +1,125 @@
+"""
+Compare the per-row cost of serializing read_workouts/read_exercises responses.
+
+"before" is what FastAPI does with a response_model: validate each ORM object with
+`from_orm`, run the result through jsonable_encoder, then json.dumps it. "after" is the
+RowSerializer fast path: encode Core rows directly. The rows are built in memory, so
+no database is needed and only serialization is measured -- the real "before" path
+also pays for hydrating ORM objects, which this leaves out.
+
+    python scripts/benchmark_serialization.py --rows 1000 --runs 20
+"""
+import argparse
+import os
+import statistics
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Any, Callable
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", "postgresql://nobody@localhost:1/nothing")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+from sqlalchemy.engine.result import result_tuple  # noqa: E402
+
+from app import db  # noqa: E402
+from app.v1.api.serialization import RowSerializer  # noqa: E402
+from app.v1.models.exercise import ExerciseInDB  # noqa: E402
+from app.v1.models.workout import WorkoutInDB  # noqa: E402
+
+
+def workout_values(i: int) -> dict[str, Any]:
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(days=i)
+    return {
+        "id": uuid4(),
+        "start_time": start,
+        "end_time": start + timedelta(hours=1),
+        "status": "completed",
+        "notes": None,
+        "workout_type_id": uuid4(),
+        "user_id": uuid4(),
+    }
+
+
+def exercise_values(i: int) -> dict[str, Any]:
+    return {
+        "id": uuid4(),
+        "start_time": datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i),
+        "weight": 100.0,
+        "weight_unit": "pounds",
+        "reps": 8,
+        "seconds": None,
+        "notes": "a set",
+        "exercise_type_id": uuid4(),
+        "workout_id": uuid4(),
+        "user_id": uuid4(),
+    }
+
+
+def time_per_row(fn: Callable[[], Any], n_rows: int, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return statistics.median(timings) / n_rows
+
+
+def benchmark(
+    name: str,
+    response_model: type[BaseModel],
+    orm_model: type[db.Base],
+    make_values: Callable[[int], dict[str, Any]],
+    n_rows: int,
+    runs: int,
+) -> None:
+    serializer = RowSerializer(response_model, orm_model)
+    values = [make_values(i) for i in range(n_rows)]
+    objects = [orm_model(**v) for v in values]
+    make_row = result_tuple(serializer.fields)
+    rows = [make_row(tuple(v[f] for f in serializer.fields)) for v in values]
+
+    def before() -> bytes:
+        validated = [response_model.from_orm(obj) for obj in objects]
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def after() -> bytes:
+        return serializer.encode(rows)
+
+    before_us = time_per_row(before, n_rows, runs) * 1e6
+    after_us = time_per_row(after, n_rows, runs) * 1e6
+    print(
+        f"{name:<16} {before_us:>10.2f} {after_us:>10.2f} {before_us / after_us:>7.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"per-row cost over {args.rows} rows (median of {args.runs} runs)")
+    print(f"{'endpoint':<16} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    benchmark(
+        "read_workouts",
+        WorkoutInDB,
+        db.Workout,
+        workout_values,
+        args.rows,
+        args.runs,
+    )
+    benchmark(
+        "read_exercises",
+        ExerciseInDB,
+        db.Exercise,
+        exercise_values,
+        args.rows,
+        args.runs,
+    )
+
+
+if __name__ == "__main__":
+    main()
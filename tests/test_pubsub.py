@@ -0,0 +1,185 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Sequence
+from uuid import uuid4
+
+import pytest
+
+from app.pubsub import (
+    Envelope,
+    FileTransport,
+    InMemoryTransport,
+    Message,
+    OverflowPolicy,
+    Publisher,
+    pack_envelopes,
+    unpack_envelope,
+)
+
+
+def message(i: int) -> Message:
+    return Message("lifecycle", "lifecycle.workouts.create", json.dumps({"i": i}))
+
+
+class SlowTransport(InMemoryTransport):
+    """Hold up every batch until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send(self, messages: Sequence[Message]) -> None:
+        await self.release.wait()
+        await super().send(messages)
+
+
+class FailingTransport(InMemoryTransport):
+    async def send(self, messages: Sequence[Message]) -> None:
+        raise ConnectionError("broker is down")
+
+
+@pytest.mark.anyio
+async def test_messages_are_sent_in_batches_in_order():
+    transport = InMemoryTransport()
+    publisher = Publisher(transport, batch_size=3, flush_interval=0.05)
+    publisher.start()
+    for i in range(7):
+        await publisher.publish(message(i))
+    await publisher.stop()
+
+    assert transport.messages == [message(i) for i in range(7)]
+    assert [len(batch) for batch in transport.batches] == [3, 3, 1]
+    status = publisher.status()
+    assert (status["enqueued"], status["published"], status["batches"]) == (7, 7, 3)
+    assert not status["running"]
+
+
+@pytest.mark.anyio
+async def test_partial_batch_is_sent_after_flush_interval():
+    transport = InMemoryTransport()
+    publisher = Publisher(transport, batch_size=100, flush_interval=0.01)
+    publisher.start()
+    await publisher.publish(message(0))
+    await asyncio.sleep(0.1)
+    assert transport.batches == [[message(0)]]
+    await publisher.stop()
+
+
+@pytest.mark.anyio
+async def test_full_queue_drops_new_messages():
+    transport = SlowTransport()
+    publisher = Publisher(transport, queue_size=2, batch_size=1, flush_interval=0)
+    publisher.start()
+    for i in range(5):
+        await publisher.publish(message(i))
+        await asyncio.sleep(0)
+    # One message is held by the transport, two are queued and the rest are dropped.
+    status = publisher.status()
+    assert (status["queued"], status["enqueued"], status["dropped"]) == (2, 3, 2)
+    transport.release.set()
+    await publisher.stop()
+    assert transport.messages == [message(i) for i in range(3)]
+
+
+@pytest.mark.anyio
+async def test_block_policy_waits_for_room():
+    transport = SlowTransport()
+    publisher = Publisher(
+        transport,
+        queue_size=1,
+        batch_size=1,
+        flush_interval=0,
+        overflow=OverflowPolicy.BLOCK,
+        block_timeout=5,
+    )
+    publisher.start()
+    await publisher.publish(message(0))
+    await asyncio.sleep(0)
+    await publisher.publish(message(1))
+    blocked = asyncio.create_task(publisher.publish(message(2)))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    transport.release.set()
+    await blocked
+    await publisher.stop()
+    assert transport.messages == [message(i) for i in range(3)]
+    assert publisher.status()["dropped"] == 0
+
+
+@pytest.mark.anyio
+async def test_block_policy_gives_up_after_timeout():
+    transport = SlowTransport()
+    publisher = Publisher(
+        transport,
+        queue_size=1,
+        batch_size=1,
+        flush_interval=0,
+        overflow=OverflowPolicy.BLOCK,
+        block_timeout=0.01,
+    )
+    publisher.start()
+    for i in range(3):
+        await publisher.publish(message(i))
+        await asyncio.sleep(0)
+    assert publisher.status()["dropped"] == 1
+    transport.release.set()
+    await publisher.stop()
+
+
+@pytest.mark.anyio
+async def test_failed_batches_are_counted_and_publishing_continues():
+    publisher = Publisher(FailingTransport(), batch_size=2, flush_interval=0)
+    publisher.start()
+    for i in range(3):
+        await publisher.publish(message(i))
+    await publisher.stop()
+    status = publisher.status()
+    assert (status["published"], status["failed"]) == (0, 3)
+
+
+@pytest.mark.anyio
+async def test_listeners_see_sent_batches_until_removed():
+    batches: list[Sequence[Message]] = []
+    publisher = Publisher(InMemoryTransport(), batch_size=1, flush_interval=0)
+    publisher.add_listener(batches.append)
+    await publisher.send([message(0)])
+    publisher.remove_listener(batches.append)
+    await publisher.send([message(1)])
+    assert batches == [[message(0)]]
+
+
+@pytest.mark.anyio
+async def test_file_transport_appends_ndjson(tmp_path: Path):
+    path = tmp_path / "events.ndjson"
+    publisher = Publisher(FileTransport(path), batch_size=2)
+    publisher.start()
+    for i in range(3):
+        await publisher.publish(message(i))
+    await publisher.stop()
+    lines = path.read_text().splitlines()
+    assert [Message(**json.loads(line)) for line in lines] == [
+        message(i) for i in range(3)
+    ]
+
+
+def test_envelopes_split_by_count_and_size():
+    ids = [str(uuid4()) for _ in range(25)]
+    bodies = pack_envelopes(ids, {"user": "vin@luthadel.gov"}, max_ids=10)
+    envelopes = [unpack_envelope(body) for body in bodies]
+    assert [len(e.ids) for e in envelopes] == [10, 10, 5]
+    assert [(e.part, e.parts) for e in envelopes] == [(1, 3), (2, 3), (3, 3)]
+    assert [id for e in envelopes for id in e.ids] == ids
+    assert all(e.fields == {"user": "vin@luthadel.gov"} for e in envelopes)
+
+    bodies = pack_envelopes(ids, {}, max_bytes=500)
+    assert all(len(body) <= 500 for body in bodies)
+    assert [id for body in bodies for id in unpack_envelope(body).ids] == ids
+
+
+def test_single_record_messages_unpack_as_envelopes():
+    id = str(uuid4())
+    assert unpack_envelope(json.dumps({"id": id, "user": "vin@luthadel.gov"})) == (
+        Envelope(ids=[id], fields={"user": "vin@luthadel.gov"})
+    )
+    assert unpack_envelope("{}") == Envelope(ids=[], fields={})
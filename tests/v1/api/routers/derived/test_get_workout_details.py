@@ -156,3 +156,24 @@ def test_without_id_returns_all_workout_details(
             assert {str(exercise["id"]) for exercise in item["exercises"]} == {
                 other_exercise_id
             }
+
+
+def test_limit_counts_workouts_not_exercises(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workout_and_exercise_type: tuple[Workout, ExerciseType],
+    primary_user_exercises: tuple[Exercise, ...],
+    primary_user_exercise_of_different_type_and_workout: tuple[
+        Workout, ExerciseType, Exercise
+    ],
+):
+    response = client.get(ROUTE, params={"limit": 1}, headers=primary_test_user.auth)
+    assert response.status_code == 200
+    payload = response.json()
+    # Only one workout comes back, but with all of its exercises attached.
+    assert len(payload) == 1
+    (item,) = payload
+    workout_id = item["workout"]["id"]
+    assert len(item["exercises"]) > 0
+    for exercise in item["exercises"]:
+        assert exercise["workout_id"] == workout_id
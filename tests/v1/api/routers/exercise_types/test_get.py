@@ -1,3 +1,4 @@
+import json
 from uuid import UUID
 
 from fastapi.testclient import TestClient
@@ -110,3 +111,24 @@ def test_filtering(
     payload = response.json()
     assert len(payload) == 1
     assert payload[0]["id"] == str(primary_user_exercise_types[1].id)
+
+
+def test_ndjson_streaming_matches_json(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercise_types: tuple[ExerciseType, ...],
+):
+    """
+    Asking for NDJSON streams the same records, one per line.
+
+    The list isn't ordered, so the records are compared by id.
+    """
+    expected = client.get(ROUTE, headers=primary_test_user.auth).json()
+    headers = primary_test_user.auth | {"Accept": "application/x-ndjson"}
+    with client.stream("GET", ROUTE, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        streamed = [json.loads(line) for line in response.iter_lines() if line]
+    assert sorted(streamed, key=lambda r: r["id"]) == sorted(
+        expected, key=lambda r: r["id"]
+    )
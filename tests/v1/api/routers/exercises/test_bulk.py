@@ -0,0 +1,109 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import select
+
+from app.db.models.user import UserWithAuth
+from app.db import Exercise, ExerciseType, Workout
+
+
+ROUTE = "/exercises/bulk"
+
+
+def test_bulk_update_reports_status_per_id(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    secondary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+    session_factory: sessionmaker[Session],
+):
+    ids = [ex.id for ex in primary_user_exercises]
+    missing_id = uuid4()
+    payload = {"ids": [str(id) for id in [*ids, missing_id]], "weight": 42}
+
+    # Other users can't see these exercises at all.
+    response = client.patch(ROUTE, json=payload, headers=secondary_test_user.auth)
+    assert response.status_code == 200
+    assert {r["status"] for r in response.json()["results"]} == {"not_found"}
+
+    response = client.patch(ROUTE, json=payload, headers=primary_test_user.auth)
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": str(ids[0]), "status": "updated"},
+        {"id": str(ids[1]), "status": "updated"},
+        {"id": str(missing_id), "status": "not_found"},
+    ]
+    with session_factory() as session:
+        records = session.scalars(select(Exercise).where(Exercise.id.in_(ids)))
+        assert {record.weight for record in records} == {42}
+
+
+def test_bulk_update_with_missing_reference_changes_nothing(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+    secondary_user_workout_and_exercise_type: tuple[Workout, ExerciseType],
+    session_factory: sessionmaker[Session],
+):
+    ids = [ex.id for ex in primary_user_exercises]
+    others_workout, _ = secondary_user_workout_and_exercise_type
+    payload = {"ids": [str(id) for id in ids], "workout_id": str(others_workout.id)}
+    response = client.patch(ROUTE, json=payload, headers=primary_test_user.auth)
+    assert response.status_code == 404
+    with session_factory() as session:
+        records = session.scalars(select(Exercise).where(Exercise.id.in_(ids)))
+        assert others_workout.id not in {record.workout_id for record in records}
+
+
+def test_bulk_delete(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+    session_factory: sessionmaker[Session],
+):
+    ids = [str(ex.id) for ex in primary_user_exercises]
+    response = client.request(
+        "DELETE", ROUTE, json={"ids": ids}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["deleted"] * 2
+    with session_factory() as session:
+        records = session.scalars(
+            select(Exercise).where(
+                Exercise.id.in_(ex.id for ex in primary_user_exercises)
+            )
+        )
+        assert all(record.deleted_at is not None for record in records)
+
+    # They're already deleted now.
+    response = client.request(
+        "DELETE", ROUTE, json={"ids": ids}, headers=primary_test_user.auth
+    )
+    assert [r["status"] for r in response.json()["results"]] == ["not_found"] * 2
+
+
+def test_bulk_requests_need_ids(client: TestClient, primary_test_user: UserWithAuth):
+    response = client.request(
+        "DELETE", ROUTE, json={"ids": []}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 422
+
+
+def test_bulk_update_without_changes_is_rejected(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+    session_factory: sessionmaker[Session],
+):
+    ids = [ex.id for ex in primary_user_exercises]
+    with session_factory() as session:
+        records = session.scalars(select(Exercise).where(Exercise.id.in_(ids)))
+        updated_at = {record.id: record.updated_at for record in records}
+
+    payload = {"ids": [str(id) for id in ids]}
+    response = client.patch(ROUTE, json=payload, headers=primary_test_user.auth)
+    assert response.status_code == 422
+    with session_factory() as session:
+        records = session.scalars(select(Exercise).where(Exercise.id.in_(ids)))
+        assert {record.id: record.updated_at for record in records} == updated_at
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.db.models.user import UserWithAuth
@@ -87,3 +89,37 @@ def test_filtering(
     assert len(payload) == len(primary_user_exercises)
     for exercise in payload:
         assert exercise["exercise_type_id"] == str(ex_tp.id)
+
+
+def test_pagination(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+):
+    response = client.get(ROUTE, params={"limit": 1}, headers=primary_test_user.auth)
+    assert response.status_code == 200
+    (first,) = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+
+    params = {"limit": 1, "after": cursor}
+    response = client.get(ROUTE, params=params, headers=primary_test_user.auth)
+    assert response.status_code == 200
+    (second,) = response.json()
+    assert {first["id"], second["id"]} == {str(ex.id) for ex in primary_user_exercises}
+
+
+def test_ndjson_streaming_matches_json(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+):
+    """
+    Asking for NDJSON streams the same records, one per line.
+    """
+    expected = client.get(ROUTE, headers=primary_test_user.auth).json()
+    headers = primary_test_user.auth | {"Accept": "application/x-ndjson"}
+    with client.stream("GET", ROUTE, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        streamed = [json.loads(line) for line in response.iter_lines() if line]
+    assert streamed == expected
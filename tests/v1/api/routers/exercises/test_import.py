@@ -0,0 +1,115 @@
+import json
+from uuid import UUID, uuid4
+
+from sqlalchemy.sql import select, delete
+from sqlalchemy.orm import sessionmaker, Session
+from fastapi.testclient import TestClient
+
+from app.db.models.user import UserWithAuth
+from app.db.models import Exercise
+
+
+ROUTE = "/exercises/import"
+
+
+def ndjson(*records: object) -> str:
+    return "\n".join(
+        record if isinstance(record, str) else json.dumps(record) for record in records
+    )
+
+
+def test_unauthenticated_user_cant_import_exercises(
+    client: TestClient, postable_payload: dict[str, str]
+):
+    response = client.post(
+        ROUTE,
+        content=ndjson(postable_payload),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 401
+
+
+def test_unsupported_media_type_is_rejected(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    postable_payload: dict[str, str],
+):
+    response = client.post(
+        ROUTE, json=[postable_payload], headers=primary_test_user.auth
+    )
+    assert response.status_code == 415
+
+
+def test_ndjson_import_reports_bad_rows_and_imports_the_rest(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    postable_payload: dict[str, str],
+    session_factory: sessionmaker[Session],
+):
+    body = ndjson(
+        postable_payload | {"notes": "first"},
+        "{not json",
+        postable_payload | {"weight": "heavy"},
+        postable_payload | {"workout_id": str(uuid4())},
+        "",
+        postable_payload | {"notes": "second"},
+    )
+    response = client.post(
+        ROUTE,
+        content=body,
+        headers=primary_test_user.auth | {"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert result["rejected"] == 3
+    assert [error["line"] for error in result["errors"]] == [2, 3, 4]
+    assert "Workout:" in result["errors"][2]["detail"]
+
+    # Clean up and make sure the good rows made it into the db.
+    with session_factory() as session:
+        workout_id = UUID(postable_payload["workout_id"])
+        notes = session.scalars(
+            select(Exercise.notes).where(Exercise.workout_id == workout_id)
+        ).all()
+        assert sorted(notes) == ["first", "second"]
+        session.execute(delete(Exercise).where(Exercise.workout_id == workout_id))
+        session.commit()
+
+
+def test_csv_import(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    postable_payload: dict[str, str],
+    session_factory: sessionmaker[Session],
+):
+    p = postable_payload
+    body = (
+        "start_time,weight,reps,notes,exercise_type_id,workout_id\n"
+        f"{p['start_time']},100,5,,{p['exercise_type_id']},{p['workout_id']}\n"
+        f',105,5,"a note,\nover two lines",{p["exercise_type_id"]},{p["workout_id"]}\n'
+        f"{p['start_time']},110,5\n"
+    )
+    response = client.post(
+        ROUTE,
+        content=body,
+        headers=primary_test_user.auth | {"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["rejected"]) == (2, 1)
+    assert result["errors"][0]["line"] == 5
+
+    with session_factory() as session:
+        workout_id = UUID(p["workout_id"])
+        records = session.scalars(
+            select(Exercise)
+            .where(Exercise.workout_id == workout_id)
+            .order_by(Exercise.weight)
+        ).all()
+        assert [(r.weight, r.notes) for r in records] == [
+            (100, None),
+            (105, "a note,\nover two lines"),
+        ]
+        session.execute(delete(Exercise).where(Exercise.workout_id == workout_id))
+        session.commit()
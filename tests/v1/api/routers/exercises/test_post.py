@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from uuid import UUID, uuid4
 
 from sqlalchemy.sql import select, delete
@@ -76,3 +77,56 @@ def test_user_cant_create_exercise_for_workout_that_isnt_theirs(
         ROUTE, json=postable_payload, headers=secondary_test_user.auth
     )
     assert response.status_code == 404
+
+
+def test_bulk_create_returns_records_in_order_across_batches(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    postable_payload: dict[str, str],
+    session_factory: sessionmaker[Session],
+):
+    payloads = [postable_payload | {"notes": f"set {i}"} for i in range(7)]
+    # Use a tiny batch size so the request is split over several INSERTs.
+    with patch("app.db.bulk.get_bulk_insert_batch_size", return_value=3):
+        response = client.post(ROUTE, json=payloads, headers=primary_test_user.auth)
+    assert response.status_code == 201
+    resources = response.json()
+    assert [r["notes"] for r in resources] == [p["notes"] for p in payloads]
+    assert len({r["id"] for r in resources}) == len(payloads)
+
+    # Clean up and make sure the records were all in the db.
+    with session_factory() as session:
+        ids = [UUID(r["id"]) for r in resources]
+        result = session.execute(delete(Exercise).where(Exercise.id.in_(ids)))
+        session.commit()
+        assert result.rowcount == len(payloads)
+
+
+def test_retries_with_an_idempotency_key_dont_create_duplicates(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    postable_payload: dict[str, str],
+    session_factory: sessionmaker[Session],
+):
+    headers = {**primary_test_user.auth, "Idempotency-Key": str(uuid4())}
+    first = client.post(ROUTE, json=postable_payload, headers=headers)
+    assert first.status_code == 201
+    retry = client.post(ROUTE, json=postable_payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    # The same key can't be reused for a different request.
+    different = client.post(
+        ROUTE, json={**postable_payload, "reps": 1}, headers=headers
+    )
+    assert different.status_code == 422
+
+    # Only the first request created anything.
+    with session_factory() as session:
+        workout_id = UUID(postable_payload["workout_id"])
+        result = session.execute(
+            delete(Exercise).where(Exercise.workout_id == workout_id)
+        )
+        session.commit()
+        assert result.rowcount == 1
@@ -0,0 +1,184 @@
+from typing import Iterator
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import delete, select
+
+from app.db import Exercise, ExerciseType, Workout
+from app.db.models.user import UserWithAuth
+
+
+ROUTE = "/batch/"
+
+
+@pytest.fixture(scope="function")
+def new_workout_id(session_factory: sessionmaker[Session]) -> Iterator[UUID]:
+    """An ID for a batch to create a workout with; cleaned up afterwards."""
+    id = uuid4()
+    yield id
+    with session_factory() as session:
+        session.execute(delete(Exercise).where(Exercise.workout_id == id))
+        session.execute(delete(Workout).where(Workout.id == id))
+        session.commit()
+
+
+def test_batch_requires_auth(client: TestClient):
+    response = client.post(ROUTE, json={"operations": []})
+    assert response.status_code == 401
+
+
+def test_mixed_batch_is_applied_in_order(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workout_and_exercise_type: tuple[Workout, ExerciseType],
+    session_factory: sessionmaker[Session],
+    new_workout_id: UUID,
+):
+    _, exercise_type = primary_user_workout_and_exercise_type
+    exercise_ids = [uuid4(), uuid4()]
+    exercise = {
+        "weight": 10,
+        "weight_unit": "pounds",
+        "reps": 5,
+        "exercise_type_id": str(exercise_type.id),
+        "workout_id": str(new_workout_id),
+    }
+    operations = [
+        {
+            "op": "create",
+            "resource": "workout",
+            "id": str(new_workout_id),
+            "data": {"status": "in-progress"},
+        },
+        # These reference the workout created just above.
+        *(
+            {"op": "create", "resource": "exercise", "id": str(id), "data": exercise}
+            for id in exercise_ids
+        ),
+        {
+            "op": "update",
+            "resource": "exercise",
+            "id": str(exercise_ids[0]),
+            "data": {"weight": 12.5},
+        },
+        {"op": "delete", "resource": "exercise", "id": str(exercise_ids[1])},
+        {
+            "op": "update",
+            "resource": "workout",
+            "id": str(new_workout_id),
+            "data": {"status": "completed"},
+        },
+    ]
+    response = client.post(
+        ROUTE, json={"operations": operations}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["op"], r["resource"]) for r in results] == [
+        (op["op"], op["resource"]) for op in operations
+    ]
+    assert results[3]["record"]["weight"] == 12.5
+    assert results[5]["record"]["status"] == "completed"
+
+    with session_factory() as session:
+        workout = session.scalar(select(Workout).where(Workout.id == new_workout_id))
+        assert workout.status == "completed"
+        assert workout.user_id == primary_test_user.user.id
+        exercises = {
+            ex.id: ex
+            for ex in session.scalars(
+                select(Exercise).where(Exercise.workout_id == new_workout_id)
+            )
+        }
+        assert exercises[exercise_ids[0]].weight == 12.5
+        assert exercises[exercise_ids[0]].deleted_at is None
+        assert exercises[exercise_ids[1]].deleted_at is not None
+
+
+def test_missing_reference_rejects_whole_batch(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workout_and_exercise_type: tuple[Workout, ExerciseType],
+    secondary_user_workout_and_exercise_type: tuple[Workout, ExerciseType],
+    session_factory: sessionmaker[Session],
+    new_workout_id: UUID,
+):
+    _, exercise_type = primary_user_workout_and_exercise_type
+    others_workout, _ = secondary_user_workout_and_exercise_type
+    operations = [
+        {
+            "op": "create",
+            "resource": "workout",
+            "id": str(new_workout_id),
+            "data": {"status": "in-progress"},
+        },
+        {
+            "op": "create",
+            "resource": "exercise",
+            "data": {
+                "weight": 10,
+                "exercise_type_id": str(exercise_type.id),
+                "workout_id": str(others_workout.id),
+            },
+        },
+    ]
+    response = client.post(
+        ROUTE, json={"operations": operations}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 404
+    assert str(others_workout.id) in response.json()["detail"]
+    with session_factory() as session:
+        assert session.get(Workout, new_workout_id) is None
+
+
+def test_failed_write_rolls_back_earlier_operations(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    session_factory: sessionmaker[Session],
+    new_workout_id: UUID,
+):
+    operations = [
+        {
+            "op": "create",
+            "resource": "workout",
+            "id": str(new_workout_id),
+            "data": {"status": "in-progress"},
+        },
+        {"op": "delete", "resource": "workout", "id": str(uuid4())},
+    ]
+    response = client.post(
+        ROUTE, json={"operations": operations}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"].startswith("operation 1:")
+    with session_factory() as session:
+        assert session.get(Workout, new_workout_id) is None
+
+
+def test_invalid_operations_are_reported_together(
+    client: TestClient, primary_test_user: UserWithAuth
+):
+    operations = [
+        {"op": "create", "resource": "workout", "data": {"status": "sleeping"}},
+        {"op": "update", "resource": "exercise", "id": str(uuid4()), "data": {"x": 1}},
+        {"op": "delete", "resource": "exercise"},
+    ]
+    response = client.post(
+        ROUTE, json={"operations": operations}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 422
+    locs = [error["loc"] for error in response.json()["detail"]]
+    # A missing ID is caught by the request model, before anything else is checked.
+    assert locs == [["body", "operations", 2, "__root__"]]
+
+    response = client.post(
+        ROUTE, json={"operations": operations[:2]}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 422
+    locs = [error["loc"] for error in response.json()["detail"]]
+    assert locs == [
+        ["body", "operations", 0, "data", "status"],
+        ["body", "operations", 1, "data", "x"],
+    ]
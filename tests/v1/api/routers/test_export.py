@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.db import Exercise
+from app.db.models.user import UserWithAuth
+
+
+ROUTE = "/export"
+
+
+def test_export_requires_auth(client: TestClient):
+    response = client.get(ROUTE)
+    assert response.status_code == 401
+
+
+def test_ndjson_export(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    secondary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+):
+    with client.stream("GET", ROUTE, headers=primary_test_user.auth) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+    exported_ids = [row["exercise_id"] for row in rows]
+    # Exercises come out in start time order, along with their workout.
+    assert exported_ids == [str(ex.id) for ex in primary_user_exercises]
+    assert {row["workout_id"] for row in rows} == {
+        str(primary_user_exercises[0].workout_id)
+    }
+    assert rows[0]["exercise_notes"] == "My first set of the day"
+
+    # Other users don't see this history.
+    response = client.get(ROUTE, headers=secondary_test_user.auth)
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_csv_export(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+):
+    response = client.get(
+        ROUTE, params={"format": "csv"}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "workout-history.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["exercise_id"] for row in rows] == [
+        str(ex.id) for ex in primary_user_exercises
+    ]
+    assert [row["seconds"] for row in rows] == ["", "10"]
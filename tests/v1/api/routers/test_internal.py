@@ -0,0 +1,73 @@
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.models.user import UserWithAuth
+from app.v1.api.routers.internal import get_internal_api_key
+from app.v1.models.pool import PoolStatus
+
+
+@pytest.fixture
+def internal_auth(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, str]]:
+    monkeypatch.setenv("INTERNAL_API_KEY", "kelsier")
+    get_internal_api_key.cache_clear()
+    yield {"X-Internal-Api-Key": "kelsier"}
+    get_internal_api_key.cache_clear()
+
+
+def test_db_pool_fails_without_auth(client: TestClient, internal_auth: dict[str, str]):
+    response = client.get("/internal/db_pool")
+    assert response.status_code == 401
+
+
+def test_db_pool_fails_with_only_user_auth(
+    client: TestClient, primary_test_user: UserWithAuth, internal_auth: dict[str, str]
+):
+    response = client.get("/internal/db_pool", headers=primary_test_user.auth)
+    assert response.status_code == 401
+    response = client.get(
+        "/internal/db_pool", headers={"X-Internal-Api-Key": "not the key"}
+    )
+    assert response.status_code == 401
+
+
+def test_internal_endpoints_are_disabled_without_a_key(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.delenv("INTERNAL_API_KEY", raising=False)
+    get_internal_api_key.cache_clear()
+    response = client.get("/internal/pubsub", headers={"X-Internal-Api-Key": ""})
+    assert response.status_code == 404
+
+
+def test_db_pool_reports_checked_out_connections(
+    client: TestClient, primary_test_user: UserWithAuth, internal_auth: dict[str, str]
+):
+    # Make sure the async pool has been used at least once.
+    client.get("/workouts/", headers=primary_test_user.auth)
+    response = client.get("/internal/db_pool", headers=internal_auth)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload.keys() == {"async", "sync"}
+    async_pool = PoolStatus.parse_obj(payload["async"])
+    assert async_pool.checkouts >= 1
+    assert async_pool.max_wait_seconds >= async_pool.mean_wait_seconds >= 0
+
+
+def test_authenticated_request_checks_out_one_connection(
+    client: TestClient, primary_test_user: UserWithAuth, internal_auth: dict[str, str]
+):
+    """
+    Auth doesn't need the database, so a request only checks out its own connection.
+    """
+
+    def async_checkouts() -> int:
+        response = client.get("/internal/db_pool", headers=internal_auth)
+        return response.json()["async"]["checkouts"]
+
+    before = async_checkouts()
+    response = client.get("/workouts/", headers=primary_test_user.auth)
+    assert response.status_code == 200
+    after = async_checkouts()
+    assert after - before == 1
@@ -142,3 +142,24 @@ def test_user_cant_set_parent_workout_type_to_one_owned_by_another_user(
         ROUTE, params={"id": str(wt.id)}, json=payload, headers=primary_test_user.auth
     )
     assert response.status_code == 404
+
+
+def test_user_cant_update_public_workout_type(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    public_workout_type: WorkoutType,
+    session_factory: sessionmaker[Session],
+):
+    # The user can see a public workout type, so this is a 401 rather than a 404.
+    response = client.patch(
+        ROUTE,
+        params={"id": public_workout_type.id},
+        json={"name": "renamed"},
+        headers=primary_test_user.auth,
+    )
+    assert response.status_code == 401
+    with session_factory() as session:
+        record = session.scalar(
+            select(WorkoutType).where(WorkoutType.id == public_workout_type.id)
+        )
+        assert record.name == public_workout_type.name
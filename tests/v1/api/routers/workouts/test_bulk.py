@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import select
+
+from app.db.models.user import UserWithAuth
+from app.db import Workout
+
+
+ROUTE = "/workouts/bulk"
+
+
+def test_bulk_update_and_delete(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workouts: tuple[Workout, ...],
+    session_factory: sessionmaker[Session],
+):
+    ids = [wkt.id for wkt in primary_user_workouts[:2]]
+    payload_ids = [str(id) for id in ids]
+    response = client.patch(
+        ROUTE,
+        json={"ids": payload_ids, "status": "paused", "notes": "Pulled a hamstring"},
+        headers=primary_test_user.auth,
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["updated"] * 2
+
+    response = client.request(
+        "DELETE", ROUTE, json={"ids": payload_ids}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["deleted"] * 2
+
+    with session_factory() as session:
+        records = session.scalars(select(Workout).where(Workout.id.in_(ids)))
+        for record in records:
+            assert record.status == "paused"
+            assert record.notes == "Pulled a hamstring"
+            assert record.deleted_at is not None
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.db.models.user import UserWithAuth
@@ -86,3 +88,51 @@ def test_filtering(
         assert workout["workout_type_id"] == str(
             primary_user_workouts[0].workout_type_id
         )
+
+
+def test_pagination(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workouts: tuple[Workout, ...],
+):
+    # Page through the workouts one at a time.
+    seen_ids: list[str] = []
+    params: dict[str, str | int] = {"limit": 1}
+    while True:
+        response = client.get(ROUTE, params=params, headers=primary_test_user.auth)
+        assert response.status_code == 200
+        payload = response.json()
+        assert len(payload) <= 1
+        seen_ids.extend(workout["id"] for workout in payload)
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["after"] = response.headers["X-Next-Cursor"]
+    # We should see every workout exactly once, in start time order.
+    expected = sorted(primary_user_workouts, key=lambda w: w.start_time)
+    assert seen_ids == [str(workout.id) for workout in expected]
+
+
+def test_invalid_cursor_returns_400(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+):
+    params = {"limit": 1, "after": "not-a-cursor"}
+    response = client.get(ROUTE, params=params, headers=primary_test_user.auth)
+    assert response.status_code == 400
+
+
+def test_ndjson_streaming_matches_json(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_workouts: tuple[Workout, ...],
+):
+    """
+    Asking for NDJSON streams the same records, one per line.
+    """
+    expected = client.get(ROUTE, headers=primary_test_user.auth).json()
+    headers = primary_test_user.auth | {"Accept": "application/x-ndjson"}
+    with client.stream("GET", ROUTE, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        streamed = [json.loads(line) for line in response.iter_lines() if line]
+    assert streamed == expected
@@ -0,0 +1,87 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from app import db
+from app.pubsub import InMemoryTransport, Publisher
+from app.v1.change_feed import RESYNC, Change, ChangeFeedHub, sse_chunks
+from app.v1.lifecycle import Action, lifecycle_messages
+
+
+USER_ID = uuid4()
+
+
+@pytest.mark.anyio
+async def test_published_changes_reach_only_their_users_feeds():
+    hub = ChangeFeedHub()
+    publisher = Publisher(InMemoryTransport())
+    publisher.add_listener(hub.dispatch)
+    ids = [uuid4(), uuid4()]
+    with hub.subscribe(USER_ID) as mine, hub.subscribe(uuid4()) as theirs:
+        await publisher.send(
+            [
+                *lifecycle_messages(
+                    db.Workout, Action.UPDATE, resource_ids=ids, user_id=USER_ID
+                ),
+                # Reads aren't changes.
+                *lifecycle_messages(db.Workout, Action.READ, user_id=USER_ID),
+            ]
+        )
+        assert mine.get_nowait() == Change("workouts", "update", [str(i) for i in ids])
+        assert mine.empty()
+        assert theirs.empty()
+    assert hub.subscriber_count == 0
+
+
+@pytest.mark.anyio
+async def test_slow_subscribers_are_told_to_resync():
+    hub = ChangeFeedHub(max_queued=2)
+    messages = lifecycle_messages(
+        db.Exercise, Action.CREATE, resource_id=uuid4(), user_id=USER_ID
+    )
+    with hub.subscribe(USER_ID) as queue:
+        for _ in range(3):
+            hub.dispatch(messages)
+        assert queue.get_nowait() == RESYNC
+        assert queue.empty()
+
+
+@pytest.mark.anyio
+async def test_changes_are_streamed_as_server_sent_events():
+    hub = ChangeFeedHub()
+    chunks = sse_chunks(hub, USER_ID, keepalive_seconds=0.01)
+    assert await anext(chunks) == ": connected\n\n"
+    assert await anext(chunks) == ": keepalive\n\n"
+
+    id = uuid4()
+    hub.dispatch(
+        lifecycle_messages(db.Exercise, Action.DELETE, resource_id=id, user_id=USER_ID)
+    )
+    event, data = (await anext(chunks)).strip().split("\n")
+    assert event == "event: delete"
+    assert json.loads(data.removeprefix("data: ")) == {
+        "resource": "exercises",
+        "ids": [str(id)],
+    }
+
+    await chunks.aclose()
+    assert hub.subscriber_count == 0
+
+
+@pytest.mark.anyio
+async def test_disconnecting_unsubscribes():
+    hub = ChangeFeedHub()
+
+    async def consume() -> None:
+        async for _ in sse_chunks(hub, USER_ID):
+            pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    assert hub.subscriber_count == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert hub.subscriber_count == 0
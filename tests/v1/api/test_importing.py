@@ -0,0 +1,44 @@
+from typing import AsyncIterator
+
+import pytest
+
+from app.v1.api.importing import iter_csv, iter_lines, iter_ndjson
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(records: AsyncIterator) -> list:
+    return [record async for record in records]
+
+
+@pytest.mark.anyio
+async def test_lines_survive_arbitrary_chunk_boundaries():
+    data = "première ligne\r\nsecond\n\nlast".encode()
+    expected = [(1, "première ligne"), (2, "second"), (3, ""), (4, "last")]
+    # Chunks of 1 byte split the multi-byte "è" across chunks.
+    for size in (1, 2, 7, len(data)):
+        assert await collect(iter_lines(chunked(data, size))) == expected
+
+
+@pytest.mark.anyio
+async def test_ndjson_reports_invalid_lines():
+    data = b'{"reps": 5}\n[1, 2]\n{oops\n\n{"reps": 6}\n'
+    records = await collect(iter_ndjson(iter_lines(chunked(data, 4))))
+    assert [line for line, _ in records] == [1, 2, 3, 5]
+    assert records[0][1] == {"reps": 5}
+    assert isinstance(records[1][1], ValueError)
+    assert isinstance(records[2][1], ValueError)
+    assert records[3][1] == {"reps": 6}
+
+
+@pytest.mark.anyio
+async def test_csv_handles_quoted_newlines_and_empty_cells():
+    data = b'reps,notes\n5,\n6,"two\nlines"\n7\n8,"unterminated\n'
+    records = await collect(iter_csv(iter_lines(chunked(data, 3))))
+    assert records[0] == (2, {"reps": "5"})
+    assert records[1] == (3, {"reps": "6", "notes": "two\nlines"})
+    assert records[2][0] == 5 and isinstance(records[2][1], ValueError)
+    assert records[3][0] == 6 and isinstance(records[3][1], ValueError)
@@ -0,0 +1,93 @@
+import json
+from typing import Iterator
+from uuid import uuid4
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import db
+from app.v1 import lifecycle
+from app.v1.auth import get_current_user
+from app.pubsub import unpack_envelope
+from app.v1.lifecycle import (
+    Action,
+    LifecycleEventMiddleware,
+    LifecyclePublisher,
+    lifecycle_messages,
+)
+
+
+USER = db.Principal(id=uuid4(), email="wayne@elendel.gov")
+
+
+def make_app(publish_reads: bool) -> FastAPI:
+    router = APIRouter(
+        prefix="/workouts",
+        dependencies=[Depends(LifecyclePublisher(db.Workout, publish_reads))],
+    )
+
+    @router.get("/")
+    def read_workout(id: str):
+        return {"id": id}
+
+    @router.get("/missing")
+    def read_missing_workout():
+        raise HTTPException(status_code=404)
+
+    app = FastAPI()
+    app.add_middleware(LifecycleEventMiddleware)
+    app.include_router(router)
+    app.dependency_overrides[get_current_user] = lambda: USER
+    # Reads never touch the session.
+    app.dependency_overrides[db.get_async_session] = lambda: None
+    return app
+
+
+@pytest.fixture
+def published(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[tuple[str, str]]]:
+    messages: list[tuple[str, str]] = []
+
+    async def publish(message: str, exchange: str, routing_key: str) -> None:
+        messages.append((routing_key, message))
+
+    monkeypatch.setattr(lifecycle, "publish", publish)
+    yield messages
+
+
+def test_read_events_are_published_after_successful_responses(
+    published: list[tuple[str, str]]
+):
+    client = TestClient(make_app(publish_reads=True))
+    id = str(uuid4())
+    assert client.get("/workouts/", params={"id": id}).status_code == 200
+    assert [key for key, _ in published] == ["lifecycle.workouts.read"]
+    assert json.loads(published[0][1]) == {
+        "id": id,
+        "user": USER.email,
+        "user_id": str(USER.id),
+    }
+
+    # Nothing is published for errors, whether raised by the endpoint or earlier.
+    assert client.get("/workouts/missing").status_code == 404
+    assert client.get("/workouts/").status_code == 422
+    assert len(published) == 1
+
+
+def test_read_events_can_be_turned_off(published: list[tuple[str, str]]):
+    client = TestClient(make_app(publish_reads=False))
+    assert client.get("/workouts/", params={"id": str(uuid4())}).status_code == 200
+    assert published == []
+
+
+def test_events_about_many_records_are_one_envelope():
+    ids = [uuid4() for _ in range(1500)]
+    messages = lifecycle_messages(
+        db.Exercise, Action.CREATE, resource_ids=ids, user=USER.email
+    )
+    # Too many ids for one message, but nowhere near one message per id.
+    assert len(messages) == 2
+    assert {m.routing_key for m in messages} == {"lifecycle.exercises.create"}
+    envelopes = [unpack_envelope(m.body) for m in messages]
+    assert [id for e in envelopes for id in e.ids] == [str(id) for id in ids]
+    assert envelopes[0].fields == {"user": USER.email}
@@ -0,0 +1,69 @@
+import json
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.engine.result import result_tuple
+
+from app import db
+from app.v1.api.serialization import RowSerializer, model_response
+from app.v1.models.exercise import ExerciseInDB
+from app.v1.models.workout import WorkoutInDB
+
+
+def test_workout_rows_encode_like_the_response_model():
+    serializer = RowSerializer(WorkoutInDB, db.Workout)
+    make_row = result_tuple(serializer.fields)
+    rows = [
+        make_row(
+            (
+                datetime(2023, 1, 1, 12, tzinfo=timezone.utc),
+                None,
+                "completed",
+                "leg day — ouch",
+                uuid4(),
+                uuid4(),
+                uuid4(),
+            )
+        ),
+        make_row((None, None, "in-progress", None, None, uuid4(), uuid4())),
+    ]
+    expected = jsonable_encoder([WorkoutInDB.from_orm(row) for row in rows])
+    assert json.loads(serializer.encode(rows)) == expected
+
+
+def test_exercise_rows_encode_like_the_response_model():
+    serializer = RowSerializer(ExerciseInDB, db.Exercise)
+    assert serializer.fields == list(ExerciseInDB.__fields__)
+    values = {
+        "start_time": datetime(2023, 1, 1, 12, 30, 15, tzinfo=timezone.utc),
+        "weight": 22.5,
+        "weight_unit": "kilograms",
+        "reps": 8,
+        "seconds": None,
+        "notes": None,
+        "exercise_type_id": uuid4(),
+        "workout_id": uuid4(),
+        "id": uuid4(),
+        "user_id": uuid4(),
+    }
+    row = result_tuple(serializer.fields)(tuple(values[f] for f in serializer.fields))
+    expected = jsonable_encoder([ExerciseInDB.from_orm(row)])
+    assert json.loads(serializer.encode([row])) == expected
+
+
+def test_model_responses_encode_like_jsonable_encoder():
+    class Record(BaseModel):
+        id: UUID
+        at: datetime | None
+        notes: str | None
+
+    records = [
+        Record(id=uuid4(), at=datetime(2023, 1, 1, tzinfo=timezone.utc), notes="é"),
+        Record.construct(id=uuid4(), at=None, notes=None),
+    ]
+    content = [{"record": record, "records": records} for record in records]
+    response = model_response(content)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == jsonable_encoder(content)
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Sequence
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.sql import column, func, select
+
+from app.v1.api.streaming import (
+    column_names,
+    csv_chunks,
+    model_ndjson_chunks,
+    ndjson_chunks,
+)
+
+
+COLUMNS = ["id", "start_time", "reps"]
+make_row = result_tuple(COLUMNS)
+ROWS = [
+    make_row((uuid4(), datetime(2023, 1, 1, 12, tzinfo=timezone.utc), 5)),
+    make_row((uuid4(), None, None)),
+    make_row((uuid4(), None, 7)),
+]
+
+
+async def partitions(size: int) -> AsyncIterator[Sequence[Row]]:
+    for start in range(0, len(ROWS), size):
+        yield ROWS[start : start + size]
+
+
+@pytest.mark.anyio
+async def test_ndjson_chunks_are_one_object_per_line():
+    chunks = [chunk async for chunk in ndjson_chunks(partitions(2))]
+    assert len(chunks) == 2
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert records[0] == {
+        "id": str(ROWS[0].id),
+        "start_time": "2023-01-01T12:00:00+00:00",
+        "reps": 5,
+    }
+    assert records[1]["start_time"] is None
+
+
+@pytest.mark.anyio
+async def test_csv_chunks_start_with_a_header():
+    chunks = [chunk async for chunk in csv_chunks(partitions(2), COLUMNS)]
+    # The header, then one chunk per partition.
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row["id"] for row in rows] == [str(row.id) for row in ROWS]
+    assert rows[0]["start_time"] == "2023-01-01T12:00:00+00:00"
+    assert rows[1]["reps"] == ""
+
+
+def test_column_names_require_labels():
+    query = select(column("id"), func.count().label("reps"))
+    assert column_names(query) == ["id", "reps"]
+    with pytest.raises(ValueError):
+        column_names(select(func.count()))
+
+
+@pytest.mark.anyio
+async def test_model_ndjson_chunks_validate_through_the_response_model():
+    class Record(BaseModel):
+        id: UUID
+        reps: int | None
+
+        class Config:
+            orm_mode = True
+
+    make_entity_row = result_tuple(["Record"])
+    entity_rows = [make_entity_row((row,)) for row in ROWS]
+
+    async def entity_partitions() -> AsyncIterator[Sequence[Row]]:
+        yield entity_rows
+
+    chunks = [chunk async for chunk in model_ndjson_chunks(entity_partitions(), Record)]
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    # Only the model's fields come through.
+    assert records == [{"id": str(row.id), "reps": row.reps} for row in ROWS]
@@ -1,6 +1,8 @@
 from unittest.mock import patch
 from typing import Any
 
+import pytest
+
 from app.v1 import auth
 from app.db import models as db_models
 
@@ -12,7 +14,7 @@ FAKE_USER = db_models.User(
 )
 
 
-def fake_get_user_by_email(db: Any, email: str) -> db_models.User:
+async def fake_get_user_by_email(db: Any, email: str) -> db_models.User:
     if email == FAKE_USER.email:
         return FAKE_USER
     else:
@@ -29,10 +31,11 @@ def test_pw_hashing():
     assert auth.compare_pw_to_hash(email, pw, hashed)
 
 
-def test_authenticate_user_works_with_good_creds():
+@pytest.mark.anyio
+async def test_authenticate_user_works_with_good_creds():
     with patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email) as spy:
         fake_db = None
-        retrieved_user = auth.authenticate_user(
+        retrieved_user = await auth.authenticate_user(
             FAKE_USER_DATA["email"],
             FAKE_USER_DATA["password"],
             fake_db,
@@ -41,10 +44,11 @@ def test_authenticate_user_works_with_good_creds():
         assert retrieved_user is FAKE_USER
 
 
-def test_authenticate_user_fails_with_wrong_password():
+@pytest.mark.anyio
+async def test_authenticate_user_fails_with_wrong_password():
     with patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email) as spy:
         fake_db = None
-        retrieved_user = auth.authenticate_user(
+        retrieved_user = await auth.authenticate_user(
             FAKE_USER_DATA["email"],
             "marasi",
             fake_db,
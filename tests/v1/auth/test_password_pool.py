@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.v1 import auth
+from app.v1.password_pool import PasswordPool
+
+
+@pytest.mark.anyio
+async def test_hashing_runs_off_the_event_loop():
+    email, pw = "steris@elendel.gov", "harmony"
+    loop_thread = threading.get_ident()
+    pool = PasswordPool(max_workers=1)
+    worker_thread = await pool.run(threading.get_ident)
+    assert worker_thread != loop_thread
+    hashed = await auth.hash_pw_async(email, pw)
+    assert await auth.compare_pw_to_hash_async(email, pw, hashed)
+    assert not await auth.compare_pw_to_hash_async(email, "ruin", hashed)
+    pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_capped_and_queueing_is_measured():
+    pool = PasswordPool(max_workers=2)
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def work() -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        release.wait(timeout=5)
+        with lock:
+            running -= 1
+
+    tasks = [asyncio.create_task(pool.run(work)) for _ in range(5)]
+    await asyncio.sleep(0.1)
+    status = pool.status()
+    assert (status["running"], status["queued"]) == (2, 3)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    status = pool.status()
+    assert max_running == 2
+    assert status["completed"] == 5
+    assert status["max_queue_seconds"] >= 0.1
+    pool.shutdown()
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 from datetime import datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 from fastapi import HTTPException
 import pytest
@@ -10,12 +11,13 @@ from app.db import models as db_models
 
 FAKE_USER_DATA = {"email": "wayne@roughs.net", "password": "ranette"}
 FAKE_USER = db_models.User(
+    id=uuid4(),
     email=FAKE_USER_DATA["email"],
     pw_hash=auth.hash_pw(FAKE_USER_DATA["email"], FAKE_USER_DATA["password"]),
 )
 
 
-def fake_get_user_by_email(session: Any, email: str) -> db_models.User:
+async def fake_get_user_by_email(session: Any, email: str) -> db_models.User:
     if email == FAKE_USER.email:
         return FAKE_USER
     else:
@@ -23,18 +25,45 @@ def fake_get_user_by_email(session: Any, email: str) -> db_models.User:
 
 
 @pytest.mark.anyio
-async def test_can_get_user_from_valid_jwt():
+async def test_can_get_user_from_valid_jwt_without_querying_db():
+    jwt = auth.create_jwt(
+        {"sub": FAKE_USER_DATA["email"], "uid": str(FAKE_USER.id)},
+        timedelta(days=1),
+    )
+    with patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email) as spy:
+        fake_session = None
+        retrieved_user = await auth.get_current_user(
+            token=jwt.access_token, session=fake_session
+        )
+        spy.assert_not_called()
+        assert retrieved_user == db_models.Principal(FAKE_USER.id, FAKE_USER.email)
+
+
+@pytest.mark.anyio
+async def test_can_get_user_from_valid_jwt_without_user_id():
+    """
+    Tokens issued before they carried a user ID still work, via a lookup by email.
+    """
     jwt = auth.create_jwt(
         {"sub": FAKE_USER_DATA["email"]},
         timedelta(days=1),
     )
     with patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email) as spy:
-        fake_session_factory = None
+        fake_session = None
         retrieved_user = await auth.get_current_user(
-            token=jwt.access_token, session_factory=fake_session_factory
+            token=jwt.access_token, session=fake_session
         )
-        spy.assert_called_once_with(fake_session_factory, email=FAKE_USER_DATA["email"])
-        assert retrieved_user is FAKE_USER
+        spy.assert_called_once_with(fake_session, email=FAKE_USER_DATA["email"])
+        assert retrieved_user == db_models.Principal(FAKE_USER.id, FAKE_USER.email)
+
+
+@pytest.mark.anyio
+async def test_auth_fails_for_nonexistent_user():
+    jwt = auth.create_jwt({"sub": "nobody@example.com"}, timedelta(days=1))
+    with patch("app.v1.auth.get_user_by_email", fake_get_user_by_email):
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.get_current_user_record(token=jwt.access_token, session=None)
+    assert exc_info.value.status_code == 401
 
 
 @pytest.mark.anyio
@@ -51,16 +80,20 @@ async def test_auth_fails_with_expired_jwt():
 
     with patch("app.v1.auth.get_user_by_email", fake_get_user_by_email):
         with patch("app.v1.auth.datetime", FakeTime):
-            fake_session_factory = None
+            fake_session = None
             with pytest.raises(HTTPException):
                 await auth.get_current_user(
-                    token=jwt.access_token, session_factory=fake_session_factory
+                    token=jwt.access_token, session=fake_session
                 )
 
 
 def test_jwt_payload_contains_expected_keys():
     token = auth.create_jwt_token(
         email=FAKE_USER_DATA["email"],
+        user_id=FAKE_USER.id,
     )
     assert token.token_type == "bearer"
     assert token.expiration_time > datetime.utcnow()
+    payload = auth.decode_jwt(token.access_token)
+    assert payload["sub"] == FAKE_USER_DATA["email"]
+    assert payload["uid"] == str(FAKE_USER.id)
@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.db import models as db_models
+from app.v1 import auth
+from app.db.user_cache import UserCache, get_user_cache
+
+
+def make_user(email: str) -> db_models.User:
+    return db_models.User(id=uuid4(), email=email, pw_hash="not-a-real-hash")
+
+
+def test_cache_returns_what_was_put():
+    cache = UserCache()
+    user = make_user("vin@luthadel.net")
+    assert cache.get(user.email) is None
+    cache.put(user)
+    assert cache.get(user.email) is user
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = UserCache(max_size=2)
+    users = [make_user(f"user{i}@example.com") for i in range(3)]
+    cache.put(users[0])
+    cache.put(users[1])
+    # Touch the first user so the second becomes the least recently used.
+    cache.get(users[0].email)
+    cache.put(users[2])
+    assert cache.get(users[0].email) is users[0]
+    assert cache.get(users[1].email) is None
+    assert cache.get(users[2].email) is users[2]
+
+
+def test_entries_dont_outlive_token_expiration():
+    cache = UserCache(ttl_seconds=300)
+    user = make_user("kelsier@luthadel.net")
+    # An already-expired token shouldn't be cached at all.
+    cache.put(user, expiration_timestamp=time.time() - 1)
+    assert cache.get(user.email) is None
+
+
+def test_invalidate_by_email_and_id():
+    cache = UserCache()
+    first, second = make_user("a@example.com"), make_user("b@example.com")
+    cache.put(first)
+    cache.put(second)
+    cache.invalidate(email=first.email)
+    cache.invalidate(user_id=second.id)
+    assert cache.get(first.email) is None
+    assert cache.get(second.email) is None
+
+
+@pytest.mark.anyio
+async def test_user_record_is_only_fetched_once():
+    user = make_user("sazed@terris.org")
+
+    async def fake_get_user_by_email(session: Any, email: str) -> db_models.User:
+        return user
+
+    get_user_cache().clear()
+    jwt = auth.create_jwt({"sub": user.email}, timedelta(days=1))
+    with patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email) as spy:
+        for _ in range(3):
+            retrieved = await auth.get_current_user_record(
+                token=jwt.access_token, session=None
+            )
+            assert retrieved is user
+        spy.assert_called_once()
+    get_user_cache().invalidate(email=user.email)
+
+
+def test_revoked_users_are_dropped_and_remembered_for_a_token_lifetime():
+    cache = UserCache()
+    user = make_user("elend@luthadel.net")
+    cache.put(user)
+    cache.revoke(user.id)
+    assert cache.get(user.email) is None
+    assert cache.is_revoked(user.id)
+    assert not cache.is_revoked(uuid4())
+    assert cache.revoked_ttl_seconds >= auth.ACCESS_TOKEN_EXPIRATION_MINUTES * 60
+
+
+def test_revocations_expire():
+    cache = UserCache(revoked_ttl_seconds=0)
+    user_id = uuid4()
+    cache.revoke(user_id)
+    assert not cache.is_revoked(user_id)
+
+
+@pytest.mark.anyio
+async def test_tokens_with_a_user_id_stop_working_once_revoked():
+    user = make_user("marsh@inquisitors.org")
+    token = auth.create_jwt_token(user.email, user.id).access_token
+    principal = await auth.get_current_user(token=token, session=None)
+    assert principal.id == user.id
+
+    get_user_cache().revoke(user.id)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.get_current_user(token=token, session=None)
+        assert exc_info.value.status_code == 401
+    finally:
+        get_user_cache().clear()
+
+
+@pytest.mark.anyio
+async def test_legacy_tokens_are_decoded_once():
+    user = make_user("spook@luthadel.net")
+
+    async def fake_get_user_by_email(session: Any, email: str) -> db_models.User:
+        return user
+
+    get_user_cache().clear()
+    jwt = auth.create_jwt({"sub": user.email}, timedelta(days=1))
+    with (
+        patch("app.v1.auth.get_user_by_email", wraps=fake_get_user_by_email),
+        patch("app.v1.auth.decode_jwt", wraps=auth.decode_jwt) as decode,
+    ):
+        principal = await auth.get_current_user(token=jwt.access_token, session=None)
+    assert principal.id == user.id
+    decode.assert_called_once()
+    get_user_cache().clear()
@@ -48,7 +48,7 @@ def primary_test_user(session_factory) -> Iterator[UserWithAuth]:
         session.add(user)
         session.commit()
 
-    token = create_jwt_token(user.email)
+    token = create_jwt_token(user.email, user.id)
     auth_header = {"Authorization": f"Bearer {token.access_token}"}
 
     yield UserWithAuth(user, auth_header)
@@ -77,7 +77,7 @@ def secondary_test_user(session_factory) -> Iterator[UserWithAuth]:
         session.add(user)
         session.commit()
 
-    token = create_jwt_token(user.email)
+    token = create_jwt_token(user.email, user.id)
     auth_header = {"Authorization": f"Bearer {token.access_token}"}
 
     yield UserWithAuth(user, auth_header)
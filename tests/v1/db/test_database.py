@@ -0,0 +1,16 @@
+from app.db.database import (
+    get_async_engine,
+    get_async_sessionmaker,
+    get_engine,
+    get_pool_settings,
+    get_sessionmaker,
+)
+
+
+def test_sessions_and_metrics_share_one_engine():
+    assert get_async_sessionmaker().kw["bind"] is get_async_engine()
+    assert get_sessionmaker().kw["bind"] is get_engine()
+    # Asking for the default echo setting explicitly doesn't build a second engine.
+    echo = get_pool_settings().echo
+    assert get_async_engine(echo=echo) is get_async_engine()
+    assert get_engine(echo=echo) is get_engine()
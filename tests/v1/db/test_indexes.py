@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select, select, text
+
+from app.db.models import Exercise, ExerciseType, Workout, WorkoutType
+from app.db.models.user import UserWithAuth
+
+
+def explain(session: Session, query: Select) -> str:
+    compiled = query.compile(bind=session.get_bind())
+    result = session.connection().exec_driver_sql(
+        f"EXPLAIN {compiled}", compiled.params
+    )
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.parametrize(
+    "build_query, index_name",
+    [
+        (
+            lambda user: Workout.query(user, limit=10),
+            "ix_workouts_user_id_start_time",
+        ),
+        (
+            lambda user: Exercise.query(user, limit=10),
+            "ix_exercises_user_id_start_time",
+        ),
+        (
+            lambda user: select(Exercise).where(Exercise.workout_id == uuid.uuid4()),
+            "ix_exercises_workout_id",
+        ),
+        (
+            lambda user: WorkoutType.query(user),
+            "ix_workout_types_owner_user_id",
+        ),
+        (
+            lambda user: ExerciseType.query(user),
+            "ix_exercise_types_owner_user_id",
+        ),
+    ],
+)
+def test_router_queries_use_indexes(
+    session_factory: sessionmaker[Session],
+    primary_test_user: UserWithAuth,
+    build_query,
+    index_name: str,
+):
+    """
+    The queries behind the list endpoints should be served by an index.
+    """
+    with session_factory() as session:
+        # The test tables are tiny, so the planner would otherwise (reasonably) just
+        # scan them. Disabling sequential scans shows whether an index *can* be used.
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = explain(session, build_query(primary_test_user.user))
+        session.rollback()
+    assert f"Index Scan using {index_name}" in plan or (
+        f"Bitmap Index Scan on {index_name}" in plan
+    ), plan
@@ -0,0 +1,57 @@
+import json
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import delete, select
+
+from app.db import Exercise
+from app.db.models import OutboxEvent
+from app.db.models.user import UserWithAuth
+from app.db.outbox import relay_query
+
+
+def test_relay_skips_events_locked_by_other_relays():
+    sql = str(relay_query(50).compile(dialect=postgresql.dialect()))
+    assert "ORDER BY outbox.id" in sql
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
+
+
+def test_only_committed_changes_are_written_to_the_outbox(
+    client: TestClient,
+    primary_test_user: UserWithAuth,
+    primary_user_exercises: tuple[Exercise, ...],
+    session_factory: sessionmaker[Session],
+):
+    def exercise_events() -> list[OutboxEvent]:
+        with session_factory() as session:
+            query = select(OutboxEvent).where(
+                OutboxEvent.routing_key.like("lifecycle.exercises.%")
+            )
+            return list(session.scalars(query))
+
+    before = {event.id for event in exercise_events()}
+    # A request that fails doesn't write anything.
+    response = client.delete(
+        "/exercises/", params={"id": str(uuid4())}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 404
+    assert {event.id for event in exercise_events()} == before
+
+    ids = [str(ex.id) for ex in primary_user_exercises]
+    response = client.request(
+        "DELETE", "/exercises/bulk", json={"ids": ids}, headers=primary_test_user.auth
+    )
+    assert response.status_code == 200
+    new_events = [event for event in exercise_events() if event.id not in before]
+    assert [event.routing_key for event in new_events] == ["lifecycle.exercises.delete"]
+    body = json.loads(new_events[0].body)
+    assert body["ids"] == ids
+    assert body["user"] == primary_test_user.user.email
+
+    with session_factory() as session:
+        session.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(e.id for e in new_events))
+        )
+        session.commit()
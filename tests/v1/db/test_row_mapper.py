@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.engine.result import result_tuple
+
+from app.db.views import VExercise, VWorkout
+from app.db.views._mapping import RowMapper
+
+
+def workout_values() -> dict:
+    now = datetime.now(tz=timezone.utc)
+    return {
+        "id": uuid4(),
+        "start_time": now,
+        "end_time": None,
+        "status": "completed",
+        "user_id": uuid4(),
+        "created_at": now,
+        "updated_at": now,
+        "deleted_at": None,
+        "workout_type_id": None,
+        "workout_type_name": None,
+        "workout_type_notes": None,
+        "parent_workout_type_id": None,
+        "workout_type_owner_user_id": None,
+    }
+
+
+def test_mapper_matches_validated_construction():
+    values = workout_values()
+    # Column order in the row doesn't have to match field order in the model.
+    keys = list(reversed(values))
+    row = result_tuple(keys)(tuple(values[k] for k in keys))
+    trusted = RowMapper(VWorkout).from_row(row)
+    validated = RowMapper(VWorkout, trusted=False).from_row(row)
+    assert trusted == validated == VWorkout(**values)
+    assert trusted.__fields_set__ == validated.__fields_set__
+
+
+def test_prefixed_columns_and_batches():
+    exercise_fields = list(VExercise.__fields__)
+    keys = ["id"] + [f"ex_{field}" for field in exercise_fields]
+    make_row = result_tuple(keys)
+    rows = [
+        make_row((uuid4(),) + tuple(f"{field}-{i}" for field in exercise_fields))
+        for i in range(3)
+    ]
+    # Trusted mode doesn't validate, so these placeholder strings pass through.
+    exercises = RowMapper(VExercise, prefix="ex_").from_rows(rows)
+    assert [ex.notes for ex in exercises] == ["notes-0", "notes-1", "notes-2"]
+
+
+def test_missing_columns_are_reported():
+    row = result_tuple(["id"])((uuid4(),))
+    with pytest.raises(ValueError, match="start_time"):
+        RowMapper(VWorkout).from_row(row)
@@ -0,0 +1,41 @@
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.db import Principal, WorkoutType
+from app.db.writes import Write, write_returning_query
+
+
+def compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_update_folds_permissions_and_references_into_one_statement():
+    user = Principal(id=uuid4(), email="user@example.com")
+    values = {"name": "renamed", "parent_workout_type_id": uuid4()}
+    references = WorkoutType.missing_references_query(
+        [WorkoutType(**values)], user=user
+    )
+    sql = compile(
+        write_returning_query(WorkoutType, uuid4(), user, values, references=references)
+    )
+    assert sql.startswith("UPDATE workout_types SET")
+    assert "workout_types.owner_user_id = " in sql
+    assert "NOT (EXISTS (" in sql
+    assert " RETURNING workout_types.id" in sql
+    # The reference check has to look at all workout types, not just the one being
+    # updated, even though it's the same table.
+    assert "NOT IN (SELECT workout_types.id \nFROM workout_types" in sql
+
+
+def test_delete_and_empty_update():
+    user = Principal(id=uuid4(), email="user@example.com")
+    values = {"deleted_at": None}
+    sql = compile(
+        write_returning_query(WorkoutType, uuid4(), user, values, Write.DELETE)
+    )
+    assert sql.startswith("UPDATE workout_types SET")
+    assert "deleted_at=%(deleted_at)s" in sql
+    # With nothing to change, the record is just selected.
+    sql = compile(write_returning_query(WorkoutType, uuid4(), user, {}))
+    assert sql.startswith("SELECT workout_types.id")